@@ -0,0 +1,12 @@
+"""Performance benchmarks for plantuml2drawio.
+
+Run them from the repository root with ``python -m benchmarks.run``.
+"""
+
+import os
+import sys
+
+# Make the package importable from the source tree without installing it
+_SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Benchmark diagram type detection against the per-processor path.
+
+The registry lowercases a document once and looks up the keywords of all
+processors in it. Before, every processor lowercased the whole document
+and searched it for its own keywords. This benchmark times both keyword
+paths and the complete ProcessorRegistry.detect_diagram_type on large
+synthetic documents, and exits with status 1 if the shared path is slower
+than the per-processor one by more than the tolerance.
+
+Usage:
+    python -m benchmarks.detection
+    python -m benchmarks.detection --size 200000 --tolerance 0.1
+"""
+
+import argparse
+import statistics
+import sys
+from typing import Dict, FrozenSet, List
+
+from benchmarks.generator import generate_content
+from benchmarks.timing import DEFAULT_MIN_TIME, measure
+from plantuml2drawio.processors import ProcessorRegistry
+from plantuml2drawio.processors.features import DiagramFeatures
+
+# Approximate node count of the benchmarked documents; 200,000 nodes are
+# about 2.6 MB of PlantUML as a chain and 3.9 MB as nested if blocks
+DEFAULT_SIZE = 200000
+
+# Shapes whose content is benchmarked
+DETECTION_SHAPES = ("chain", "nested")
+
+# Accepted slowdown of the shared path relative to the per-processor path
+DEFAULT_TOLERANCE = 0.2
+
+
+def per_processor_keywords(content: str) -> Dict[str, FrozenSet[str]]:
+    """Find the keywords of every processor the way each did on its own.
+
+    Args:
+        content: PlantUML content to analyze
+
+    Returns:
+        Dictionary of diagram type to the keywords found for it
+    """
+    found: Dict[str, FrozenSet[str]] = {}
+    processors = ProcessorRegistry.get_all_processors()
+    for diagram_type, processor_class in processors.items():
+        content_lower = content.lower()
+        found[diagram_type] = frozenset(
+            keyword for keyword in processor_class.KEYWORDS if keyword in content_lower
+        )
+    return found
+
+
+def shared_keywords(content: str) -> Dict[str, FrozenSet[str]]:
+    """Find the keywords of every processor from one shared feature scan.
+
+    Args:
+        content: PlantUML content to analyze
+
+    Returns:
+        Dictionary of diagram type to the keywords found for it
+    """
+    features = DiagramFeatures(content, ProcessorRegistry.get_keyword_scanner())
+    processors = ProcessorRegistry.get_all_processors()
+    return {
+        diagram_type: frozenset(processor_class.KEYWORDS) & features.keywords
+        for diagram_type, processor_class in processors.items()
+    }
+
+
+def benchmark_detection(
+    content: str, min_time: float = DEFAULT_MIN_TIME
+) -> Dict[str, float]:
+    """Time the keyword paths and the complete detection on one document.
+
+    Args:
+        content: PlantUML content to analyze
+        min_time: Minimum total run time per measurement in seconds
+
+    Returns:
+        Dictionary of path name to its median time in seconds
+    """
+    # Import and register the processors outside the measurement
+    ProcessorRegistry.detect_diagram_type(content)
+    return {
+        "per_processor": statistics.median(
+            measure(lambda: per_processor_keywords(content), min_time)
+        ),
+        "shared": statistics.median(
+            measure(lambda: shared_keywords(content), min_time)
+        ),
+        "detect": statistics.median(
+            measure(lambda: ProcessorRegistry.detect_diagram_type(content), min_time)
+        ),
+    }
+
+
+def main() -> None:
+    """Run the detection benchmark as requested on the command line."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the shared keyword scan of diagram type detection with "
+            "scanning the document once per processor."
+        )
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=DEFAULT_SIZE,
+        help=f"Approximate node count of the documents (default: {DEFAULT_SIZE}).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Accepted slowdown of the shared scan, e.g. 0.2 for 20%%.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help="Minimum total run time per measurement in seconds.",
+    )
+    args = parser.parse_args()
+
+    print(f"{'shape':<10}{'MB':>8}{'per proc.':>12}{'shared':>12}{'detect':>12}")
+    slower: List[str] = []
+    for shape in DETECTION_SHAPES:
+        content = generate_content(shape, args.size)
+        assert content is not None
+        times = benchmark_detection(content, args.min_time)
+        print(
+            f"{shape:<10}{len(content) / 1e6:>8.2f}"
+            + "".join(
+                f"{times[name] * 1000:>10.1f}ms"
+                for name in ("per_processor", "shared", "detect")
+            )
+        )
+        if times["shared"] > times["per_processor"] * (1 + args.tolerance):
+            slower.append(shape)
+
+    if slower:
+        print(
+            f"Shared keyword scan is slower than per processor on: {', '.join(slower)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
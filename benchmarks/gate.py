@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""Benchmark regression gate against a committed baseline.
+
+The stage benchmarks are rerun on the tests/data corpus and on synthetic
+diagrams, and the median of every stage is compared with the baseline in
+benchmarks/baseline.json. The command exits with status 1 and prints a table
+of the regressed stages when any stage is slower than the baseline by more
+than the tolerance.
+
+Every round of measurements runs in a fresh Python process and the medians
+over the rounds are compared. Times are normalized by a fixed calibration
+workload that is timed next to every case and stored with the baseline, so
+that a baseline recorded on one machine remains usable on a faster or slower
+one. Stages that look regressed are measured again before they are reported.
+
+Usage:
+    python -m benchmarks.gate                  # compare with the baseline
+    python -m benchmarks.gate --tolerance 0.25 # allow 25% slowdown
+    python -m benchmarks.gate --update         # record a new baseline
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from benchmarks.generator import SHAPES, generate_content, generate_graph
+from benchmarks.run import STAGES, prepare_stages
+from benchmarks.timing import DEFAULT_MIN_TIME, measure
+from plantuml2drawio.config import VERSION
+from plantuml2drawio.models import Edge, Node
+from plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+CORPUS_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), "tests", "data")
+
+# Minimum total run time per measurement; each case is measured in several
+# rounds, so this is lower than for a single benchmark run
+GATE_MIN_TIME = 0.05
+
+# Node counts of the synthetic diagrams
+GATE_SIZES = (1000, 10000)
+
+# Accepted slowdown relative to the baseline, 0.5 meaning 50% slower; shared
+# build machines easily vary by 30% between runs
+DEFAULT_TOLERANCE = 0.5
+
+# Slowdowns smaller than this many seconds are never reported, as they are
+# within the noise of very short stages
+NOISE_FLOOR = 5e-5
+
+# Medians of a measurement are taken over at least this many runs
+GATE_MIN_REPEAT = 5
+
+# Number of processes measuring all cases
+DEFAULT_ROUNDS = 5
+
+# Number of times a regressed stage is measured again before it is reported
+DEFAULT_RETRIES = 2
+
+
+class Regression(NamedTuple):
+    """A stage that got slower than the baseline allows."""
+
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change of the time, 0.5 meaning 50% slower."""
+        return self.current / self.baseline - 1
+
+
+def calibrate(min_time: float = DEFAULT_MIN_TIME) -> float:
+    """Time a fixed pure-Python workload as a measure of machine speed.
+
+    Args:
+        min_time: Minimum total run time of the measurement in seconds
+
+    Returns:
+        Median seconds of one run of the workload
+    """
+
+    def workload():
+        total = 0
+        text = []
+        for i in range(20000):
+            total += i * i % 7
+            text.append(str(i))
+        return total, "".join(text)
+
+    return statistics.median(measure(workload, min_time, GATE_MIN_REPEAT))
+
+
+def gate_cases() -> List[Tuple[str, Optional[str], Tuple]]:
+    """Return the benchmark cases of the gate.
+
+    Returns:
+        List of (case name, PlantUML content or None, (nodes, edges))
+    """
+    cases: List[Tuple[str, Optional[str], Tuple]] = []
+    processor = ActivityDiagramProcessor()
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.puml"))):
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        if not processor.is_valid_diagram(content):
+            continue
+        name = "corpus/" + os.path.basename(path)
+        cases.append((name, content, processor.parse_diagram(content)))
+
+    for shape in SHAPES:
+        for size in GATE_SIZES:
+            name = f"synthetic/{shape}-{size}"
+            cases.append(
+                (name, generate_content(shape, size), generate_graph(shape, size))
+            )
+    return cases
+
+
+def _measure_case(
+    content: Optional[str],
+    nodes: List[Node],
+    edges: List[Edge],
+    min_time: float,
+    stages: Optional[Set[str]] = None,
+) -> Dict:
+    """Measure the stages of one case and the calibration workload next to it.
+
+    Args:
+        content: PlantUML content of the case, if there is any
+        nodes: Parsed nodes of the case
+        edges: Parsed edges of the case
+        min_time: Minimum total run time per measurement in seconds
+        stages: Names of the stages to measure; all stages if None
+
+    Returns:
+        Dictionary with the calibration time and the stage medians
+    """
+    functions = prepare_stages(content, nodes, edges)
+    return {
+        "calibration": calibrate(min_time),
+        "stages": {
+            stage: statistics.median(measure(function, min_time, GATE_MIN_REPEAT))
+            for stage, function in functions.items()
+            if stages is None or stage in stages
+        },
+    }
+
+
+def measure_round(
+    min_time: float = GATE_MIN_TIME, selection: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, Dict]:
+    """Measure the cases once in the current process.
+
+    Args:
+        min_time: Minimum total run time per measurement in seconds
+        selection: Case name to the stages to measure; all cases if None
+
+    Returns:
+        Case name to the calibration time and the stage medians
+    """
+    measured = {}
+    for name, content, (nodes, edges) in gate_cases():
+        if selection is not None and name not in selection:
+            continue
+        stages = None if selection is None else set(selection[name])
+        measured[name] = _measure_case(content, nodes, edges, min_time, stages)
+    return measured
+
+
+def _run_worker(
+    min_time: float, selection: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, Dict]:
+    """Run measure_round in a fresh Python process and return its result."""
+    command = [sys.executable, "-m", "benchmarks.gate", "--worker"]
+    command += ["--min-time", str(min_time)]
+    completed = subprocess.run(
+        command,
+        input=json.dumps(selection),
+        capture_output=True,
+        check=True,
+        cwd=os.path.dirname(BENCHMARK_DIR),
+        text=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def collect(
+    min_time: float = GATE_MIN_TIME,
+    rounds: int = DEFAULT_ROUNDS,
+    progress: bool = True,
+    selection: Optional[Dict[str, List[str]]] = None,
+) -> Dict:
+    """Measure the median time of every stage of every case.
+
+    Every round measures all cases in a fresh Python process and each value
+    is the median over the rounds. Timings differ noticeably between
+    processes, e.g. by memory layout and hash seed, so a single process can
+    be consistently fast or slow in some cases. The calibration time of the
+    document is the median of the calibration runs next to all cases.
+
+    Args:
+        min_time: Minimum total run time per measurement in seconds
+        rounds: Number of processes measuring all cases
+        progress: If True, report each finished round on stderr
+        selection: Case name to the stages to measure; all cases if None
+
+    Returns:
+        Document with the calibration time and the stage medians per case
+    """
+    calibrations: List[float] = []
+    measured: Dict[str, Dict[str, List[float]]] = {}
+    for round_number in range(rounds):
+        for name, result in _run_worker(min_time, selection).items():
+            calibrations.append(result["calibration"])
+            case = measured.setdefault(name, {})
+            for stage, seconds in result["stages"].items():
+                case.setdefault(stage, []).append(seconds)
+        if progress:
+            print(f"Finished round {round_number + 1} of {rounds}", file=sys.stderr)
+
+    return {
+        "version": VERSION,
+        "calibration": statistics.median(calibrations),
+        "cases": {
+            name: {stage: statistics.median(times) for stage, times in case.items()}
+            for name, case in measured.items()
+        },
+    }
+
+
+def confirm(
+    baseline: Dict,
+    current: Dict,
+    regressions: Sequence[Regression],
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_time: float = GATE_MIN_TIME,
+    rounds: int = DEFAULT_ROUNDS,
+    retries: int = DEFAULT_RETRIES,
+) -> List[Regression]:
+    """Measure regressed stages again and keep those that stay slow.
+
+    A stage only counts as regressed if it is too slow in every attempt, so
+    a burst of load on the machine does not fail the gate. The fastest
+    normalized time of all attempts is kept in current.
+
+    Args:
+        baseline: Baseline document as written by collect
+        current: Current document, updated in place
+        regressions: Regressions as returned by compare
+        tolerance: Accepted relative slowdown
+        min_time: Minimum total run time per measurement in seconds
+        rounds: Number of processes per attempt
+        retries: Number of additional attempts
+
+    Returns:
+        The regressions that were confirmed by every attempt
+    """
+    for _ in range(retries):
+        if not regressions:
+            break
+        selection: Dict[str, List[str]] = {}
+        for regression in regressions:
+            selection.setdefault(regression.case, []).append(regression.stage)
+
+        retry = collect(min_time, rounds, progress=False, selection=selection)
+        # Express the retry in the calibration of the first attempt
+        scale = current["calibration"] / retry["calibration"]
+        for case, stages in retry["cases"].items():
+            measured_case = current["cases"][case]
+            for stage, seconds in stages.items():
+                measured_case[stage] = min(measured_case[stage], seconds * scale)
+        regressions = [
+            regression
+            for regression in compare(baseline, current, tolerance)
+            if regression.stage in selection.get(regression.case, ())
+        ]
+    return list(regressions)
+
+
+def compare(
+    baseline: Dict, current: Dict, tolerance: float = DEFAULT_TOLERANCE
+) -> List[Regression]:
+    """Find the stages that regressed beyond the tolerance.
+
+    The current times are scaled by the ratio of the calibration times, so
+    they are compared as if measured on the machine of the baseline. Cases
+    and stages missing from either document are skipped.
+
+    Args:
+        baseline: Baseline document as written by collect
+        current: Current document as written by collect
+        tolerance: Accepted relative slowdown
+
+    Returns:
+        The regressions, in the order of the current cases
+    """
+    regressions = []
+    scale = baseline["calibration"] / current["calibration"]
+    for case, measured_case in current["cases"].items():
+        baseline_case = baseline["cases"].get(case)
+        if baseline_case is None:
+            continue
+        for stage in STAGES:
+            if stage not in measured_case or stage not in baseline_case:
+                continue
+            expected = baseline_case[stage]
+            measured = measured_case[stage] * scale
+            if (
+                measured > expected * (1 + tolerance)
+                and measured - expected > NOISE_FLOOR
+            ):
+                regressions.append(Regression(case, stage, expected, measured))
+    return regressions
+
+
+def format_report(regressions: Sequence[Regression], tolerance: float) -> str:
+    """Format regressions as a readable table.
+
+    Args:
+        regressions: Regressions as returned by compare
+        tolerance: Tolerance the regressions were found with
+
+    Returns:
+        The report as text
+    """
+    if not regressions:
+        return f"No stage regressed by more than {tolerance:.0%}."
+
+    width = max(len(regression.case) for regression in regressions)
+    lines = [
+        f"{len(regressions)} stage(s) regressed by more than {tolerance:.0%}:",
+        f"{'case':<{width}}  {'stage':<8} {'baseline':>12} {'current':>12} "
+        f"{'change':>8}",
+    ]
+    for regression in regressions:
+        lines.append(
+            f"{regression.case:<{width}}  {regression.stage:<8} "
+            f"{regression.baseline * 1000:>9.3f} ms "
+            f"{regression.current * 1000:>9.3f} ms "
+            f"{regression.change:>+8.0%}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Run the regression gate as requested on the command line."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare the stage benchmarks with a stored baseline and fail on "
+            "regressions."
+        )
+    )
+    parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON file (default: benchmarks/baseline.json).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=(
+            "Accepted relative slowdown per stage, e.g. 0.25 for 25%% "
+            f"(default: {DEFAULT_TOLERANCE})."
+        ),
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=GATE_MIN_TIME,
+        help=(
+            "Minimum total run time per measurement in seconds "
+            f"(default: {GATE_MIN_TIME})."
+        ),
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help=f"Processes measuring all cases (default: {DEFAULT_ROUNDS}).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=(
+            "Times a regressed stage is measured again before it is reported "
+            f"(default: {DEFAULT_RETRIES})."
+        ),
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Write the measured times as the new baseline instead of comparing.",
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Measure one round for collect, with the selected cases read as JSON
+        json.dump(measure_round(args.min_time, json.load(sys.stdin)), sys.stdout)
+        return
+
+    if not args.update and not os.path.exists(args.baseline):
+        print(f"Error: Baseline '{args.baseline}' does not exist, use --update")
+        sys.exit(1)
+
+    current = collect(args.min_time, args.rounds)
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = confirm(
+        baseline,
+        current,
+        compare(baseline, current, args.tolerance),
+        args.tolerance,
+        args.min_time,
+        args.rounds,
+        args.retries,
+    )
+    print(format_report(regressions, args.tolerance))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Generator for synthetic activity diagrams of parametric size and shape.
+
+Every shape produces roughly the requested number of nodes:
+
+- chain: one long sequence of activities
+- nested: if blocks nested inside each other
+- fanout: wide elseif chains, the closest the parser gets to a fork
+- disconnected: many small components that are not connected to each other
+- labels: a sequence of activities with long multi-line labels
+
+The parser and the graph builder recurse once per nesting level, so nested
+and fanout diagrams are built from groups of bounded depth that follow each
+other. Disconnected components cannot be written as PlantUML the parser
+accepts, as it links every statement into one flow, so that shape is only
+available as a graph.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from plantuml2drawio.models import Edge, Node
+from plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+
+# Nesting depth of one group of nested if blocks or elseif branches
+MAX_GROUP_DEPTH = 50
+
+# Lines and line length of the labels of the labels shape
+LABEL_LINES = 6
+LABEL_LINE_LENGTH = 60
+
+
+def _wrap(body: List[str]) -> str:
+    """Wrap diagram lines into a complete activity diagram."""
+    return "\n".join(["@startuml", "start", *body, "stop", "@enduml", ""])
+
+
+def _chain(size: int) -> str:
+    """Return a chain of activities with about size nodes."""
+    return _wrap([f":Step {i};" for i in range(max(size - 2, 1))])
+
+
+def _nested(size: int) -> str:
+    """Return groups of nested if blocks with about size nodes."""
+    # Every level adds a decision, an activity and a merge node
+    levels = max((size - 2) // 3, 1)
+    body = []
+    done = 0
+    while done < levels:
+        depth = min(MAX_GROUP_DEPTH, levels - done)
+        for level in range(depth):
+            body.append(f"if (condition {done + level}?) then (yes)")
+            body.append(f":Nested step {done + level};")
+        body.extend(["endif"] * depth)
+        done += depth
+    return _wrap(body)
+
+
+def _fanout(size: int) -> str:
+    """Return groups of wide elseif chains with about size nodes."""
+    # Every branch adds a decision, an activity and a merge node
+    branches = max((size - 2) // 3, 1)
+    body = []
+    done = 0
+    while done < branches:
+        width = min(MAX_GROUP_DEPTH, branches - done)
+        body.append(f"if (case {done}?) then (yes)")
+        body.append(f":Branch {done};")
+        for branch in range(done + 1, done + width):
+            body.append(f"elseif (case {branch}?) then (yes)")
+            body.append(f":Branch {branch};")
+        body.append("endif")
+        done += width
+    return _wrap(body)
+
+
+def _labels(size: int) -> str:
+    """Return a chain of activities with long multi-line labels."""
+    line = "x" * LABEL_LINE_LENGTH
+    label = "\n".join(f"{line} {n}" for n in range(LABEL_LINES))
+    return _wrap([f":Step {i}\n{label};" for i in range(max(size - 2, 1))])
+
+
+CONTENT_SHAPES: Dict[str, Callable[[int], str]] = {
+    "chain": _chain,
+    "nested": _nested,
+    "fanout": _fanout,
+    "labels": _labels,
+}
+
+SHAPES = ("chain", "nested", "fanout", "disconnected", "labels")
+
+
+def generate_content(shape: str, size: int) -> Optional[str]:
+    """Generate the PlantUML content of a synthetic diagram.
+
+    Args:
+        shape: One of SHAPES
+        size: Approximate number of nodes
+
+    Returns:
+        PlantUML content, or None if the shape cannot be written as PlantUML
+
+    Raises:
+        ValueError: If the shape is unknown
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape: {shape}")
+    if shape not in CONTENT_SHAPES:
+        return None
+    return CONTENT_SHAPES[shape](size)
+
+
+def generate_graph(shape: str, size: int) -> Tuple[List[Node], List[Edge]]:
+    """Generate the nodes and edges of a synthetic diagram.
+
+    Args:
+        shape: One of SHAPES
+        size: Approximate number of nodes
+
+    Returns:
+        A tuple of (nodes, edges), not yet laid out
+
+    Raises:
+        ValueError: If the shape is unknown
+    """
+    content = generate_content(shape, size)
+    if content is not None:
+        return ActivityDiagramProcessor().parse_diagram(content)
+
+    # Disconnected: components of three activities each
+    nodes = []
+    edges = []
+    for i in range(max(size, 3)):
+        nodes.append(Node(str(10 + i), f"Part {i // 3} step {i % 3}", "activity"))
+        if i % 3:
+            edges.append(Edge(str(9 + i), str(10 + i)))
+    return nodes, edges
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Benchmark the conversion stages on synthetic diagrams of growing size.
+
+For every shape of the generator and every size, the stages parse_diagram,
+layout_diagram, export_to_drawio and the end-to-end process_diagram are
+timed. The results are written as JSON together with a fitted complexity
+exponent per shape and stage, so a stage that turns quadratic stands out
+with an exponent near 2.
+
+Usage:
+    python -m benchmarks.run --output benchmark-results.json
+    python -m benchmarks.run --shapes chain,nested --sizes 100,1000,10000
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+from typing import Callable, Dict, List, Optional, Sequence
+
+from benchmarks.generator import SHAPES, generate_content, generate_graph
+from benchmarks.timing import (DEFAULT_MIN_TIME, fit_exponent, measure,
+                               summarize)
+from plantuml2drawio.config import VERSION
+from plantuml2drawio.core import process_diagram
+from plantuml2drawio.models import Edge, Node
+from plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+
+STAGES = ("parse", "layout", "export", "process")
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+
+def prepare_stages(
+    content: Optional[str], nodes: List[Node], edges: List[Edge]
+) -> Dict[str, Callable[[], object]]:
+    """Return the timed function of each stage for one diagram.
+
+    Stages that need PlantUML content are left out if content is None. The
+    layout stage lays out the given nodes, so export, which runs after it,
+    works on a laid-out diagram.
+
+    Args:
+        content: PlantUML content of the diagram, if there is any
+        nodes: Parsed nodes of the diagram
+        edges: Parsed edges of the diagram
+
+    Returns:
+        Dictionary of stage name to a function running the stage
+    """
+    processor = ActivityDiagramProcessor()
+    stages: Dict[str, Callable[[], object]] = {}
+    if content is not None:
+        stages["parse"] = lambda: processor.parse_diagram(content)
+    stages["layout"] = lambda: processor.layout_diagram(nodes, edges)
+    stages["export"] = lambda: processor.export_to_drawio(nodes, edges)
+    if content is not None:
+        stages["process"] = lambda: process_diagram(content)
+    return stages
+
+
+def benchmark_shape(
+    shape: str, sizes: Sequence[int], min_time: float = DEFAULT_MIN_TIME
+) -> Dict:
+    """Time all stages of one shape at the given sizes.
+
+    Args:
+        shape: Shape of the generated diagrams
+        sizes: Approximate node counts to benchmark
+        min_time: Minimum total run time per measurement in seconds
+
+    Returns:
+        Dictionary of stage name to its measurements and fitted exponent
+    """
+    results: Dict[str, Dict] = {}
+    for size in sizes:
+        content = generate_content(shape, size)
+        nodes, edges = generate_graph(shape, size)
+        for stage, function in prepare_stages(content, nodes, edges).items():
+            point = summarize(measure(function, min_time))
+            point.update({"size": size, "nodes": len(nodes), "edges": len(edges)})
+            results.setdefault(stage, {"points": []})["points"].append(point)
+
+    for stage_results in results.values():
+        stage_results["exponent"] = fit_exponent(
+            [(point["nodes"], point["median"]) for point in stage_results["points"]]
+        )
+    return results
+
+
+def run_benchmarks(
+    shapes: Sequence[str],
+    sizes: Sequence[int],
+    min_time: float = DEFAULT_MIN_TIME,
+    progress: bool = True,
+) -> Dict:
+    """Benchmark several shapes and collect the results in one document.
+
+    Args:
+        shapes: Shapes of the generated diagrams
+        sizes: Approximate node counts to benchmark
+        min_time: Minimum total run time per measurement in seconds
+        progress: If True, report each finished shape on stderr
+
+    Returns:
+        JSON-serializable benchmark results
+    """
+    results = {
+        "version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "sizes": list(sizes),
+        "shapes": {},
+    }
+    for shape in shapes:
+        results["shapes"][shape] = benchmark_shape(shape, sizes, min_time)
+        if progress:
+            print(f"Finished {shape}", file=sys.stderr)
+    return results
+
+
+def format_summary(results: Dict) -> str:
+    """Format the fitted exponents of all shapes and stages as a table.
+
+    Args:
+        results: Results as returned by run_benchmarks
+
+    Returns:
+        The table as text
+    """
+    lines = [f"{'shape':<14}" + "".join(f"{stage:>10}" for stage in STAGES)]
+    for shape, stages in results["shapes"].items():
+        cells = []
+        for stage in STAGES:
+            exponent = stages.get(stage, {}).get("exponent")
+            cells.append(f"{'-':>10}" if exponent is None else f"{exponent:>10.2f}")
+        lines.append(f"{shape:<14}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def _parse_list(value: str) -> List[str]:
+    """Split a comma-separated command line value."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    """Run the benchmarks as requested on the command line."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark parse, layout, export and end-to-end conversion on "
+            "synthetic activity diagrams and fit a complexity exponent per stage."
+        )
+    )
+    parser.add_argument(
+        "--shapes",
+        default=",".join(SHAPES),
+        help=f"Comma-separated shapes (default: {','.join(SHAPES)}).",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated approximate node counts (default: 10 to 100000).",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help="Minimum total run time per measurement in seconds.",
+    )
+    parser.add_argument(
+        "--output", help="Write the results as JSON to this file (default: stdout)."
+    )
+    args = parser.parse_args()
+
+    shapes = _parse_list(args.shapes)
+    unknown = [shape for shape in shapes if shape not in SHAPES]
+    if unknown:
+        parser.error(f"unknown shapes: {', '.join(unknown)}")
+    try:
+        sizes = sorted(int(size) for size in _parse_list(args.sizes))
+    except ValueError:
+        parser.error("sizes must be integers")
+
+    results = run_benchmarks(shapes, sizes, args.min_time)
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+        print(format_summary(results))
+    else:
+        print(document)
+        print(format_summary(results), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Timing helpers shared by the benchmarks, using the standard library only."""
+
+import gc
+import math
+import statistics
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Minimum total run time per measurement; fast functions are repeated until
+# it is reached, so their median is not dominated by timer noise
+DEFAULT_MIN_TIME = 0.2
+
+# Bounds for the number of runs per measurement
+DEFAULT_MIN_REPEAT = 3
+DEFAULT_MAX_REPEAT = 1000
+
+# Measurements faster than this are too noisy to fit a complexity exponent
+MIN_FIT_SECONDS = 1e-4
+
+
+def measure(
+    function: Callable[[], object],
+    min_time: float = DEFAULT_MIN_TIME,
+    min_repeat: int = DEFAULT_MIN_REPEAT,
+    max_repeat: int = DEFAULT_MAX_REPEAT,
+) -> List[float]:
+    """Run a function repeatedly and return the time of each run.
+
+    The number of runs adapts to the function: it is repeated at least
+    min_repeat times and then until min_time seconds have passed in total or
+    max_repeat runs are reached. Like timeit, the garbage collector is
+    disabled while timing.
+
+    Args:
+        function: Function to time, called without arguments
+        min_time: Minimum total run time in seconds
+        min_repeat: Minimum number of runs
+        max_repeat: Maximum number of runs
+
+    Returns:
+        Seconds of each run
+    """
+    times: List[float] = []
+    total = 0.0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(times) < min_repeat or (
+            total < min_time and len(times) < max_repeat
+        ):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            times.append(elapsed)
+            total += elapsed
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return times
+
+
+def summarize(times: Sequence[float]) -> dict:
+    """Summarize the run times of a measurement.
+
+    Args:
+        times: Seconds of each run
+
+    Returns:
+        Dictionary with the median, minimum, maximum and number of runs
+    """
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+        "repeats": len(times),
+    }
+
+
+def fit_exponent(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Fit the exponent k of time ~ size**k by least squares on a log scale.
+
+    A linear stage has an exponent around 1 and a quadratic one around 2.
+    Points below MIN_FIT_SECONDS are left out as too noisy.
+
+    Args:
+        points: Pairs of (size, seconds)
+
+    Returns:
+        The fitted exponent, or None if fewer than two points are usable
+    """
+    usable = [
+        (math.log(size), math.log(seconds))
+        for size, seconds in points
+        if size > 0 and seconds >= MIN_FIT_SECONDS
+    ]
+    if len({x for x, _ in usable}) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in usable)
+    variance = sum((x - mean_x) ** 2 for x, _ in usable)
+    return covariance / variance
@@ -23,6 +23,8 @@ setup(
         "console_scripts": [
             "p2d-cli=plantuml2drawio.core:main",
             "p2d-gui=plantuml2drawio.app:main",
+            "p2d-server=plantuml2drawio.server:main",
+            "p2d-http=plantuml2drawio.http_server:main",
         ],
     },
     classifiers=[
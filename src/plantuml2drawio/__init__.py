@@ -1,9 +1,10 @@
-"""PlantUML to Draw.io Converter."""
+"""PlantUML to Draw.io Converter.
 
-from .logging_config import setup_logging
-
-# Set up default logging configuration
-setup_logging()
+Importing the package has no side effects; in particular it does not
+configure logging. The command line and GUI entry points call
+plantuml2drawio.logging_config.setup_logging themselves, and applications
+embedding the package keep their own logging configuration.
+"""
 
 __author__ = "doubleSlash.de"
 __copyright__ = "Copyright 2025, doubleSlash.de"
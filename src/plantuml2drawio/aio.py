@@ -0,0 +1,262 @@
+"""asyncio layer of the library API.
+
+The conversions themselves are CPU-bound, so they run on an executor and
+never block the event loop: by default on the thread pool of the loop, or on
+any given executor, e.g. a ProcessPoolExecutor to convert in parallel. File
+reads and writes run on the thread pool of the loop as well. A single event
+loop can therefore keep many conversions in flight.
+
+Every call can be given a timeout and can be cancelled. A conversion that
+has already started on a worker cannot be interrupted, though; it finishes
+in the background and its result is discarded.
+"""
+
+import asyncio
+import collections
+import functools
+from concurrent.futures import Executor
+from typing import (AsyncIterable, AsyncIterator, Callable, Deque, Hashable,
+                    Iterable, List, Optional, Set, Tuple, TypeVar, Union)
+
+from plantuml2drawio import api
+from plantuml2drawio.api import ConversionResult
+from plantuml2drawio.core import ConversionError
+from plantuml2drawio.stats import ConversionStats
+
+# Conversions in flight in convert_many when max_concurrency is not given
+DEFAULT_MAX_CONCURRENCY = 4
+
+T = TypeVar("T")
+
+
+class ConversionTimeoutError(ConversionError):
+    """Error of a conversion that took longer than its timeout."""
+
+
+async def convert(
+    content: str,
+    output_json: bool = False,
+    cache_dir: Optional[str] = None,
+    key: Hashable = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> ConversionResult:
+    """Convert one diagram on an executor without blocking the event loop.
+
+    Args:
+        content: Content of the PlantUML diagram
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        key: Key returned with the result
+        executor: Executor to convert on; None uses the loop's default
+        timeout: Seconds after which the result is a ConversionTimeoutError,
+            including the time spent waiting for the semaphore
+        semaphore: Optional semaphore shared by the conversions that may
+            not run at the same time
+
+    Returns:
+        ConversionResult describing the outcome; on timeout its error is a
+        ConversionTimeoutError
+
+    Raises:
+        asyncio.CancelledError: If the calling task is cancelled
+    """
+    call = functools.partial(api.convert, content, output_json, cache_dir, key)
+    try:
+        return await asyncio.wait_for(_run(call, executor, semaphore), timeout)
+    except asyncio.TimeoutError:
+        error = ConversionTimeoutError(f"Conversion timed out after {timeout} s")
+        return ConversionResult(key, None, None, ConversionStats(), timeout, error)
+
+
+async def convert_file(
+    input_path: str,
+    output_path: Optional[str] = None,
+    output_json: bool = False,
+    cache_dir: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> ConversionResult:
+    """Read, convert and write a file without blocking the event loop.
+
+    Args:
+        input_path: Path to the PlantUML file, also the key of the result
+        output_path: Path to the output file; None only converts
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        executor: Executor to convert on; None uses the loop's default
+        timeout: Seconds allowed for the conversion, see convert
+        semaphore: Optional semaphore limiting concurrent conversions
+
+    Returns:
+        ConversionResult describing the outcome; reading and writing errors
+        are reported as ConversionError
+    """
+    try:
+        content = await read_file(input_path)
+    except (OSError, UnicodeDecodeError) as e:
+        error = ConversionError(f"Error reading input file '{input_path}': {e}")
+        stats = ConversionStats()
+        return ConversionResult(input_path, None, None, stats, 0.0, error)
+
+    result = await convert(
+        content, output_json, cache_dir, input_path, executor, timeout, semaphore
+    )
+    if result.ok and output_path is not None:
+        try:
+            await write_file(result.output, output_path)
+        except OSError as e:
+            error = ConversionError(f"Error writing output file '{output_path}': {e}")
+            result = result._replace(error=error)
+    return result
+
+
+async def convert_many(
+    items: Union[
+        Iterable[Tuple[Hashable, str]], AsyncIterable[Tuple[Hashable, str]]
+    ],
+    output_json: bool = False,
+    cache_dir: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    ordered: bool = False,
+) -> AsyncIterator[ConversionResult]:
+    """Convert a stream of diagrams, yielding each result as it is ready.
+
+    The input, which may be an async iterable, is consumed lazily: the next
+    item is only taken while fewer than max_concurrency conversions are in
+    flight. Closing the generator early cancels the conversions in flight.
+
+    Args:
+        items: Pairs of (key, PlantUML content)
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        executor: Executor to convert on; None uses the loop's default
+        timeout: Seconds allowed for each conversion, see convert
+        max_concurrency: Upper bound of conversions in flight
+        semaphore: Optional semaphore shared with other callers, e.g. to
+            limit the conversions of a whole service
+        ordered: If True, yield the results in input order, otherwise in the
+            order they finish
+
+    Yields:
+        ConversionResult objects
+    """
+    max_concurrency = max(1, max_concurrency)
+    pending: Deque[asyncio.Future] = collections.deque()
+    try:
+        async for key, content in _aiter(items):
+            pending.append(
+                asyncio.ensure_future(
+                    convert(
+                        content,
+                        output_json,
+                        cache_dir,
+                        key,
+                        executor,
+                        timeout,
+                        semaphore,
+                    )
+                )
+            )
+            while len(pending) >= max_concurrency:
+                for result in await _take_results(pending, ordered):
+                    yield result
+        while pending:
+            for result in await _take_results(pending, ordered):
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def read_file(path: str) -> str:
+    """Read a UTF-8 text file on the loop's thread pool.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Content of the file
+
+    Raises:
+        OSError: If the file cannot be read
+        UnicodeDecodeError: If the file is not valid UTF-8
+    """
+    return await _run(functools.partial(_read_text, path))
+
+
+async def write_file(content: str, path: str) -> None:
+    """Write a UTF-8 text file on the loop's thread pool.
+
+    Args:
+        content: Content to write
+        path: Path to the file
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    await _run(functools.partial(_write_text, content, path))
+
+
+def _read_text(path: str) -> str:
+    """Read a UTF-8 text file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_text(content: str, path: str) -> None:
+    """Write a UTF-8 text file."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+async def _run(
+    call: Callable[[], T],
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> T:
+    """Run a call on an executor, holding the semaphore meanwhile."""
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
+
+
+async def _aiter(
+    items: Union[Iterable[T], AsyncIterable[T]]
+) -> AsyncIterator[T]:
+    """Iterate over a synchronous or an asynchronous iterable."""
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _take_results(
+    pending: Deque[asyncio.Future], ordered: bool
+) -> List[ConversionResult]:
+    """Wait until at least one result is available and return the finished.
+
+    In input order only the oldest conversion can be returned; otherwise all
+    conversions that have finished are returned.
+    """
+    if ordered:
+        return [await pending.popleft()]
+
+    done: Set[asyncio.Future]
+    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finished = [task for task in pending if task in done]
+    remaining = [task for task in pending if task not in done]
+    pending.clear()
+    pending.extend(remaining)
+    return [task.result() for task in finished]
@@ -0,0 +1,206 @@
+"""Library API for converting many diagrams as a stream.
+
+convert converts one diagram and convert_many a whole stream of them.
+Instead of printing errors and returning (None, None) like
+core.process_diagram, both return ConversionResult objects that carry the
+output, its format, the timings of every stage and the error, if any.
+
+convert_many pulls its input lazily and can run the conversions on a thread
+or process pool. Only a bounded number of conversions are in flight at a
+time, and the next input is only taken once a result has been consumed, so
+a fast producer cannot outrun a slow consumer.
+"""
+
+import collections
+import os
+import time
+from concurrent.futures import (FIRST_COMPLETED, Executor, Future,
+                                ProcessPoolExecutor, ThreadPoolExecutor,
+                                wait)
+from typing import (Deque, Hashable, Iterable, Iterator, NamedTuple, Optional,
+                    Tuple, Union)
+
+from plantuml2drawio.core import ConversionError, convert_content
+from plantuml2drawio.stats import ConversionStats
+
+# Executors that convert_many can create by name
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# Conversions in flight per worker when max_pending is not given
+PENDING_PER_WORKER = 2
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of converting one diagram.
+
+    Attributes:
+        key: Key the content was passed with, e.g. its file name.
+        output: Draw.io XML or JSON, or None on failure.
+        output_format: Description of the output format, or None on failure.
+        stats: Time of each stage, node and edge counts and output size.
+        seconds: Wall-clock time of the whole conversion.
+        error: The error on failure, None on success.
+    """
+
+    key: Hashable
+    output: Optional[str]
+    output_format: Optional[str]
+    stats: ConversionStats
+    seconds: float
+    error: Optional[ConversionError] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the diagram was converted."""
+        return self.error is None
+
+
+def convert(
+    content: str,
+    output_json: bool = False,
+    cache_dir: Optional[str] = None,
+    key: Hashable = None,
+) -> ConversionResult:
+    """Convert one diagram and return the outcome instead of raising.
+
+    Args:
+        content: Content of the PlantUML diagram
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        key: Key returned with the result
+
+    Returns:
+        ConversionResult describing the outcome
+    """
+    cache = None
+    if cache_dir:
+        from plantuml2drawio.cache import get_cache
+
+        cache = get_cache(cache_dir)
+
+    stats = ConversionStats()
+    started = time.perf_counter()
+    try:
+        output, output_format = convert_content(
+            content, output_json, cache, stats=stats
+        )
+        error = None
+    except ConversionError as e:
+        output, output_format, error = None, None, e
+    except Exception as e:
+        output, output_format = None, None
+        error = ConversionError(f"Unexpected error: {e}")
+    return ConversionResult(
+        key, output, output_format, stats, time.perf_counter() - started, error
+    )
+
+
+def convert_many(
+    items: Iterable[Tuple[Hashable, str]],
+    output_json: bool = False,
+    cache_dir: Optional[str] = None,
+    executor: Union[None, str, Executor] = None,
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    ordered: bool = False,
+) -> Iterator[ConversionResult]:
+    """Convert a stream of diagrams, yielding each result as it is ready.
+
+    The input is consumed lazily. Without an executor, every item is
+    converted in the calling thread when the next result is requested.
+    With an executor, at most max_pending conversions are submitted but not
+    yet consumed; further input is only taken as results are consumed.
+    Closing the generator early cancels the conversions that have not
+    started.
+
+    Args:
+        items: Pairs of (key, PlantUML content), e.g. from a generator
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        executor: None converts in the calling thread, EXECUTOR_THREAD or
+            EXECUTOR_PROCESS creates a pool that is shut down at the end,
+            and an Executor instance is used as it is. Processes convert in
+            parallel; threads only help while waiting for the cache.
+        max_workers: Number of workers of a created pool; None uses the
+            default of the pool
+        max_pending: Upper bound of conversions in flight; None allows
+            PENDING_PER_WORKER per worker
+        ordered: If True, yield the results in input order, otherwise in the
+            order they finish
+
+    Yields:
+        ConversionResult objects
+
+    Raises:
+        ValueError: If executor is an unknown name
+    """
+    if executor is None:
+        for key, content in items:
+            yield convert(content, output_json, cache_dir, key)
+        return
+
+    owned = None
+    if isinstance(executor, str):
+        owned = executor = _create_executor(executor, max_workers)
+    if max_pending is None:
+        max_pending = (max_workers or os.cpu_count() or 1) * PENDING_PER_WORKER
+    max_pending = max(1, max_pending)
+
+    pending: Deque[Tuple[Hashable, Future]] = collections.deque()
+    try:
+        for key, content in items:
+            future = executor.submit(convert, content, output_json, cache_dir, key)
+            pending.append((key, future))
+            if len(pending) >= max_pending:
+                yield from _take_results(pending, ordered)
+        while pending:
+            yield from _take_results(pending, ordered)
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if owned is not None:
+            owned.shutdown(wait=True)
+
+
+def _create_executor(name: str, max_workers: Optional[int]) -> Executor:
+    """Create a thread or process pool by name."""
+    if name == EXECUTOR_THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if name == EXECUTOR_PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor: {name}")
+
+
+def _take_results(
+    pending: Deque[Tuple[Hashable, Future]], ordered: bool
+) -> Iterator[ConversionResult]:
+    """Yield finished results, waiting until at least one is available.
+
+    In input order only the oldest conversion can be yielded; otherwise all
+    conversions that have finished are yielded.
+    """
+    if ordered:
+        yield _future_result(*pending.popleft())
+        return
+
+    done = wait([future for _, future in pending], return_when=FIRST_COMPLETED).done
+    finished = [(key, future) for key, future in pending if future in done]
+    remaining = [(key, future) for key, future in pending if future not in done]
+    pending.clear()
+    pending.extend(remaining)
+    for key, future in finished:
+        yield _future_result(key, future)
+
+
+def _future_result(key: Hashable, future: Future) -> ConversionResult:
+    """Return the result of a submitted conversion.
+
+    convert never raises, so an exception comes from the executor itself,
+    e.g. a worker process that died.
+    """
+    try:
+        return future.result()
+    except Exception as e:
+        error = ConversionError(f"Worker error: {e}")
+        return ConversionResult(key, None, None, ConversionStats(), 0.0, error)
@@ -8,12 +8,57 @@ os.environ['TK_SILENCE_DEPRECATION'] = '1'
 # Try to import from installed package or development path
 try:
     # Installed package path
-    from plantuml2drawio.config import VERSION, VERSION_DATE
+    from plantuml2drawio.config import DEFAULT_CACHE_DIR, VERSION, VERSION_DATE
+    from plantuml2drawio.gui_worker import (CONVERSION_STAGES, MSG_CANCELLED,
+                                            MSG_DONE, MSG_ERROR, MSG_STAGE,
+                                            READ_STAGES, BackgroundTask,
+                                            convert_to_file, read_diagram)
+    from plantuml2drawio.highlighting import (HIGHLIGHT_DELAY_MS,
+                                              TextHighlighter)
+    from plantuml2drawio.logging_config import setup_logging
+    from plantuml2drawio.processors import ProcessorRegistry
     from plantuml2drawio.processors.activity_processor import is_valid_activity_diagram
+    from plantuml2drawio.processors.result import (STAGE_EXPORT, STAGE_LAYOUT,
+                                                   STAGE_PARSE)
 except ImportError:
     # Development path
-    from src.plantuml2drawio.config import VERSION, VERSION_DATE
+    from src.plantuml2drawio.config import (DEFAULT_CACHE_DIR, VERSION,
+                                            VERSION_DATE)
+    from src.plantuml2drawio.gui_worker import (CONVERSION_STAGES,
+                                                MSG_CANCELLED, MSG_DONE,
+                                                MSG_ERROR, MSG_STAGE,
+                                                READ_STAGES, BackgroundTask,
+                                                convert_to_file, read_diagram)
+    from src.plantuml2drawio.highlighting import (HIGHLIGHT_DELAY_MS,
+                                                  TextHighlighter)
+    from src.plantuml2drawio.logging_config import setup_logging
+    from src.plantuml2drawio.processors import ProcessorRegistry
     from src.plantuml2drawio.processors.activity_processor import is_valid_activity_diagram
+    from src.plantuml2drawio.processors.result import (STAGE_EXPORT,
+                                                       STAGE_LAYOUT,
+                                                       STAGE_PARSE)
+
+# Messages shown for a failed stage of the conversion
+STAGE_ERROR_MESSAGES = {
+    "detect": "Fehler bei der Erkennung des Diagrammtyps: {}",
+    "validate": "Fehler bei der Prüfung des Diagramms: {}",
+    STAGE_PARSE: "Fehler beim Parsen des PlantUML-Codes: {}",
+    STAGE_LAYOUT: "Fehler beim Layout des Diagramms: {}",
+    STAGE_EXPORT: "Fehler bei der XML-Generierung: {}",
+}
+
+# Messages shown while a stage of a background task runs
+STAGE_PROGRESS_MESSAGES = {
+    "read": "Datei wird gelesen …",
+    "detect": "Diagrammtyp wird erkannt …",
+    "validate": "Diagramm wird geprüft …",
+    STAGE_PARSE: "PlantUML-Code wird geparst …",
+    STAGE_LAYOUT: "Layout wird berechnet …",
+    STAGE_EXPORT: "Draw.io-Datei wird geschrieben …",
+}
+
+# Milliseconds between two polls of a background task's messages
+TASK_POLL_INTERVAL_MS = 50
 
 
 class FileSelectorApp:
@@ -67,9 +112,23 @@ class FileSelectorApp:
         )
         self.file_button.grid(row=0, column=0, sticky="w")
 
-        # Spacer in the middle
-        spacer = ctk.CTkLabel(self.button_frame, text="")
-        spacer.grid(row=0, column=1, sticky="ew")
+        # Progress of a background task in the middle, only shown while it runs
+        self.progress_frame = ctk.CTkFrame(self.button_frame, fg_color="transparent")
+        self.progress_frame.grid(row=0, column=1, sticky="ew", padx=10)
+        self.progress_bar = ctk.CTkProgressBar(self.progress_frame, width=160)
+        self.progress_bar.grid(row=0, column=0, padx=(0, 10))
+        self.cancel_button = ctk.CTkButton(
+            self.progress_frame,
+            text="Abbrechen",
+            command=self.cancel_task,
+            font=("Arial", 14),
+            width=100,
+            height=32,
+            corner_radius=50,
+            fg_color="#9e0000",
+        )
+        self.cancel_button.grid(row=0, column=1)
+        self.progress_frame.grid_remove()
 
         # "Convert to Draw.io" button on the right;
         # initially disabled
@@ -156,9 +215,13 @@ class FileSelectorApp:
             "activity_content", "arrow"
         )  # Aktivitätstext hat Vorrang vor Pfeilen
 
-        # Initiales Update
+        # Highlighting and the button state follow edits after a short delay,
+        # so typing does not wait for work on the whole text
+        self.highlighter = TextHighlighter(self.tk_text)
+        self.highlighter.bind()
+        self._state_update = None
         self.text_widget.bind(
-            "<KeyRelease>", lambda event: self.update_text_and_button_state()
+            "<KeyRelease>", lambda event: self._schedule_state_update()
         )
 
         # Row 4: Footer with copyright notice
@@ -176,6 +239,10 @@ class FileSelectorApp:
 
         # Variable to store the current filename (without extension)
         self.current_file = None
+        self.current_file_path = None
+
+        # Background task that is running, see _start_task
+        self.task = None
 
     def create_menubar(self):
         """Erstellt eine Menüleiste für den schnellen Zugriff auf Hauptfunktionen."""
@@ -216,55 +283,71 @@ class FileSelectorApp:
         )
 
     def open_file(self):
-        """Open a file and display it in the text widget."""
+        """Open a file and display it in the text widget.
+
+        The file is read and its diagram type detected on a worker thread.
+        """
+        if self.task is not None:
+            return
+
         file_types = [("PlantUML Files", "*.puml"), ("All Files", "*.*")]
         file_path = self.ctk.filedialog.askopenfilename(
             title="Select a PlantUML File", filetypes=file_types
         )
 
         if file_path:
-            try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read()
+            self._start_task(
+                BackgroundTask(read_diagram, file_path),
+                READ_STAGES,
+                lambda loaded: self._show_file(file_path, *loaded),
+                self._show_file_error,
+            )
+        else:
+            # Zeige Nachricht im message_label statt im Text-Widget
+            self.message_label.configure(
+                text="Bitte wählen Sie eine PlantUML-Datei zur Konvertierung aus."
+            )
 
-                self.text_widget.delete("1.0", self.ctk.END)
-                self.text_widget.insert("1.0", content)
-                self.current_file_path = file_path
+    def _show_file(self, file_path, content, is_activity):
+        """Display a file read by open_file."""
+        self.text_widget.delete("1.0", self.ctk.END)
+        self.text_widget.insert("1.0", content)
+        self.apply_syntax_highlighting()
+        self.current_file_path = file_path
 
-                # Enable the convert button
-                self.convert_button.configure(state="normal")
+        # Enable the convert button
+        self.convert_button.configure(state="normal")
 
-                # Update diagram type
-                self.update_diagram_type(content)
+        # Update diagram type
+        self._show_diagram_type(is_activity)
 
-                # Aktualisiere die Nachricht
-                self.message_label.configure(text="PlantUML-Datei erfolgreich geladen.")
-            except Exception as e:
-                self.current_file_path = None
-                self.filename_label.configure(
-                    text="Keine Datei ausgewählt | Diagramm-Typ: -"
-                )
+        # Aktualisiere die Nachricht
+        self.message_label.configure(text="PlantUML-Datei erfolgreich geladen.")
 
-                # Zeige Fehler in message_label statt im Text-Widget
-                self.message_label.configure(text=f"Fehler beim Laden der Datei: {e}")
+    def _show_file_error(self, error):
+        """Report a file that open_file could not read."""
+        self.current_file_path = None
+        self.filename_label.configure(text="Keine Datei ausgewählt | Diagramm-Typ: -")
 
-                # Disable convert button
-                self.convert_button.configure(state="disabled")
-        else:
-            # Zeige Nachricht im message_label statt im Text-Widget
-            self.message_label.configure(
-                text="Bitte wählen Sie eine PlantUML-Datei zur Konvertierung aus."
-            )
+        # Zeige Fehler in message_label statt im Text-Widget
+        self.message_label.configure(text=f"Fehler beim Laden der Datei: {error}")
+
+        # Disable convert button
+        self.convert_button.configure(state="disabled")
 
     def update_diagram_type(self, content):
         """Update the filename label to include diagram type info."""
+        self._show_diagram_type(is_valid_activity_diagram(content))
+
+    def _show_diagram_type(self, is_activity):
+        """Show the file name and whether it holds an activity diagram."""
         filename_text = (
             f"Geladene Datei: {os.path.basename(self.current_file_path)}"
-            if hasattr(self, "current_file_path") and self.current_file_path
+            if self.current_file_path
             else "Keine Datei ausgewählt"
         )
 
-        if is_valid_activity_diagram(content):
+        if is_activity:
             self.filename_label.configure(
                 text=f"{filename_text} | Diagramm-Typ: Aktivitätsdiagramm"
             )
@@ -291,195 +374,35 @@ class FileSelectorApp:
             )
             self.filename_label.configure(text=f"{filename_text} | Diagramm-Typ: -")
 
+    def _schedule_state_update(self):
+        """Update the button state once typing pauses."""
+        if self._state_update is not None:
+            self.root.after_cancel(self._state_update)
+        self._state_update = self.root.after(
+            HIGHLIGHT_DELAY_MS, self._run_state_update
+        )
+
+    def _run_state_update(self):
+        """Update the button state; called through root.after."""
+        self._state_update = None
+        self.update_text_and_button_state()
+
     def apply_syntax_highlighting(self):
-        """Wendet Syntax-Highlighting auf den PlantUML-Code im Textfeld an."""
-        # 1. Entferne zunächst alle bestehenden Tags
-        for tag in [
-            "keyword",
-            "string",
-            "comment",
-            "operator",
-            "name",
-            "arrow",
-            "bracket",
-            "condition",
-            "activity_content",
-        ]:
-            self.tk_text.tag_remove(tag, "1.0", "end")
-
-        # 2. Setze die Standardfarbe für den gesamten Text auf Dunkelgrau
-        self.tk_text.configure(foreground="#444444")  # Dunkelgrau als Standardfarbe
+        """Wendet Syntax-Highlighting auf den PlantUML-Code im Textfeld an.
 
-        # Wende die verschiedenen Highlighting-Regeln an
-        self._highlight_comments()
-        self._highlight_activities()
-        self._highlight_keywords()
-        self._highlight_conditions()
-        self._highlight_arrows()
-
-    def _highlight_comments(self):
-        """Markiert Kommentare im Code"""
-        start_idx = "1.0"
-        while True:
-            pos = self.tk_text.search("'", start_idx, "end", regexp=False)
-            if not pos:
-                break
-
-            # Markiere den Rest der Zeile als Kommentar
-            lineend = self.tk_text.index(f"{pos} lineend")
-            self.tk_text.tag_add("comment", pos, lineend)
-
-            # Setze Startindex für nächste Suche
-            start_idx = f"{lineend}+1c"
-
-    def _highlight_activities(self):
-        """Markiert Aktivitäten (Text in eckigen Klammern und zwischen : und ;)"""
-        debug_mode = False  # Nur für Entwicklungszwecke auf True setzen
-
-        # 1. Text in eckigen Klammern markieren
-        start_idx = "1.0"
-        while True:
-            open_pos = self.tk_text.search("[", start_idx, "end", regexp=False)
-            if not open_pos:
-                break
-
-            close_pos = self.tk_text.search("]", f"{open_pos}+1c", "end", regexp=False)
-            if not close_pos:
-                break
-
-            # Markiere die Klammern selbst
-            self.tk_text.tag_add("bracket", open_pos, f"{open_pos}+1c")
-            self.tk_text.tag_add("bracket", close_pos, f"{close_pos}+1c")
-
-            # Markiere den Inhalt als activity_content
-            content_start = f"{open_pos}+1c"
-            self.tk_text.tag_add("activity_content", content_start, close_pos)
-
-            if debug_mode:
-                activity_content = self.tk_text.get(content_start, close_pos)
-                print(f"Aktivität in []: '{activity_content}'")
-
-            # Setze Startindex für nächste Suche
-            start_idx = f"{close_pos}+1c"
-
-        # 2. Text zwischen : und ; markieren (alternative Aktivitätssyntax)
-        start_idx = "1.0"
-        while True:
-            open_pos = self.tk_text.search(":", start_idx, "end", regexp=False)
-            if not open_pos:
-                break
-
-            close_pos = self.tk_text.search(";", f"{open_pos}+1c", "end", regexp=False)
-            if not close_pos:
-                break
-
-            # Markiere die Begrenzungszeichen selbst
-            self.tk_text.tag_add("bracket", open_pos, f"{open_pos}+1c")
-            self.tk_text.tag_add("bracket", close_pos, f"{close_pos}+1c")
-
-            # Markiere den Inhalt zwischen : und ; als activity_content
-            content_start = f"{open_pos}+1c"
-            self.tk_text.tag_add("activity_content", content_start, close_pos)
-
-            if debug_mode:
-                activity_content = self.tk_text.get(content_start, close_pos)
-                print(f"Aktivität zwischen : und ;: '{activity_content}'")
-
-            # Setze Startindex für nächste Suche
-            start_idx = f"{close_pos}+1c"
-
-    def _highlight_keywords(self):
-        """Markiert PlantUML-Schlüsselwörter"""
-        keywords = [
-            "@startuml",
-            "@enduml",
-            "start",
-            "stop",
-            "if",
-            "then",
-            "else",
-            "endif",
-            "while",
-            "repeat",
-            "fork",
-            "end fork",
-            "partition",
-            "end partition",
-            "backward",
-            "forward",
-            "detach",
-            "note",
-            "end note",
-            "split",
-            "end split",
-        ]
-
-        for keyword in keywords:
-            start_idx = "1.0"
-            while True:
-                # Suche case-insensitive
-                pos = self.tk_text.search(keyword, start_idx, "end", nocase=True)
-                if not pos:
-                    break
-
-                end_pos = f"{pos}+{len(keyword)}c"
-
-                # Prüfe ob diese Position bereits als activity_content markiert ist
-                tags_here = self.tk_text.tag_names(pos)
-                if "activity_content" not in tags_here:
-                    self.tk_text.tag_add("keyword", pos, end_pos)
-
-                # Setze Startindex für nächste Suche
-                start_idx = end_pos
-
-    def _highlight_conditions(self):
-        """Markiert Bedingungen (Text in runden Klammern)"""
-        start_idx = "1.0"
-        while True:
-            open_pos = self.tk_text.search("(", start_idx, "end", regexp=False)
-            if not open_pos:
-                break
-
-            close_pos = self.tk_text.search(")", f"{open_pos}+1c", "end", regexp=False)
-            if not close_pos:
-                break
-
-            # Prüfe ob innerhalb einer Aktivität
-            tags_open = self.tk_text.tag_names(open_pos)
-            if "activity_content" not in tags_open:
-                # Markiere die Klammern
-                self.tk_text.tag_add("bracket", open_pos, f"{open_pos}+1c")
-                self.tk_text.tag_add("bracket", close_pos, f"{close_pos}+1c")
-
-                # Markiere den Inhalt
-                content_start = f"{open_pos}+1c"
-                self.tk_text.tag_add("condition", content_start, close_pos)
-
-            # Setze Startindex für nächste Suche
-            start_idx = f"{close_pos}+1c"
-
-    def _highlight_arrows(self):
-        """Markiert Pfeile im PlantUML-Code"""
-        arrow_patterns = ["->", "-->", "->>", "<-", "<--", "<<-", "..>", "<.."]
-        for pattern in arrow_patterns:
-            start_idx = "1.0"
-            while True:
-                pos = self.tk_text.search(pattern, start_idx, "end", regexp=False)
-                if not pos:
-                    break
-
-                end_pos = f"{pos}+{len(pattern)}c"
-
-                # Prüfe ob innerhalb einer Aktivität
-                tags_here = self.tk_text.tag_names(pos)
-                if "activity_content" not in tags_here:
-                    self.tk_text.tag_add("arrow", pos, end_pos)
-
-                # Setze Startindex für nächste Suche
-                start_idx = end_pos
+        Die sichtbaren Zeilen werden sofort hervorgehoben, der Rest im Leerlauf.
+        """
+        self.highlighter.highlight_all()
 
     def convert_to_drawio(self):
-        """Convert the PlantUML diagram to Draw.io format."""
+        """Convert the PlantUML diagram to Draw.io format.
+
+        Detection, conversion and writing run on a worker thread, so the
+        window stays responsive and the conversion can be cancelled.
+        """
+        if self.task is not None:
+            return
+
         if not self.current_file_path:
             # Zeige Nachricht im message_label statt im Text-Widget
             self.message_label.configure(
@@ -487,80 +410,99 @@ class FileSelectorApp:
             )
             return
 
-        try:
-            # Get content from text widget (in case user modified it)
-            puml_content = self.text_widget.get("1.0", self.ctk.END)
+        # Get content from text widget (in case user modified it)
+        puml_content = self.text_widget.get("1.0", self.ctk.END)
 
-            # Parse PlantUML
-            try:
-                # Process the diagram
-                from plantuml2drawio.processors import ProcessorRegistry
+        # Save dialog
+        save_path = self._get_save_path()
 
-                diagram_type, processor_class = ProcessorRegistry.detect_diagram_type(
-                    puml_content
-                )
-
-                if not processor_class:
-                    # Zeige Nachricht im message_label statt im Text-Widget
-                    self.message_label.configure(
-                        text=f"Fehler: Nicht unterstützter Diagrammtyp: {diagram_type}"
-                    )
-                    return
-
-                processor = processor_class()
-
-            except Exception as parse_error:
-                # Zeige Nachricht im message_label statt im Text-Widget
+        if save_path:
+            self._start_task(
+                BackgroundTask(convert_to_file, puml_content, save_path),
+                CONVERSION_STAGES,
+                lambda path: self.message_label.configure(
+                    text=f"Draw.io-Datei erstellt: {path}"
+                ),
+                self._show_conversion_error,
+            )
+        else:
+            # Zeige Nachricht im message_label statt im Text-Widget
+            self.message_label.configure(text="Speichern abgebrochen.")
+
+    def _show_conversion_error(self, error):
+        """Report the stage a conversion failed in."""
+        stage = getattr(error, "stage", None)
+        if stage in STAGE_ERROR_MESSAGES:
+            # Show the original error instead of its wrapper
+            text = STAGE_ERROR_MESSAGES[stage].format(error.__cause__ or error)
+        elif isinstance(error, OSError):
+            text = f"Fehler beim Speichern der Datei: {error}"
+        else:
+            text = f"Fehler während der Konvertierung: {error}"
+        # Zeige Nachricht im message_label statt im Text-Widget
+        self.message_label.configure(text=text)
+
+    def cancel_task(self):
+        """Cancel the running background task at its next check."""
+        if self.task is not None:
+            self.task.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.message_label.configure(text="Wird abgebrochen …")
+
+    def _start_task(self, task, stages, on_done, on_error):
+        """Run a background task and show its progress until it finishes.
+
+        Args:
+            task: BackgroundTask that has not been started
+            stages: Stages the task reports, in order, for the progress bar
+            on_done: Called on the main thread with the result of the task
+            on_error: Called on the main thread with the error of the task
+        """
+        self.task = task
+        self._task_stages = stages
+        self._task_callbacks = on_done, on_error
+
+        self.file_button.configure(state="disabled")
+        self.convert_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.set(0)
+        self.progress_frame.grid()
+
+        task.start()
+        self.root.after(TASK_POLL_INTERVAL_MS, self._poll_task)
+
+    def _poll_task(self):
+        """Show the messages of the running task; called through root.after."""
+        on_done, on_error = self._task_callbacks
+        for kind, payload in self.task.poll():
+            if kind == MSG_STAGE:
+                if payload in self._task_stages:
+                    done = self._task_stages.index(payload)
+                    self.progress_bar.set(done / len(self._task_stages))
                 self.message_label.configure(
-                    text=f"Fehler beim Parsen des PlantUML-Codes: {parse_error}"
+                    text=STAGE_PROGRESS_MESSAGES.get(payload, payload)
                 )
-                return
+                continue
+
+            self._finish_task()
+            if kind == MSG_DONE:
+                on_done(payload)
+            elif kind == MSG_ERROR:
+                on_error(payload)
+            elif kind == MSG_CANCELLED:
+                self.message_label.configure(text="Vorgang abgebrochen.")
+            return
 
-            # Do layout
-            try:
-                # Anpassung der Methodenaufrufe an die tatsächliche API des Processors
-                nodes, edges = processor.parse_diagram(puml_content)
-                processor.layout_diagram(nodes, edges)
-            except Exception as layout_error:
-                # Zeige Nachricht im message_label statt im Text-Widget
-                self.message_label.configure(
-                    text=f"Fehler beim Layout des Diagramms: {layout_error}"
-                )
-                return
+        self.root.after(TASK_POLL_INTERVAL_MS, self._poll_task)
 
-            # Generate XML
-            try:
-                xml_content = processor.convert_to_drawio(puml_content)
-            except Exception as xml_error:
-                # Zeige Nachricht im message_label statt im Text-Widget
-                self.message_label.configure(
-                    text=f"Fehler bei der XML-Generierung: {xml_error}"
-                )
-                return
-
-            # Save dialog
-            save_path = self._get_save_path()
-
-            if save_path:
-                try:
-                    with open(save_path, "w", encoding="utf-8") as file:
-                        file.write(xml_content)
-                    # Zeige Nachricht im message_label statt im Text-Widget
-                    self.message_label.configure(
-                        text=f"Draw.io-Datei erstellt: {save_path}"
-                    )
-                except Exception as io_error:
-                    # Zeige Nachricht im message_label statt im Text-Widget
-                    self.message_label.configure(
-                        text=f"Fehler beim Speichern der Datei: {io_error}"
-                    )
-            else:
-                # Zeige Nachricht im message_label statt im Text-Widget
-                self.message_label.configure(text="Speichern abgebrochen.")
-
-        except Exception as e:
-            # Zeige Nachricht im message_label statt im Text-Widget
-            self.message_label.configure(text=f"Fehler während der Konvertierung: {e}")
+    def _finish_task(self):
+        """Hide the progress of the finished task and enable the buttons."""
+        self.task = None
+        self.progress_frame.grid_remove()
+        self.file_button.configure(state="normal")
+        self.convert_button.configure(
+            state="normal" if self.current_file_path else "disabled"
+        )
 
     def _get_save_path(self):
         """Show a save dialog and return the selected path or None if cancelled."""
@@ -583,6 +525,10 @@ class FileSelectorApp:
 
 
 def main():
+    setup_logging()
+    # Cache the index of installed processors between starts
+    ProcessorRegistry.discovery_cache_dir = DEFAULT_CACHE_DIR
+
     # Import erst bei Bedarf, um die Startzeit zu verkürzen
     import customtkinter as ctk
 
@@ -0,0 +1,355 @@
+"""Batch conversion of PlantUML directory trees.
+
+Converts every PlantUML file below an input directory in a pool of worker
+processes and mirrors the directory layout in the output directory.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from plantuml2drawio.blocks import (find_diagram_blocks, open_large_file,
+                                    write_block_stream)
+from plantuml2drawio.cache import get_cache
+from plantuml2drawio.config import (DEFAULT_BATCH_PATTERN, DEFAULT_DRAWIO_EXT,
+                                    DEFAULT_JSON_EXT)
+from plantuml2drawio.core import (process_diagram, read_plantuml_file,
+                                  write_output_file)
+from plantuml2drawio.processors import ProcessorRegistry
+from plantuml2drawio.stats import timed
+
+
+class FileResult(NamedTuple):
+    """Outcome of converting a single file in a batch.
+
+    Attributes:
+        input_path: Path of the PlantUML input file.
+        output_path: Path of the (intended) output file.
+        ok: True if the output file was written successfully.
+        message: Error message on failure, empty on success.
+        seconds: Wall-clock time spent on this file.
+        memory: Memory report of the conversion if one was requested, as
+            returned by MemoryStats.memory_dict.
+    """
+
+    input_path: str
+    output_path: str
+    ok: bool
+    message: str
+    seconds: float
+    memory: Optional[Dict] = None
+
+
+def find_input_files(input_dir: str, pattern: str = DEFAULT_BATCH_PATTERN) -> List[str]:
+    """Find all files below a directory matching a glob pattern.
+
+    Args:
+        input_dir: Root directory to search
+        pattern: Glob pattern relative to input_dir, e.g. "**/*.puml"
+
+    Returns:
+        Sorted list of matching file paths
+    """
+    return sorted(str(path) for path in Path(input_dir).glob(pattern) if path.is_file())
+
+
+def get_batch_output_path(
+    input_file: str, input_dir: str, output_dir: Optional[str], is_json: bool
+) -> str:
+    """Determine the output path of a file so that the input layout is mirrored.
+
+    Args:
+        input_file: Path to the input file
+        input_dir: Root directory of the batch
+        output_dir: Root directory for output files; None writes next to the input
+        is_json: True if JSON format, False if Draw.io XML format
+
+    Returns:
+        Path to the output file
+    """
+    base, _ = os.path.splitext(input_file)
+    extension = DEFAULT_JSON_EXT if is_json else DEFAULT_DRAWIO_EXT
+    if not output_dir:
+        return base + extension
+
+    relative_base = os.path.relpath(base, input_dir)
+    return os.path.join(output_dir, relative_base + extension)
+
+
+def _init_worker(discovery_cache_dir: Optional[str]) -> None:
+    """Warm up a worker process before it receives its first file.
+
+    Processors are imported and discovered lazily on first use of the
+    registry; doing that here makes it happen once per worker and not
+    within the timing of its first file. Workers that are spawned instead
+    of forked do not inherit the registry settings of the parent, so the
+    discovery cache directory is passed along.
+
+    Args:
+        discovery_cache_dir: Directory of the cached processor index
+    """
+    ProcessorRegistry.discovery_cache_dir = discovery_cache_dir
+    ProcessorRegistry.get_all_processors()
+
+
+def convert_file(
+    input_path: str,
+    output_path: str,
+    output_json: bool,
+    cache_dir: Optional[str] = None,
+    profile_path: Optional[str] = None,
+    memory_report: bool = False,
+    split: Optional[str] = None,
+) -> FileResult:
+    """Convert a single file and report the outcome instead of raising.
+
+    Messages printed by the conversion functions are captured and returned as
+    the error message, so parallel workers do not interleave their output.
+
+    Args:
+        input_path: Path to the PlantUML input file
+        output_path: Path to the output file
+        output_json: If True, output JSON, otherwise XML
+        cache_dir: Optional directory of the conversion cache
+        profile_path: If given, profile the conversion with cProfile and write
+            the pstats to this path
+        memory_report: If True, trace the memory of every stage
+        split: Output of files with several diagrams, see
+            blocks.write_blocks
+
+    Returns:
+        FileResult describing the outcome
+    """
+    started = time.perf_counter()
+    captured = io.StringIO()
+    ok = False
+    cache = get_cache(cache_dir) if cache_dir else None
+    stats = None
+    if memory_report:
+        from plantuml2drawio.profiling import MemoryStats
+
+        stats = MemoryStats()
+
+    try:
+        with contextlib.ExitStack() as diagnostics:
+            if profile_path:
+                from plantuml2drawio.profiling import profiled
+
+                diagnostics.enter_context(profiled(profile_path))
+            if stats is not None:
+                diagnostics.enter_context(stats.tracing())
+            diagnostics.enter_context(contextlib.redirect_stdout(captured))
+
+            output_parent = os.path.dirname(output_path)
+            reader = open_large_file(input_path)
+            if reader is not None:
+                diagnostics.enter_context(reader)
+                content = None
+                block_count = reader.count_blocks()
+                block_items = reader.iter_blocks()
+            else:
+                content = read_plantuml_file(input_path)
+                blocks = find_diagram_blocks(content) if content is not None else []
+                block_count = len(blocks)
+                block_items = ((block, block.text(content)) for block in blocks)
+
+            if block_count > 1:
+                if output_parent:
+                    os.makedirs(output_parent, exist_ok=True)
+                _, ok = write_block_stream(
+                    block_items,
+                    block_count,
+                    output_path,
+                    output_json,
+                    split,
+                    stats=stats,
+                )
+            elif content is not None:
+                output_content, _ = process_diagram(
+                    content, output_json, cache, streaming=cache is None, stats=stats
+                )
+                if output_content is not None:
+                    if output_parent:
+                        os.makedirs(output_parent, exist_ok=True)
+                    with timed(stats, "write"):
+                        ok = write_output_file(output_content, output_path)
+    except Exception as e:
+        captured.write(f"Unexpected error: {e}\n")
+
+    message = "" if ok else captured.getvalue().strip() or "Conversion failed"
+    return FileResult(
+        input_path,
+        output_path,
+        ok,
+        message,
+        time.perf_counter() - started,
+        stats.memory_dict() if stats is not None else None,
+    )
+
+
+def convert_directory(
+    input_dir: str,
+    output_dir: Optional[str] = None,
+    pattern: str = DEFAULT_BATCH_PATTERN,
+    output_json: bool = False,
+    jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    profile: Optional[str] = None,
+    memory_report: bool = False,
+    split: Optional[str] = None,
+) -> List[FileResult]:
+    """Convert all matching files below a directory.
+
+    A failure in one file never aborts the batch; it is recorded in the
+    corresponding FileResult instead. Profiles are taken per file, also in
+    worker processes, and merged into one pstats file at the end.
+
+    Args:
+        input_dir: Root directory containing the PlantUML files
+        output_dir: Root directory for output files; None writes next to the input
+        pattern: Glob pattern relative to input_dir
+        output_json: If True, output JSON, otherwise XML
+        jobs: Number of worker processes; None uses all CPUs, 1 converts in-process
+        cache_dir: Optional directory of the conversion cache
+        profile: If given, profile every conversion with cProfile and write
+            the merged pstats to this path
+        memory_report: If True, trace the memory of every stage of every file
+        split: Output of files with several diagrams, see
+            blocks.write_blocks
+
+    Returns:
+        List of FileResult objects in input file order
+    """
+    input_files = find_input_files(input_dir, pattern)
+    tasks = [
+        (path, get_batch_output_path(path, input_dir, output_dir, output_json))
+        for path in input_files
+    ]
+    if not tasks:
+        return []
+
+    with contextlib.ExitStack() as cleanup:
+        # One profile per task, or None for every task without profiling
+        profile_files: List[str] = []
+        profile_paths: Sequence[Optional[str]] = [None] * len(tasks)
+        if profile:
+            profile_dir = cleanup.enter_context(tempfile.TemporaryDirectory())
+            profile_files = [
+                os.path.join(profile_dir, f"{index}.prof")
+                for index in range(len(tasks))
+            ]
+            profile_paths = profile_files
+
+        results = _convert_tasks(
+            tasks, output_json, jobs, cache_dir, profile_paths, memory_report, split
+        )
+        if profile:
+            from plantuml2drawio.profiling import merge_profiles
+
+            merge_profiles(profile_files, profile)
+    return results
+
+
+def _convert_tasks(
+    tasks: List[Tuple[str, str]],
+    output_json: bool,
+    jobs: Optional[int],
+    cache_dir: Optional[str],
+    profile_paths: Sequence[Optional[str]],
+    memory_report: bool,
+    split: Optional[str],
+) -> List[FileResult]:
+    """Convert (input, output) path pairs, in worker processes if jobs > 1."""
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    if jobs == 1:
+        return [
+            convert_file(
+                src, dst, output_json, cache_dir, profile_path, memory_report, split
+            )
+            for (src, dst), profile_path in zip(tasks, profile_paths)
+        ]
+
+    results = {}
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(ProcessorRegistry.discovery_cache_dir,),
+    ) as pool:
+        futures = {
+            pool.submit(
+                convert_file,
+                src,
+                dst,
+                output_json,
+                cache_dir,
+                profile_path,
+                memory_report,
+                split,
+            ): (src, dst)
+            for (src, dst), profile_path in zip(tasks, profile_paths)
+        }
+        for future in as_completed(futures):
+            src, dst = futures[future]
+            try:
+                results[src] = future.result()
+            except Exception as e:
+                results[src] = FileResult(src, dst, False, f"Worker error: {e}", 0.0)
+
+    return [results[src] for src, _ in tasks]
+
+
+def print_batch_summary(results: List[FileResult], elapsed: float) -> None:
+    """Print per-file status and total throughput of a batch run.
+
+    Args:
+        results: Results returned by convert_directory
+        elapsed: Total wall-clock time of the batch in seconds
+    """
+    for result in results:
+        status = "OK    " if result.ok else "FAILED"
+        print(f"{status} {result.input_path} ({result.seconds * 1000:.1f} ms)")
+        if not result.ok:
+            for line in result.message.splitlines():
+                print(f"       {line}")
+
+    succeeded = sum(1 for result in results if result.ok)
+    failed = len(results) - succeeded
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"\nConverted {succeeded} of {len(results)} files "
+        f"({failed} failed) in {elapsed:.2f} s, {throughput:.1f} files/s"
+    )
+
+
+def print_batch_diagnostics(results: List[FileResult], profile: Optional[str]) -> None:
+    """Print the merged profile and memory reports of a batch run to stderr.
+
+    The files that took the longest are listed first, so the diagrams that
+    dominate the cost of a corpus stand out.
+
+    Args:
+        results: Results returned by convert_directory
+        profile: Path of the merged pstats file, if profiles were taken
+    """
+    from plantuml2drawio.profiling import (format_batch_memory, format_profile,
+                                           format_slowest_files)
+
+    print(
+        format_slowest_files([(r.input_path, r.seconds) for r in results]),
+        file=sys.stderr,
+    )
+    if profile and os.path.exists(profile):
+        print(f"Merged profile written to {profile}", file=sys.stderr)
+        print(format_profile(profile), file=sys.stderr)
+    memory_reports = [(r.input_path, r.memory) for r in results if r.memory]
+    if memory_reports:
+        print(format_batch_memory(memory_reports), file=sys.stderr)
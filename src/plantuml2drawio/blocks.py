@@ -0,0 +1,577 @@
+"""Files with several diagrams, one per @startuml ... @enduml block.
+
+The blocks of a file are found in one scan over the text, which only records
+their offsets; a block is sliced out of the text when it is converted. Very
+large files are scanned on the raw bytes of a memory map by BlockReader, which
+keeps only a table of the block offsets, so only the block that is being
+converted is decoded. Every block is detected
+and converted on its own, optionally in worker processes, and written either
+as one page of a multi-page Draw.io document or as a separate output file.
+"""
+
+import collections
+import mmap
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import (Iterable, Iterator, List, NamedTuple, Optional, Sequence,
+                    Tuple, Union)
+
+from plantuml2drawio.config import MMAP_MIN_BYTES, SPLIT_FILES, SPLIT_PAGES
+from plantuml2drawio.core import (ConversionError, convert_content,
+                                  convert_page, write_output_file)
+from plantuml2drawio.drawio_writer import iter_multipage
+from plantuml2drawio.stats import ConversionStats, timed
+
+# Start and end markers; only those at the start of a line, possibly
+# indented, delimit a block
+_MARKER_PATTERN = re.compile(r"@(start|end)uml\b")
+_BYTES_MARKER_PATTERN = re.compile(rb"@(start|end)uml\b")
+
+# Characters allowed before a marker on its line, including a byte order mark
+_INDENT = " \t\ufeff"
+_BYTES_INDENT = b" \t\xef\xbb\xbf"
+
+# Error of a block that cannot be decoded
+_DECODE_ERROR = "Diagram is not valid UTF-8 text"
+
+# Number of blocks handed to each worker process ahead of the one whose
+# result is awaited; bounds the memory of parallel conversions
+_BLOCKS_AHEAD_PER_JOB = 2
+
+# Marker at the start of a line: (True for @startuml, offset of its line,
+# offset of the end of its line, text after the marker)
+_Marker = Tuple[bool, int, int, str]
+
+
+class DiagramBlock(NamedTuple):
+    """Position of one @startuml ... @enduml block in a file.
+
+    Attributes:
+        start: Offset of the @startuml line, in characters or, for blocks
+            found by BlockReader, in bytes.
+        end: Offset just after the @enduml marker line.
+        name: Name given after @startuml, or "Diagram <n>" if there is none.
+    """
+
+    start: int
+    end: int
+    name: str
+
+    def text(self, content: str) -> str:
+        """Return the block as its own PlantUML diagram.
+
+        Args:
+            content: Content of the file the block was found in
+
+        Returns:
+            The text from @startuml to @enduml
+        """
+        return content[self.start : self.end]
+
+
+class BlockResult(NamedTuple):
+    """Outcome of converting one diagram block.
+
+    Attributes:
+        block: The converted block.
+        output: Draw.io page, Draw.io document or JSON on success, else None.
+        error: Error message on failure, empty on success.
+    """
+
+    block: DiagramBlock
+    output: Optional[str]
+    error: str
+
+
+class BlockReader:
+    """Reads the diagram blocks of a file through a read-only memory map.
+
+    The file is never decoded as a whole: block boundaries are found on the
+    raw bytes and each block is only decoded when it is reached, so memory
+    use is bounded by the largest block instead of the file size. The file
+    is scanned once; the start and end offsets of its blocks are kept in a
+    table of 16 bytes per block, which counting and iterating the blocks
+    share, and names are read again from the map when a block is reached.
+
+    Attributes:
+        path: Path of the file.
+    """
+
+    def __init__(self, path: str):
+        """Map the file.
+
+        Args:
+            path: Path of the PlantUML file
+
+        Raises:
+            OSError: If the file cannot be opened or mapped
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._offsets: Optional[Tuple[array, array]] = None
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                # Empty files cannot be mapped
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+
+    def find_blocks(self) -> Iterator[DiagramBlock]:
+        """Yield the blocks from the offset table; offsets are counted in bytes.
+
+        Yields:
+            The blocks in file order
+        """
+        starts, ends = self._offset_table()
+        for number, (start, end) in enumerate(zip(starts, ends), 1):
+            yield DiagramBlock(start, end, self._name(start, number))
+
+    def count_blocks(self) -> int:
+        """Return the number of blocks."""
+        return len(self._offset_table()[0])
+
+    def _offset_table(self) -> Tuple[array, array]:
+        """Scan the raw bytes on first use and return (starts, ends)."""
+        if self._offsets is None:
+            starts, ends = array("q"), array("q")
+            if self._map is not None:
+                for block in iter_diagram_blocks_bytes(self._map):
+                    starts.append(block.start)
+                    ends.append(block.end)
+            self._offsets = (starts, ends)
+        return self._offsets
+
+    def _name(self, start: int, number: int) -> str:
+        """Return the name of the block whose @startuml line is at start."""
+        assert self._map is not None
+        line_end = self._map.find(b"\n", start)
+        if line_end < 0:
+            line_end = len(self._map)
+        match = _BYTES_MARKER_PATTERN.search(self._map, start, line_end)
+        assert match is not None
+        rest = self._map[match.end() : line_end].decode("utf-8", "replace")
+        return _block_name(rest, number)
+
+    def text(self, block: DiagramBlock) -> str:
+        """Decode one block.
+
+        Args:
+            block: One of the blocks of this file
+
+        Returns:
+            The text of the block
+
+        Raises:
+            UnicodeDecodeError: If the block is not valid UTF-8
+        """
+        # Only files that are not empty have blocks and a map
+        assert self._map is not None
+        return self._map[block.start : block.end].decode("utf-8")
+
+    def iter_blocks(self) -> Iterator[Tuple[DiagramBlock, Optional[str]]]:
+        """Yield the blocks with their text, decoding one block at a time.
+
+        Yields:
+            Tuples of (block, text); the text is None if the block is not
+            valid UTF-8
+        """
+        for block in self.find_blocks():
+            try:
+                yield block, self.text(block)
+            except UnicodeDecodeError:
+                yield block, None
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self) -> "BlockReader":
+        """Return the reader; it is closed when the context is left."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the reader."""
+        self.close()
+
+
+def open_large_file(
+    path: str, min_bytes: int = MMAP_MIN_BYTES
+) -> Optional[BlockReader]:
+    """Open a large file with several diagrams through a BlockReader.
+
+    Smaller files, and files with a single diagram, are cheaper to read as a
+    whole with core.read_plantuml_file.
+
+    Args:
+        path: Path of the PlantUML file
+        min_bytes: Size from which a file is considered large
+
+    Returns:
+        An open BlockReader, or None if the file should be read as a whole
+    """
+    try:
+        if os.path.getsize(path) < min_bytes:
+            return None
+        reader = BlockReader(path)
+    except (OSError, ValueError):
+        return None
+    # The scan is kept in the offset table of the reader for its blocks
+    if reader.count_blocks() < 2:
+        reader.close()
+        return None
+    return reader
+
+
+def find_diagram_blocks(content: str) -> List[DiagramBlock]:
+    """Find all @startuml ... @enduml blocks of a file.
+
+    Args:
+        content: Content of a PlantUML file
+
+    Returns:
+        The blocks in file order, see iter_diagram_blocks
+    """
+    return list(iter_diagram_blocks(content))
+
+
+def iter_diagram_blocks(content: str) -> Iterator[DiagramBlock]:
+    """Scan text for @startuml ... @enduml blocks.
+
+    A @startuml that is not closed before the next @startuml is dropped, as
+    is a final block without @enduml.
+
+    Args:
+        content: Content of a PlantUML file
+
+    Yields:
+        The blocks in file order; offsets are counted in characters
+    """
+    return _pair_markers(_text_markers(content))
+
+
+def iter_diagram_blocks_bytes(
+    content: Union[bytes, mmap.mmap]
+) -> Iterator[DiagramBlock]:
+    """Scan raw UTF-8 bytes for @startuml ... @enduml blocks.
+
+    Like iter_diagram_blocks, but nothing except the rest of the @startuml
+    lines is decoded.
+
+    Args:
+        content: Content of a PlantUML file, e.g. a memory map
+
+    Yields:
+        The blocks in file order; offsets are counted in bytes
+    """
+    return _pair_markers(_bytes_markers(content))
+
+
+def _text_markers(content: str) -> Iterator[_Marker]:
+    """Yield the markers of text that start a line."""
+    for match in _MARKER_PATTERN.finditer(content):
+        line_start = content.rfind("\n", 0, match.start()) + 1
+        if content[line_start : match.start()].strip(_INDENT):
+            continue
+        line_end = content.find("\n", match.end())
+        if line_end < 0:
+            line_end = len(content)
+        rest = content[match.end() : line_end]
+        yield match.group(1) == "start", line_start, line_end, rest
+
+
+def _bytes_markers(content: Union[bytes, mmap.mmap]) -> Iterator[_Marker]:
+    """Yield the markers of raw UTF-8 bytes that start a line."""
+    for match in _BYTES_MARKER_PATTERN.finditer(content):
+        line_start = content.rfind(b"\n", 0, match.start()) + 1
+        if content[line_start : match.start()].strip(_BYTES_INDENT):
+            continue
+        line_end = content.find(b"\n", match.end())
+        if line_end < 0:
+            line_end = len(content)
+        is_start = match.group(1) == b"start"
+        # Only the name of a block is needed from the rest of its line
+        rest = content[match.end() : line_end] if is_start else b""
+        yield is_start, line_start, line_end, rest.decode("utf-8", "replace")
+
+
+def _pair_markers(markers: Iterable[_Marker]) -> Iterator[DiagramBlock]:
+    """Yield a block for every @startuml followed by an @enduml."""
+    count = 0
+    start = None
+    name = ""
+    for is_start, line_start, line_end, rest in markers:
+        if is_start:
+            start = line_start
+            name = _block_name(rest, count + 1)
+        elif start is not None:
+            count += 1
+            yield DiagramBlock(start, line_end, name)
+            start = None
+
+
+def _block_name(rest: str, number: int) -> str:
+    """Return the name given after @startuml, e.g. "name" or "(id=name)"."""
+    name = rest.strip()
+    if name.startswith("(") and name.endswith(")"):
+        name = name[1:-1].strip()
+        if name.startswith("id="):
+            name = name[len("id=") :]
+    name = name.strip().strip('"').strip()
+    return name or f"Diagram {number}"
+
+
+def get_block_output_path(output_path: str, number: int, count: int) -> str:
+    """Determine the output path of one block written as a separate file.
+
+    The block number is appended to the file name and zero-padded, so the
+    files sort in the order of the blocks.
+
+    Args:
+        output_path: Output path of the whole file
+        number: Number of the block, starting at 1
+        count: Number of blocks in the file
+
+    Returns:
+        Path to the output file of the block
+    """
+    base, extension = os.path.splitext(output_path)
+    return f"{base}-{number:0{len(str(count))}d}{extension}"
+
+
+def _convert_block(
+    text: str,
+    output_json: bool,
+    as_page: bool,
+    page_id: str,
+    page_name: str,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[Optional[str], str]:
+    """Convert one block and return (output, error) instead of raising."""
+    try:
+        if as_page:
+            return convert_page(text, page_id, page_name, stats), ""
+        output, _ = convert_content(text, output_json, stats=stats)
+        return output, ""
+    except ConversionError as e:
+        return None, str(e)
+
+
+def convert_block_stream(
+    items: Iterable[Tuple[DiagramBlock, Optional[str]]],
+    output_json: bool = False,
+    as_pages: bool = False,
+    jobs: int = 1,
+    stats: Optional[ConversionStats] = None,
+) -> Iterator[BlockResult]:
+    """Convert blocks one after another as they are requested.
+
+    The blocks are consumed lazily. With several jobs only a few blocks per
+    worker are read ahead, so memory stays bounded however many blocks there
+    are. A failure in one block never affects the others; it is recorded in
+    the corresponding BlockResult instead.
+
+    Args:
+        items: Pairs of (block, text), e.g. from BlockReader.iter_blocks; a
+            text of None marks a block that could not be decoded
+        output_json: If True, output JSON, otherwise XML
+        as_pages: If True, convert each block to a page of a multi-page
+            Draw.io document instead of a document of its own
+        jobs: Number of worker processes; 1 converts in-process
+        stats: Optional statistics that receive the sum over all blocks;
+            implies converting in-process
+
+    Yields:
+        BlockResult objects in block order
+    """
+    numbered = enumerate(items, 1)
+
+    if jobs <= 1 or stats is not None:
+        for number, (block, text) in numbered:
+            if text is None:
+                yield BlockResult(block, None, _DECODE_ERROR)
+                continue
+            output, error = _convert_block(
+                text, output_json, as_pages, f"diagram-{number}", block.name, stats
+            )
+            yield BlockResult(block, output, error)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: collections.deque = collections.deque()
+        for number, (block, text) in numbered:
+            future = None
+            if text is not None:
+                future = pool.submit(
+                    _convert_block,
+                    text,
+                    output_json,
+                    as_pages,
+                    f"diagram-{number}",
+                    block.name,
+                )
+            pending.append((block, future))
+            if len(pending) > jobs * _BLOCKS_AHEAD_PER_JOB:
+                yield _block_result(*pending.popleft())
+        while pending:
+            yield _block_result(*pending.popleft())
+
+
+def _block_result(block: DiagramBlock, future) -> BlockResult:
+    """Wait for the conversion of a block in a worker process."""
+    if future is None:
+        return BlockResult(block, None, _DECODE_ERROR)
+    try:
+        output, error = future.result()
+    except Exception as e:
+        output, error = None, f"Worker error: {e}"
+    return BlockResult(block, output, error)
+
+
+def convert_blocks(
+    content: str,
+    blocks: Sequence[DiagramBlock],
+    output_json: bool = False,
+    as_pages: bool = False,
+    jobs: int = 1,
+    stats: Optional[ConversionStats] = None,
+) -> List[BlockResult]:
+    """Convert every block of a file independently.
+
+    Args:
+        content: Content of the file
+        blocks: Blocks returned by find_diagram_blocks
+        output_json: If True, output JSON, otherwise XML
+        as_pages: If True, convert each block to a page of a multi-page
+            Draw.io document instead of a document of its own
+        jobs: Number of worker processes; 1 converts in-process
+        stats: Optional statistics that receive the sum over all blocks;
+            implies converting in-process
+
+    Returns:
+        List of BlockResult objects in block order, see convert_block_stream
+    """
+    items = ((block, block.text(content)) for block in blocks)
+    jobs = max(1, min(jobs, len(blocks)))
+    return list(convert_block_stream(items, output_json, as_pages, jobs, stats))
+
+
+def write_blocks(
+    content: str,
+    blocks: Sequence[DiagramBlock],
+    output_path: str,
+    output_json: bool = False,
+    split: Optional[str] = None,
+    jobs: int = 1,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[List[str], bool]:
+    """Convert every block of a file and write the results.
+
+    Args:
+        content: Content of the file
+        blocks: Blocks returned by find_diagram_blocks
+        output_path: Output path of the whole file
+        output_json: If True, output JSON, otherwise XML
+        split: SPLIT_PAGES or SPLIT_FILES, see write_block_stream
+        jobs: Number of worker processes; 1 converts in-process
+        stats: Optional statistics that receive the sum over all blocks
+
+    Returns:
+        Tuple of (paths of the written files, True if every block was
+        converted and written)
+
+    Raises:
+        ValueError: If pages are requested for JSON output
+    """
+    items = ((block, block.text(content)) for block in blocks)
+    jobs = max(1, min(jobs, len(blocks)))
+    return write_block_stream(
+        items, len(blocks), output_path, output_json, split, jobs, stats
+    )
+
+
+def write_block_stream(
+    items: Iterable[Tuple[DiagramBlock, Optional[str]]],
+    count: int,
+    output_path: str,
+    output_json: bool = False,
+    split: Optional[str] = None,
+    jobs: int = 1,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[List[str], bool]:
+    """Convert blocks as they are read and write each result right away.
+
+    Pages are streamed into the multi-page document one after another, so
+    only a few blocks are held in memory at any time. The blocks that could
+    be converted are written even if others failed. Errors are printed, like
+    process_diagram does.
+
+    Args:
+        items: Pairs of (block, text), see convert_block_stream
+        count: Number of blocks, used to number separate files
+        output_path: Output path of the whole file
+        output_json: If True, output JSON, otherwise XML
+        split: SPLIT_PAGES writes one multi-page Draw.io document to
+            output_path, SPLIT_FILES one file per block next to it, see
+            get_block_output_path. None uses pages for XML and files for JSON.
+        jobs: Number of worker processes; 1 converts in-process
+        stats: Optional statistics that receive the sum over all blocks
+
+    Returns:
+        Tuple of (paths of the written files, True if every block was
+        converted and written)
+
+    Raises:
+        ValueError: If pages are requested for JSON output
+    """
+    if split is None:
+        split = SPLIT_FILES if output_json else SPLIT_PAGES
+    if split == SPLIT_PAGES and output_json:
+        raise ValueError("Multi-page output is only available for Draw.io XML")
+
+    failed = []
+    results = convert_block_stream(
+        items, output_json, split == SPLIT_PAGES, jobs, stats
+    )
+
+    def succeeded() -> Iterator[Tuple[int, str]]:
+        """Yield (number, output) of converted blocks, reporting failures."""
+        for number, result in enumerate(results, 1):
+            if result.output is not None:
+                yield number, result.output
+                continue
+            failed.append(number)
+            label = f"diagram {number}"
+            if result.block.name != f"Diagram {number}":
+                label += f" ({result.block.name})"
+            print(f"Error in {label}: {result.error}")
+
+    written = []
+    ok = True
+    outputs = succeeded()
+    if split == SPLIT_PAGES:
+        # Only create the document once the first page has been converted
+        first = next(outputs, None)
+        if first is not None:
+            pages = (page for _, page in chain([first], outputs))
+            with timed(stats, "write"):
+                if write_output_file(iter_multipage(pages), output_path):
+                    written.append(output_path)
+                else:
+                    ok = False
+    else:
+        for number, output in outputs:
+            path = get_block_output_path(output_path, number, count)
+            with timed(stats, "write"):
+                if write_output_file(output, path):
+                    written.append(path)
+                else:
+                    ok = False
+    return written, ok and not failed
@@ -0,0 +1,205 @@
+"""Content-addressed on-disk cache for conversion results.
+
+Results are stored under the SHA-256 of the normalized PlantUML content, the
+output format, the converter version and the layout version, so any change
+to one of them produces a different key. The cache is bounded in size and
+evicts the least recently used entries first.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+from plantuml2drawio.config import (DEFAULT_CACHE_MAX_BYTES, LAYOUT_VERSION,
+                                    OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_XML,
+                                    VERSION)
+
+# Fraction of max_bytes the cache is trimmed to once it overflows, so that
+# eviction does not run again on the very next store
+EVICTION_LOW_WATERMARK = 0.9
+
+
+def normalize_content(content: str) -> str:
+    """Normalize PlantUML content for hashing.
+
+    Line endings and trailing whitespace do not change the parsed diagram, so
+    they must not change the cache key either.
+
+    Args:
+        content: PlantUML content
+
+    Returns:
+        Normalized content
+    """
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def make_cache_key(content: str, output_json: bool) -> str:
+    """Compute the cache key for a conversion.
+
+    Args:
+        content: PlantUML content
+        output_json: If True, the key is for JSON output, otherwise for XML
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    settings = json.dumps(
+        [
+            OUTPUT_FORMAT_JSON if output_json else OUTPUT_FORMAT_XML,
+            VERSION,
+            LAYOUT_VERSION,
+        ]
+    )
+    digest = hashlib.sha256(settings.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_content(content).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Size-bounded LRU cache of conversion results in a directory.
+
+    Each entry is a file named after its key. Reads refresh the modification
+    time of the entry, which is what eviction uses as recency. Entries are
+    written atomically, so several processes can share one cache directory.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory to store entries in; created on first store
+            max_bytes: Upper bound for the total size of all entries
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Total size of all entries, computed lazily on the first store
+        self._total_bytes: Optional[int] = None
+
+    def _entry_path(self, key: str) -> str:
+        """Return the file path for a cache key."""
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, content: str, output_json: bool) -> Optional[str]:
+        """Look up a cached conversion result.
+
+        Args:
+            content: PlantUML content
+            output_json: If True, look up JSON output, otherwise XML
+
+        Returns:
+            The cached output or None on a miss
+        """
+        path = self._entry_path(make_cache_key(content, output_json))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                output = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return output
+
+    def put(self, content: str, output_json: bool, output: str) -> None:
+        """Store a conversion result.
+
+        Failures to write are ignored; the cache is an optimization only.
+
+        Args:
+            content: PlantUML content
+            output_json: If True, store as JSON output, otherwise XML
+            output: The converted output
+        """
+        path = self._entry_path(make_cache_key(content, output_json))
+        data = output.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._scan())
+        else:
+            self._total_bytes += len(data)
+
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the size limit is met."""
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_LOW_WATERMARK
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+
+        self._total_bytes = total
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for path, _, _ in self._scan():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        self._total_bytes = 0
+
+    def _scan(self) -> List[Tuple[str, int, float]]:
+        """List all entries as (path, size, last access time) tuples."""
+        entries: List[Tuple[str, int, float]] = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if not entry.is_file() or entry.name.startswith("tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+
+@functools.lru_cache(maxsize=None)
+def get_cache(
+    cache_dir: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+) -> ConversionCache:
+    """Return a per-process shared cache instance for a directory.
+
+    Reusing the instance keeps the size bookkeeping across conversions, which
+    matters for batch workers that convert many files.
+
+    Args:
+        cache_dir: Directory of the cache
+        max_bytes: Upper bound for the total size of all entries
+
+    Returns:
+        ConversionCache for the directory
+    """
+    return ConversionCache(cache_dir, max_bytes)
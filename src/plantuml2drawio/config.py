@@ -4,6 +4,8 @@
 Contains configuration parameters and constants for the entire project.
 """
 
+import os
+
 # Version information
 VERSION = "1.2.0"
 VERSION_DATE = "2025-03-16"
@@ -14,10 +16,29 @@ DEFAULT_DRAWIO_EXT = ".drawio"
 FILE_EXTENSION_PUML = ".puml"
 FILE_EXTENSION_DRAWIO = ".drawio"
 
+# Batch conversion
+DEFAULT_BATCH_PATTERN = "**/*" + FILE_EXTENSION_PUML
+
+# Conversion cache
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "plantuml2drawio",
+)
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
 # Output formats
 OUTPUT_FORMAT_JSON = "JSON"
 OUTPUT_FORMAT_XML = "Draw.io XML"
 
+# Output of files with several @startuml blocks: one multi-page Draw.io
+# document or one output file per diagram
+SPLIT_PAGES = "pages"
+SPLIT_FILES = "files"
+
+# Files of at least this size with several diagrams are split on a memory
+# map, decoding one diagram at a time instead of the whole file
+MMAP_MIN_BYTES = 16 * 1024 * 1024
+
 # Diagram types
 DIAGRAM_TYPE_ACTIVITY = "activity"
 DIAGRAM_TYPE_SEQUENCE = "sequence"
@@ -27,6 +48,11 @@ DIAGRAM_TYPE_USECASE = "usecase"
 DIAGRAM_TYPE_UNKNOWN = "unknown"
 DIAGRAM_TYPE_NOT_PLANTUML = "not_plantuml"
 
+# Version of the layout algorithms, part of every conversion cache key.
+# Increase it with every change that moves nodes or resizes them, so cached
+# results of the old layout are not served any more.
+LAYOUT_VERSION = 2
+
 # Layout settings
 DEFAULT_VERTICAL_SPACING = 100
 DEFAULT_HORIZONTAL_SPACING = 200
@@ -42,13 +68,20 @@ DEFAULT_WINDOW_TITLE = "PlantUML to Draw.io Converter"
 # Icon path without extension, will be added based on platform
 ICON_PATH = "resources/icons/p2d_icon"
 
-# Available processors
+# Available processors, as import paths that are only imported when needed
 AVAILABLE_PROCESSORS = {
     DIAGRAM_TYPE_ACTIVITY: (
         "plantuml2drawio.processors.activity_processor." "ActivityDiagramProcessor"
     )
 }
 
+# Entry point group of third-party processors; the entry point name is the
+# diagram type and its value the processor class, e.g. "package.module:Class"
+PROCESSOR_ENTRY_POINT_GROUP = "plantuml2drawio.processors"
+
+# File in the cache directory holding the index of discovered processors
+PROCESSOR_INDEX_FILE = "processor-index.json"
+
 # Debug settings
 DEBUG = False
 
@@ -1,65 +1,243 @@
 """Core functionality for PlantUML to Draw.io conversion."""
 
-import argparse
+import contextlib
 import os
-import re
 import sys
-from typing import Optional, Tuple
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
 
-from plantuml2drawio.config import (DEFAULT_DRAWIO_EXT, DEFAULT_JSON_EXT,
+from plantuml2drawio.config import (DEFAULT_BATCH_PATTERN, DEFAULT_CACHE_DIR,
+                                    DEFAULT_DRAWIO_EXT, DEFAULT_JSON_EXT,
                                     DIAGRAM_TYPE_ACTIVITY,
                                     DIAGRAM_TYPE_NOT_PLANTUML,
                                     FILE_EXTENSION_PUML, OUTPUT_FORMAT_JSON,
-                                    OUTPUT_FORMAT_XML)
+                                    OUTPUT_FORMAT_XML, SPLIT_FILES,
+                                    SPLIT_PAGES)
 from plantuml2drawio.processors import ProcessorRegistry
+from plantuml2drawio.processors.result import ConversionCancelled, StageError
+from plantuml2drawio.stats import ConversionStats, timed
 
+if TYPE_CHECKING:
+    import argparse
+
+    from plantuml2drawio.cache import ConversionCache
+    from plantuml2drawio.processors.base_processor import BaseDiagramProcessor
+    from plantuml2drawio.processors.result import DiagramResult
+
+
+class ConversionError(Exception):
+    """Raised when PlantUML content cannot be converted.
+
+    Attributes:
+        stage: Stage that failed ("detect", "validate", "parse", "layout" or
+            "export"), or None if the content was not processed at all.
+    """
+
+    def __init__(self, message: str, stage: Optional[str] = None):
+        """Initialize the error.
+
+        Args:
+            message: Description of the failure
+            stage: Stage that failed, if any
+        """
+        super().__init__(message)
+        self.stage = stage
+
+    def __reduce__(self):
+        """Keep the stage when the error is sent to another process."""
+        return self.__class__, (str(self), self.stage)
 
-def process_diagram(
-    plantuml_content: str, output_json: bool = False
-) -> Tuple[Optional[str], Optional[str]]:
-    """Process PlantUML content and generate XML or JSON representation.
+
+def convert_content(
+    plantuml_content: str,
+    output_json: bool = False,
+    cache: Optional["ConversionCache"] = None,
+    streaming: bool = False,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[Union[str, Iterable[str]], str]:
+    """Convert PlantUML content to XML or JSON, raising on failure.
 
     Args:
         plantuml_content: Content of the PlantUML diagram
         output_json: If True, output JSON, otherwise XML
+        cache: Optional conversion cache; a hit skips the whole conversion
+        streaming: If True and no cache is given, return the output as an
+            iterable of text chunks that are only produced while it is
+            consumed, e.g. by write_output_file
+        stats: Optional statistics that receive the time of each stage, the
+            node and edge counts and the size of the output
 
     Returns:
-        On success: Tuple of (String with XML or JSON, output format description)
-        On failure: (None, None)
+        Tuple of (XML or JSON as string or chunks, output format description)
+
+    Raises:
+        ConversionError: If the content cannot be converted
     """
     if not plantuml_content:
-        print("Error: Empty PlantUML content")
-        return None, None
+        raise ConversionError("Empty PlantUML content")
 
-    # Determine diagram type
-    diagram_type, processor_class = ProcessorRegistry.detect_diagram_type(
-        plantuml_content
+    output_format = OUTPUT_FORMAT_JSON if output_json else OUTPUT_FORMAT_XML
+
+    if cache is not None:
+        with timed(stats, "cache"):
+            cached_content = cache.get(plantuml_content, output_json)
+        if cached_content is not None:
+            if stats is not None:
+                stats.cache_hit = True
+                stats.count_output(cached_content)
+            return cached_content, output_format
+
+    result = run_pipeline(plantuml_content, stats)
+
+    try:
+        # Export the diagram
+        if output_json:
+            output_content = result.json
+        elif cache is not None or not streaming:
+            output_content = result.drawio
+        else:
+            output_content = result.iter_drawio()
+    except Exception as e:
+        raise _processing_error(e) from e
+
+    if cache is not None:
+        cache.put(plantuml_content, output_json, output_content)
+
+    return output_content, output_format
+
+
+def convert_page(
+    plantuml_content: str,
+    page_id: str,
+    page_name: str,
+    stats: Optional[ConversionStats] = None,
+) -> str:
+    """Convert PlantUML content to a single page of a Draw.io document.
+
+    Pages of several diagrams are combined into one multi-page document with
+    drawio_writer.iter_multipage.
+
+    Args:
+        plantuml_content: Content of the PlantUML diagram
+        page_id: ID of the page, unique within the document
+        page_name: Name of the page shown by Draw.io
+        stats: Optional statistics filled in during the conversion
+
+    Returns:
+        The <diagram> element of the page
+
+    Raises:
+        ConversionError: If the content cannot be converted
+    """
+    result = run_pipeline(plantuml_content, stats)
+    try:
+        return "".join(result.iter_drawio_page(page_id, page_name))
+    except Exception as e:
+        raise _processing_error(e) from e
+
+
+def run_pipeline(
+    plantuml_content: str,
+    stats: Optional[ConversionStats] = None,
+    cancel: Optional[threading.Event] = None,
+) -> "DiagramResult":
+    """Detect, validate, parse and lay out a diagram once.
+
+    The result is exported by the caller in whatever form it needs, see
+    DiagramResult.
+
+    Args:
+        plantuml_content: Content of the PlantUML diagram
+        stats: Optional statistics filled in during the conversion
+        cancel: Optional event that cancels the run when set from another
+            thread
+
+    Returns:
+        DiagramResult holding the laid-out diagram
+
+    Raises:
+        ConversionError: If the content cannot be converted; its stage tells
+            where it failed
+        ConversionCancelled: If the run is cancelled
+    """
+    if not plantuml_content:
+        raise ConversionError("Empty PlantUML content")
+
+    processor = _get_valid_processor(plantuml_content, stats)
+    try:
+        return processor.run(plantuml_content, stats, cancel)
+    except ConversionCancelled:
+        raise
+    except Exception as e:
+        raise _processing_error(e) from e
+
+
+def _processing_error(error: Exception) -> ConversionError:
+    """Wrap an error of the pipeline, keeping the stage of a StageError."""
+    return ConversionError(
+        f"Unexpected error during processing: {error}",
+        getattr(error, "stage", None),
     )
+
+
+def _get_valid_processor(
+    plantuml_content: str, stats: Optional[ConversionStats]
+) -> "BaseDiagramProcessor":
+    """Detect the diagram type and return a processor that accepts the content.
+
+    Raises:
+        ConversionError: If the type is unsupported or the diagram is invalid
+    """
+    # Determine diagram type
+    with timed(stats, "detect"):
+        diagram_type, processor_class = ProcessorRegistry.detect_diagram_type(
+            plantuml_content
+        )
     if not processor_class:
-        print(f"Error: Unsupported diagram type: {diagram_type}")
-        return None, None
+        raise ConversionError(
+            f"Unsupported diagram type: {diagram_type}", "detect"
+        )
 
     # Create processor instance
     processor = processor_class()
 
     # Check if diagram is valid
-    if not processor.is_valid_diagram(plantuml_content):
-        print(f"Error: Invalid {diagram_type} diagram")
-        return None, None
+    with timed(stats, "validate"):
+        valid = processor.is_valid_diagram(plantuml_content)
+    if not valid:
+        raise ConversionError(f"Invalid {diagram_type} diagram", "validate")
+    return processor
 
-    try:
-        # Process the diagram
-        output_format = OUTPUT_FORMAT_JSON if output_json else OUTPUT_FORMAT_XML
 
-        if output_json:
-            output_content = processor.convert_to_json(plantuml_content)
-        else:
-            output_content = processor.convert_to_drawio(plantuml_content)
+def process_diagram(
+    plantuml_content: str,
+    output_json: bool = False,
+    cache: Optional["ConversionCache"] = None,
+    streaming: bool = False,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[Optional[Union[str, Iterable[str]]], Optional[str]]:
+    """Process PlantUML content and generate XML or JSON representation.
 
-        return output_content, output_format
+    Args:
+        plantuml_content: Content of the PlantUML diagram
+        output_json: If True, output JSON, otherwise XML
+        cache: Optional conversion cache; a hit skips the whole conversion
+        streaming: If True and no cache is given, return the output as an
+            iterable of text chunks, see convert_content
+        stats: Optional statistics filled in during the conversion
 
-    except Exception as e:
-        print(f"Unexpected error during processing: {e}")
+    Returns:
+        On success: Tuple of (XML or JSON as string or chunks, output format
+        description)
+        On failure: (None, None)
+    """
+    try:
+        return convert_content(
+            plantuml_content, output_json, cache, streaming, stats
+        )
+    except ConversionError as e:
+        print(f"Error: {e}")
         return None, None
 
 
@@ -94,23 +272,36 @@ def read_plantuml_file(file_path: str) -> Optional[str]:
         return None
 
 
-def write_output_file(content: str, file_path: str) -> bool:
+def write_output_file(content: Union[str, Iterable[str]], file_path: str) -> bool:
     """Write the given content to a file.
 
     Args:
-        content: Content to write
+        content: Content to write, either as one string or as an iterable of
+            text chunks that are written one after another as they arrive
         file_path: Path to the output file
 
     Returns:
-        True on success, False on error
+        True on success, False on error. If producing the chunks fails, the
+        partially written file is removed again.
     """
     try:
         with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                for chunk in content:
+                    f.write(chunk)
         return True
     except IOError as e:
         print(f"Error writing output file '{file_path}': {e}")
         return False
+    except (StageError, ConversionCancelled) as e:
+        # Streamed chunks are only exported while they are written
+        error = e if isinstance(e, ConversionCancelled) else _processing_error(e)
+        print(f"Error: {error}")
+        with contextlib.suppress(OSError):
+            os.remove(file_path)
+        return False
 
 
 def get_output_file_path(
@@ -147,6 +338,100 @@ def handle_info_request(diagram_type: str) -> None:
         print("Note: Currently only activity diagrams are supported for conversion.")
 
 
+def run_batch(args: "argparse.Namespace") -> None:
+    """Convert a whole directory tree as requested on the command line.
+
+    Args:
+        args: Parsed command line arguments with input_dir set
+    """
+    from plantuml2drawio.batch import (convert_directory,
+                                       print_batch_diagnostics,
+                                       print_batch_summary)
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: Directory '{args.input_dir}' does not exist")
+        sys.exit(1)
+
+    if args.info:
+        print("Error: --info cannot be combined with --input-dir")
+        sys.exit(1)
+
+    if args.timings:
+        print("Error: --timings cannot be combined with --input-dir")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    results = convert_directory(
+        args.input_dir,
+        output_dir=args.output_dir,
+        pattern=args.pattern,
+        output_json=args.json,
+        jobs=args.jobs,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        profile=args.profile,
+        memory_report=args.memory_report,
+        split=args.split,
+    )
+    elapsed = time.perf_counter() - started
+
+    if not results:
+        print(f"No files matching '{args.pattern}' found in '{args.input_dir}'")
+        sys.exit(1)
+
+    print_batch_summary(results, elapsed)
+    if args.profile or args.memory_report:
+        print_batch_diagnostics(results, args.profile)
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+def _convert_single_diagram(
+    args: "argparse.Namespace",
+    plantuml_content: str,
+    output_file: str,
+    stats: Optional[ConversionStats] = None,
+) -> Tuple[List[str], bool]:
+    """Convert a single diagram as requested on the command line and write it.
+
+    Args:
+        args: Parsed command line arguments
+        plantuml_content: Content of the PlantUML diagram
+        output_file: Path to the output file
+        stats: Optional statistics filled in during the conversion
+
+    Returns:
+        Tuple of (paths of the written files, True on success)
+    """
+    result = None
+    if args.daemon and stats is None and not args.profile:
+        from plantuml2drawio.server import convert_via_daemon
+
+        result = convert_via_daemon(plantuml_content, args.json, args.socket)
+
+    if result is None:
+        cache = None
+        if not args.no_cache:
+            from plantuml2drawio.cache import ConversionCache
+
+            cache = ConversionCache(args.cache_dir)
+        result = process_diagram(
+            plantuml_content,
+            args.json,
+            cache,
+            streaming=cache is None,
+            stats=stats,
+        )
+
+    output_content, _ = result
+    if output_content is None:
+        return [], False
+
+    # Write content to file
+    with timed(stats, "write"):
+        written = write_output_file(output_content, output_file)
+    return ([output_file] if written else []), written
+
+
 def main() -> None:
     """Main function of the program.
 
@@ -154,6 +439,13 @@ def main() -> None:
     determines diagram type, processes the diagram and
     writes output to a file.
     """
+    # Only needed by the command line, so importing this module stays cheap
+    import argparse
+
+    from plantuml2drawio.logging_config import setup_logging
+
+    setup_logging()
+
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description=(
@@ -161,8 +453,38 @@ def main() -> None:
             "or a JSON representation of nodes and edges."
         )
     )
-    parser.add_argument("--input", required=True, help="Input PlantUML file")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--input", help="Input PlantUML file")
+    input_group.add_argument(
+        "--input-dir",
+        help="Convert all PlantUML files below this directory (batch mode).",
+    )
     parser.add_argument("--output", help="Output file (draw.io XML or JSON)")
+    parser.add_argument(
+        "--output-dir",
+        help=(
+            "Batch mode: root directory for output files, mirroring the input "
+            "layout. Defaults to writing next to each input file."
+        ),
+    )
+    parser.add_argument(
+        "--pattern",
+        default=DEFAULT_BATCH_PATTERN,
+        help=(
+            "Batch mode: glob pattern relative to --input-dir "
+            f"(default: {DEFAULT_BATCH_PATTERN})."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes: per file in batch mode (default: "
+            "number of CPUs), per diagram for a file with several diagrams "
+            "(default: 1)."
+        ),
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -173,34 +495,177 @@ def main() -> None:
         action="store_true",
         help="Only display information about the diagram type.",
     )
+    parser.add_argument(
+        "--split",
+        choices=(SPLIT_PAGES, SPLIT_FILES),
+        help=(
+            "Output of files with several @startuml blocks: one Draw.io "
+            "document with a page per diagram, or a numbered file per diagram "
+            f"(default: {SPLIT_PAGES} for XML, {SPLIT_FILES} for JSON)."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory of the conversion cache (default: {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always convert, neither reading from nor writing to the cache.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=(
+            "Convert using a running p2d-server; falls back to converting "
+            "in-process if no daemon is reachable."
+        ),
+    )
+    parser.add_argument(
+        "--socket",
+        help="Path of the p2d-server socket (default: per-user temporary file).",
+    )
+    parser.add_argument(
+        "--timings",
+        nargs="?",
+        const="text",
+        choices=("text", "json"),
+        help=(
+            "Print the time of each conversion stage, the node and edge counts "
+            "and the output size to stderr, as a table or as JSON. Implies "
+            "converting in-process."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help=(
+            "Profile the conversion with cProfile, write the pstats to FILE and "
+            "print the most expensive functions to stderr. In batch mode the "
+            "profiles of all files are merged. Implies converting in-process."
+        ),
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help=(
+            "Trace allocations with tracemalloc and print the peak memory and "
+            "the top allocation sites of each stage to stderr. In batch mode "
+            "the reports of all files are aggregated. Implies converting "
+            "in-process."
+        ),
+    )
     args = parser.parse_args()
 
-    # Read input file
-    plantuml_content = read_plantuml_file(args.input)
-    if plantuml_content is None:
+    # Cache the index of installed processors next to the conversion cache
+    ProcessorRegistry.discovery_cache_dir = None if args.no_cache else args.cache_dir
+
+    if args.profile and args.memory_report:
+        # Tracing allocations would dominate the profile
+        print("Error: --profile cannot be combined with --memory-report")
         sys.exit(1)
 
-    # Determine diagram type
-    diagram_type, _ = ProcessorRegistry.detect_diagram_type(plantuml_content)
+    if args.split == SPLIT_PAGES and args.json:
+        print("Error: --split pages is only available for Draw.io XML output")
+        sys.exit(1)
+
+    if args.input_dir:
+        run_batch(args)
+        return
+
+    from plantuml2drawio.blocks import (find_diagram_blocks, open_large_file,
+                                        write_block_stream)
+
+    # Files with several diagrams are converted block by block; a single
+    # diagram is converted as a whole. Very large files are split on a
+    # memory map, so only one diagram at a time is decoded.
+    reader = None if args.info else open_large_file(args.input)
+    if reader is not None:
+        block_count = reader.count_blocks()
+        block_items = reader.iter_blocks()
+    else:
+        # Read input file
+        plantuml_content = read_plantuml_file(args.input)
+        if plantuml_content is None:
+            sys.exit(1)
+        blocks = find_diagram_blocks(plantuml_content)
+        block_count = len(blocks)
+        block_items = ((block, block.text(plantuml_content)) for block in blocks)
+    multiple = block_count > 1
 
     # Only show information if requested
     if args.info:
-        handle_info_request(diagram_type)
+        if not multiple:
+            diagram_type, _ = ProcessorRegistry.detect_diagram_type(plantuml_content)
+            handle_info_request(diagram_type)
+        for number, block in enumerate(blocks if multiple else (), 1):
+            print(f"Diagram {number}: {block.name}")
+            diagram_type, _ = ProcessorRegistry.detect_diagram_type(
+                block.text(plantuml_content)
+            )
+            handle_info_request(diagram_type)
         sys.exit(0)
 
     # Determine output file
     output_file = get_output_file_path(args.input, args.output, args.json)
 
-    # Process diagram
-    output_content, output_format = process_diagram(plantuml_content, args.json)
-    if output_content is None:
+    # Process diagram, preferring a running daemon if requested. Timings,
+    # profiles and memory reports are only available for in-process
+    # conversions. The diagrams of a multi-diagram file are always converted
+    # in-process, without the cache.
+    stats: Optional[ConversionStats] = None
+    memory_stats = None
+    if args.memory_report:
+        from plantuml2drawio.profiling import MemoryStats
+
+        stats = memory_stats = MemoryStats()
+    elif args.timings:
+        stats = ConversionStats()
+
+    with contextlib.ExitStack() as diagnostics:
+        if reader is not None:
+            diagnostics.enter_context(reader)
+        if args.profile:
+            from plantuml2drawio.profiling import profiled
+
+            diagnostics.enter_context(profiled(args.profile))
+        if memory_stats is not None:
+            diagnostics.enter_context(memory_stats.tracing())
+
+        if multiple:
+            written, ok = write_block_stream(
+                block_items,
+                block_count,
+                output_file,
+                args.json,
+                args.split,
+                min(args.jobs or 1, block_count),
+                stats,
+            )
+        else:
+            # Only files with several diagrams are read through a reader
+            assert plantuml_content is not None
+            written, ok = _convert_single_diagram(
+                args, plantuml_content, output_file, stats
+            )
+
+    output_format = OUTPUT_FORMAT_JSON if args.json else OUTPUT_FORMAT_XML
+    for path in written:
+        print(f"{output_format} file successfully created: {path}")
+    if not ok:
         sys.exit(1)
 
-    # Write content to file
-    if write_output_file(output_content, output_file):
-        print(f"{output_format} file successfully created: {output_file}")
-    else:
-        sys.exit(1)
+    if args.timings and stats is not None:
+        report = stats.to_json() if args.timings == "json" else stats.format()
+        print(report, file=sys.stderr)
+    if memory_stats is not None and args.timings != "json":
+        print(memory_stats.format_memory(), file=sys.stderr)
+    if args.profile:
+        from plantuml2drawio.profiling import format_profile
+
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+        print(format_profile(args.profile), file=sys.stderr)
 
 
 if __name__ == "__main__":
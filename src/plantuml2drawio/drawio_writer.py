@@ -0,0 +1,186 @@
+"""Streaming writer for Draw.io XML documents.
+
+The writer produces a Draw.io document one mxCell record at a time, either as
+an iterator of text chunks or written directly to a text stream. Large
+diagrams can therefore be saved without building the whole document as a
+single string first. Pages written on their own can be combined into one
+multi-page document with iter_multipage.
+"""
+
+import html
+from typing import Iterable, Iterator, NamedTuple, TextIO, Union
+
+
+class VertexCell(NamedTuple):
+    """A positioned vertex to write as an mxCell."""
+
+    id: str
+    label: str
+    style: str
+    x: Union[int, float]
+    y: Union[int, float]
+    width: Union[int, float]
+    height: Union[int, float]
+
+
+class EdgeCell(NamedTuple):
+    """A connection between two vertices to write as an mxCell."""
+
+    id: str
+    label: str
+    style: str
+    source: str
+    target: str
+
+
+def escape_label(label: str) -> str:
+    """Escape a label for use as the value of an mxCell.
+
+    All XML special characters are escaped and newlines are replaced by an
+    escaped HTML line break, which Draw.io renders for html=1 styles.
+
+    Args:
+        label: Label text, possibly spanning several lines
+
+    Returns:
+        The escaped label
+    """
+    return html.escape(label or "").replace("\n", "&lt;br&gt;")
+
+
+class DrawioWriter:
+    """Writes Draw.io documents consisting of a single diagram page.
+
+    The page can also be written on its own, as one page of a multi-page
+    document, see iter_page_chunks.
+    """
+
+    FILE_HEADER = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<mxfile host="app.diagrams.net" modified="2023-01-01T00:00:00.000Z" '
+        'agent="PlantUML2Drawio" version="14.6.13">\n'
+    )
+    FILE_FOOTER = "</mxfile>"
+    PAGE_FOOTER = "      </root>\n    </mxGraphModel>\n  </diagram>\n"
+    FOOTER = PAGE_FOOTER + FILE_FOOTER
+
+    def __init__(self, diagram_id: str = "diagram", diagram_name: str = "Diagram"):
+        """Initialize the writer.
+
+        Args:
+            diagram_id: ID of the diagram page
+            diagram_name: Name of the diagram page shown by Draw.io
+        """
+        self.diagram_id = diagram_id
+        self.diagram_name = diagram_name
+
+    def header(self) -> str:
+        """Return the document header up to and including the root cells."""
+        return self.FILE_HEADER + self.page_header()
+
+    def page_header(self) -> str:
+        """Return the page header up to and including the root cells."""
+        return (
+            f'  <diagram id="{html.escape(self.diagram_id)}" '
+            f'name="{html.escape(self.diagram_name)}">\n'
+            '    <mxGraphModel dx="1422" dy="798" grid="1" gridSize="10" '
+            'guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" '
+            'pageScale="1" pageWidth="827" pageHeight="1169" math="0" '
+            'shadow="0">\n'
+            "      <root>\n"
+            '        <mxCell id="0"/>\n'
+            '        <mxCell id="1" parent="0"/>\n'
+        )
+
+    @staticmethod
+    def vertex(cell: VertexCell) -> str:
+        """Return the mxCell record of a vertex."""
+        return (
+            f'        <mxCell id="{cell.id}" value="{escape_label(cell.label)}" '
+            f'style="{cell.style}" vertex="1" parent="1">\n'
+            f'          <mxGeometry x="{cell.x}" y="{cell.y}" '
+            f'width="{cell.width}" height="{cell.height}" as="geometry"/>\n'
+            "        </mxCell>\n"
+        )
+
+    @staticmethod
+    def edge(cell: EdgeCell) -> str:
+        """Return the mxCell record of an edge."""
+        return (
+            f'        <mxCell id="{cell.id}" value="{escape_label(cell.label)}" '
+            f'style="{cell.style}" edge="1" parent="1" source="{cell.source}" '
+            f'target="{cell.target}">\n'
+            '          <mxGeometry relative="1" as="geometry"/>\n'
+            "        </mxCell>\n"
+        )
+
+    def iter_chunks(
+        self, vertices: Iterable[VertexCell], edges: Iterable[EdgeCell]
+    ) -> Iterator[str]:
+        """Yield the document as text chunks, one per mxCell record.
+
+        The cells are consumed lazily, so they can be produced by generators.
+
+        Args:
+            vertices: Vertices of the diagram
+            edges: Edges of the diagram, written after all vertices
+
+        Yields:
+            Consecutive parts of the document
+        """
+        yield self.header()
+        for vertex in vertices:
+            yield self.vertex(vertex)
+        for edge in edges:
+            yield self.edge(edge)
+        yield self.FOOTER
+
+    def iter_page_chunks(
+        self, vertices: Iterable[VertexCell], edges: Iterable[EdgeCell]
+    ) -> Iterator[str]:
+        """Yield only the diagram page, to be combined with iter_multipage.
+
+        Args:
+            vertices: Vertices of the diagram
+            edges: Edges of the diagram, written after all vertices
+
+        Yields:
+            Consecutive parts of the page, one per mxCell record
+        """
+        yield self.page_header()
+        for vertex in vertices:
+            yield self.vertex(vertex)
+        for edge in edges:
+            yield self.edge(edge)
+        yield self.PAGE_FOOTER
+
+    def write(
+        self,
+        stream: TextIO,
+        vertices: Iterable[VertexCell],
+        edges: Iterable[EdgeCell],
+    ) -> None:
+        """Write the document to a text stream record by record.
+
+        Args:
+            stream: Text file object to write to
+            vertices: Vertices of the diagram
+            edges: Edges of the diagram, written after all vertices
+        """
+        for chunk in self.iter_chunks(vertices, edges):
+            stream.write(chunk)
+
+
+def iter_multipage(pages: Iterable[str]) -> Iterator[str]:
+    """Yield a Draw.io document with one diagram page per given page.
+
+    Args:
+        pages: Pages as produced by DrawioWriter.iter_page_chunks, each
+            joined into one string
+
+    Yields:
+        Consecutive parts of the document
+    """
+    yield DrawioWriter.FILE_HEADER
+    yield from pages
+    yield DrawioWriter.FILE_FOOTER
@@ -0,0 +1,195 @@
+"""Background work of the graphical user interface.
+
+Tk widgets may only be used from the main thread, and everything that runs
+there blocks the window. The GUI therefore reads files, detects and
+converts diagrams and writes the output with a BackgroundTask on a worker
+thread. The task reports the stage it is in and its outcome as messages on a
+queue, which the GUI drains by polling with root.after.
+
+Cancelling a task sets its cancel event; the conversion stops at its next
+check, e.g. in the middle of a large layout, and the task reports
+MSG_CANCELLED.
+"""
+
+import contextlib
+import os
+import queue
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from plantuml2drawio.core import run_pipeline
+from plantuml2drawio.processors.result import (STAGE_EXPORT,
+                                               ConversionCancelled,
+                                               check_cancelled)
+from plantuml2drawio.stats import ConversionStats
+
+# Kinds of messages a task puts on its queue
+MSG_STAGE = "stage"
+MSG_DONE = "done"
+MSG_ERROR = "error"
+MSG_CANCELLED = "cancelled"
+
+# Stages reported while reading a file and while converting one
+STAGE_READ = "read"
+READ_STAGES = (STAGE_READ, "detect")
+CONVERSION_STAGES = ("detect", "validate", "parse", "layout", STAGE_EXPORT)
+
+
+class ProgressStats(ConversionStats):
+    """Statistics that report the start of every timed stage."""
+
+    def __init__(self, report: Callable[[str], None]):
+        """Initialize empty statistics.
+
+        Args:
+            report: Called with the name of each stage as it starts
+        """
+        super().__init__()
+        self._report = report
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Report and time a stage.
+
+        Args:
+            name: Name of the stage
+        """
+        self._report(name)
+        with super().stage(name):
+            yield
+
+
+class BackgroundTask:
+    """Runs one job on a daemon thread and queues its progress and outcome.
+
+    The job is called with the given arguments and the keyword arguments
+    report, which takes the name of a stage, and cancel, the event that is
+    set when the task is cancelled. Its return value is the payload of the
+    MSG_DONE message, an exception it raises that of MSG_ERROR.
+    """
+
+    def __init__(self, job: Callable[..., Any], *args: Any):
+        """Prepare the task; start runs it.
+
+        Args:
+            job: Function to run on the worker thread
+            *args: Positional arguments of the job
+        """
+        self.messages: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(job, args), daemon=True
+        )
+
+    def start(self) -> "BackgroundTask":
+        """Start the worker thread and return the task."""
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Ask the job to stop at its next check."""
+        self.cancel_event.set()
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        """Return the messages queued since the last poll without waiting.
+
+        Returns:
+            Pairs of (message kind, payload) in the order they were queued
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the worker thread to finish."""
+        self._thread.join(timeout)
+
+    def _run(self, job: Callable[..., Any], args: Tuple) -> None:
+        """Run the job and queue its outcome."""
+        try:
+            value = job(*args, report=self._report, cancel=self.cancel_event)
+        except ConversionCancelled:
+            self.messages.put((MSG_CANCELLED, None))
+        except Exception as e:
+            self.messages.put((MSG_ERROR, e))
+        else:
+            self.messages.put((MSG_DONE, value))
+
+    def _report(self, stage: str) -> None:
+        """Queue the start of a stage."""
+        self.messages.put((MSG_STAGE, stage))
+
+
+def read_diagram(
+    file_path: str,
+    report: Callable[[str], None],
+    cancel: threading.Event,
+) -> Tuple[str, bool]:
+    """Read a PlantUML file and check whether it is an activity diagram.
+
+    Args:
+        file_path: Path to the PlantUML file
+        report: Called with the name of each stage as it starts
+        cancel: Event that cancels the job when set
+
+    Returns:
+        Tuple of (content, True if it is a valid activity diagram)
+
+    Raises:
+        OSError: If the file cannot be read
+        UnicodeDecodeError: If the file is not valid UTF-8
+        ConversionCancelled: If the job is cancelled
+    """
+    from plantuml2drawio.processors.activity_processor import \
+        is_valid_activity_diagram
+
+    report(STAGE_READ)
+    with open(file_path, "r", encoding="utf-8") as file:
+        content = file.read()
+
+    check_cancelled(cancel)
+    report("detect")
+    return content, is_valid_activity_diagram(content)
+
+
+def convert_to_file(
+    content: str,
+    output_path: str,
+    report: Callable[[str], None],
+    cancel: threading.Event,
+) -> str:
+    """Convert a diagram and write its Draw.io XML to a file.
+
+    The file is only created once the diagram has been laid out, and it is
+    removed again if the export fails or is cancelled.
+
+    Args:
+        content: Content of the PlantUML diagram
+        output_path: Path to the Draw.io file
+        report: Called with the name of each stage as it starts
+        cancel: Event that cancels the job when set
+
+    Returns:
+        The path of the written file
+
+    Raises:
+        ConversionError: If the content cannot be converted; its stage tells
+            where it failed
+        StageError: If the export fails
+        OSError: If the file cannot be written
+        ConversionCancelled: If the job is cancelled
+    """
+    result = run_pipeline(content, ProgressStats(report), cancel)
+
+    report(STAGE_EXPORT)
+    try:
+        with open(output_path, "w", encoding="utf-8") as file:
+            result.write_drawio(file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(output_path)
+        raise
+    return output_path
@@ -0,0 +1,363 @@
+"""Syntax highlighting of PlantUML in the GUI editor.
+
+highlight_line tokenizes one line with a single regular expression in
+Python. Activities (":...;") and bracketed text ("[...]") may span lines,
+so every line starts in a state that is carried over from the line before.
+
+TextHighlighter applies the tokens to a Tk text widget incrementally: edits
+only mark their lines dirty, and once no edit has happened for a short
+delay, the dirty lines are tokenized again, the visible ones first. Lines
+after them are only revisited while the state carried into them changes,
+and what remains is highlighted in batches while the editor is idle. The
+tags of each batch are set with one Tk call per tag, so typing stays fast
+regardless of the size of the file.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Tags set by the highlighter; the GUI configures their colors
+TAG_KEYWORD = "keyword"
+TAG_COMMENT = "comment"
+TAG_ARROW = "arrow"
+TAG_BRACKET = "bracket"
+TAG_CONDITION = "condition"
+TAG_ACTIVITY = "activity_content"
+
+# States a line can start in
+STATE_NORMAL = "normal"
+STATE_ACTIVITY = "activity"
+STATE_BRACKET = "bracket"
+
+# Invisible tags on the newline of a line that ends inside an activity or
+# brackets; they store the state carried into the next line in the widget
+STATE_TAGS = {STATE_ACTIVITY: "state_activity", STATE_BRACKET: "state_bracket"}
+
+HIGHLIGHT_TAGS = (
+    TAG_KEYWORD,
+    TAG_COMMENT,
+    TAG_ARROW,
+    TAG_BRACKET,
+    TAG_CONDITION,
+    TAG_ACTIVITY,
+) + tuple(STATE_TAGS.values())
+
+# Milliseconds without edits before the dirty lines are highlighted
+HIGHLIGHT_DELAY_MS = 150
+
+# Lines highlighted per idle callback outside the visible area
+HIGHLIGHT_BATCH_LINES = 500
+
+KEYWORDS = (
+    "end partition",
+    "end fork",
+    "end note",
+    "end split",
+    "partition",
+    "backward",
+    "forward",
+    "repeat",
+    "detach",
+    "endif",
+    "start",
+    "while",
+    "split",
+    "stop",
+    "then",
+    "else",
+    "fork",
+    "note",
+    "if",
+)
+
+# Closing character of each multi-line state
+_CLOSERS = {STATE_ACTIVITY: ";", STATE_BRACKET: "]"}
+
+_RE_TOKEN = re.compile(
+    r"(?P<activity>:)"
+    r"|(?P<bracket>\[)"
+    r"|(?P<condition>\([^()]*\))"
+    r"|(?P<arrow><<-|<--|<\.\.|<-|->>|-->|->|\.\.>)"
+    r"|(?P<keyword>@startuml|@enduml|\b(?:"
+    + "|".join(keyword.replace(" ", r"\s+") for keyword in KEYWORDS)
+    + r")\b)",
+    re.IGNORECASE,
+)
+
+# Highlighted span of a line: (tag, start column, end column)
+Span = Tuple[str, int, int]
+
+
+def highlight_line(line: str, state: str = STATE_NORMAL) -> Tuple[List[Span], str]:
+    """Tokenize one line of PlantUML.
+
+    Args:
+        line: The line without its newline
+        state: State the line starts in, see the STATE_ constants
+
+    Returns:
+        Tuple of (highlighted spans, state carried into the next line)
+    """
+    spans: List[Span] = []
+    if state == STATE_NORMAL and line.lstrip().startswith("'"):
+        return [(TAG_COMMENT, line.index("'"), len(line))], state
+
+    pos = 0
+    while True:
+        if state != STATE_NORMAL:
+            # Inside an activity or brackets until the closing character
+            end = line.find(_CLOSERS[state], pos)
+            if end < 0:
+                if pos < len(line):
+                    spans.append((TAG_ACTIVITY, pos, len(line)))
+                return spans, state
+            if end > pos:
+                spans.append((TAG_ACTIVITY, pos, end))
+            spans.append((TAG_BRACKET, end, end + 1))
+            pos = end + 1
+            state = STATE_NORMAL
+            continue
+
+        match = _RE_TOKEN.search(line, pos)
+        if match is None:
+            return spans, state
+        kind = match.lastgroup
+        start, pos = match.span()
+        if kind == "activity":
+            spans.append((TAG_BRACKET, start, pos))
+            state = STATE_ACTIVITY
+        elif kind == "bracket":
+            spans.append((TAG_BRACKET, start, pos))
+            state = STATE_BRACKET
+        elif kind == "condition":
+            spans.append((TAG_BRACKET, start, start + 1))
+            if pos - start > 2:
+                spans.append((TAG_CONDITION, start + 1, pos - 1))
+            spans.append((TAG_BRACKET, pos - 1, pos))
+        elif kind == "arrow":
+            spans.append((TAG_ARROW, start, pos))
+        else:
+            spans.append((TAG_KEYWORD, start, pos))
+
+
+class TextHighlighter:
+    """Highlights a Tk text widget incrementally after edits.
+
+    The dirty lines and the lines still to be highlighted are kept as marks
+    in the widget, so they move along with later edits.
+    """
+
+    _DIRTY_START = "highlight_dirty_start"
+    _DIRTY_END = "highlight_dirty_end"
+    _REST_START = "highlight_rest_start"
+    _REST_END = "highlight_rest_end"
+
+    def __init__(
+        self,
+        text,
+        delay_ms: int = HIGHLIGHT_DELAY_MS,
+        batch_lines: int = HIGHLIGHT_BATCH_LINES,
+    ):
+        """Attach the highlighter to a text widget.
+
+        Args:
+            text: tkinter.Text widget whose tags are set
+            delay_ms: Milliseconds without edits before highlighting
+            batch_lines: Lines highlighted per idle callback outside the
+                visible area
+        """
+        self.text = text
+        self.delay_ms = delay_ms
+        self.batch_lines = batch_lines
+        self._dirty = False
+        self._rest = False
+        self._timer: Optional[str] = None
+        self._batch: Optional[str] = None
+        for mark, gravity in (
+            (self._DIRTY_START, "left"),
+            (self._DIRTY_END, "right"),
+            (self._REST_START, "left"),
+            (self._REST_END, "right"),
+        ):
+            text.mark_set(mark, "1.0")
+            text.mark_gravity(mark, gravity)
+
+    def bind(self) -> None:
+        """Mark the lines of keyboard edits and pastes dirty."""
+        # Before an edit for the selection it replaces, after it for the
+        # text it inserted
+        self.text.bind("<KeyPress>", lambda event: self.mark_selection(), add="+")
+        self.text.bind("<KeyRelease>", lambda event: self.mark_dirty(), add="+")
+        self.text.bind("<ButtonRelease-2>", lambda event: self.mark_dirty(), add="+")
+
+    def mark_selection(self) -> None:
+        """Mark the lines of the selection and the insert cursor dirty."""
+        if self.text.tag_ranges("sel"):
+            self.mark_dirty("sel.first", "sel.last")
+        else:
+            self.mark_dirty()
+
+    def mark_dirty(self, first: str = "insert", last: Optional[str] = None) -> None:
+        """Mark lines dirty and restart the delay before highlighting them.
+
+        Args:
+            first: Text index in the first dirty line
+            last: Text index in the last dirty line; None for first's line
+        """
+        start = self.text.index(f"{first} linestart")
+        end = self.text.index(f"{last or first} lineend")
+        if self._dirty:
+            if self.text.compare(self._DIRTY_START, "<", start):
+                start = self.text.index(self._DIRTY_START)
+            if self.text.compare(self._DIRTY_END, ">", end):
+                end = self.text.index(self._DIRTY_END)
+        self.text.mark_set(self._DIRTY_START, start)
+        self.text.mark_set(self._DIRTY_END, end)
+        self._dirty = True
+
+        if self._timer is not None:
+            self.text.after_cancel(self._timer)
+        self._timer = self.text.after(self.delay_ms, self.flush)
+
+    def highlight_all(self) -> None:
+        """Highlight the whole text, the visible lines right away."""
+        self.mark_dirty("1.0", "end-1c")
+        self.flush()
+
+    def flush(self) -> None:
+        """Highlight the dirty lines now, the visible ones first."""
+        if self._timer is not None:
+            self.text.after_cancel(self._timer)
+            self._timer = None
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        # Add the dirty lines to those still to be highlighted
+        start, end = self._DIRTY_START, self._DIRTY_END
+        if self._rest:
+            if self.text.compare(self._REST_START, "<", start):
+                start = self._REST_START
+            if self.text.compare(self._REST_END, ">", end):
+                end = self._REST_END
+        self._set_rest(self.text.index(start), self.text.index(end))
+
+        # Highlight the visible part right away
+        rest_first, rest_last = self._rest_lines()
+        top = _line(self.text.index("@0,0"))
+        bottom = _line(self.text.index(f"@0,{self.text.winfo_height()}"))
+        first, last = max(rest_first, top), min(rest_last, bottom)
+        if first <= last:
+            next_line = self._highlight(first, last, bottom - first + 1)
+            if first == rest_first:
+                if next_line is None and last < rest_last:
+                    next_line = last + 1
+                self._advance_rest(next_line, rest_last)
+
+        self._schedule_batch()
+
+    def _highlight_batch(self) -> None:
+        """Highlight the next batch of remaining lines; an idle callback."""
+        self._batch = None
+        if not self._rest:
+            return
+        first, last = self._rest_lines()
+        self._advance_rest(self._highlight(first, last, self.batch_lines), last)
+        self._schedule_batch()
+
+    def _schedule_batch(self) -> None:
+        """Highlight the remaining lines when the editor is idle."""
+        if self._rest and self._batch is None:
+            self._batch = self.text.after_idle(self._highlight_batch)
+
+    def _set_rest(self, start: str, end: str) -> None:
+        """Set the range of lines still to be highlighted."""
+        self.text.mark_set(self._REST_START, start)
+        self.text.mark_set(self._REST_END, end)
+        self._rest = True
+
+    def _rest_lines(self) -> Tuple[int, int]:
+        """Return the first and last line still to be highlighted."""
+        return _line(self.text.index(self._REST_START)), _line(
+            self.text.index(self._REST_END)
+        )
+
+    def _advance_rest(self, next_line: Optional[int], last: int) -> None:
+        """Continue the remaining lines at next_line, or finish them."""
+        if next_line is None:
+            self._rest = False
+            return
+        self._set_rest(f"{next_line}.0", f"{max(last, next_line)}.0 lineend")
+
+    def _highlight(self, first: int, last: int, limit: int) -> Optional[int]:
+        """Tokenize lines and replace their tags in one batch.
+
+        Lines after last are highlighted as well as long as the state
+        carried into them changes.
+
+        Args:
+            first: First line to highlight
+            last: Last line that has to be highlighted
+            limit: Upper bound of lines highlighted in this call
+
+        Returns:
+            The line to continue with, or None if nothing is left
+        """
+        line_count = _line(self.text.index("end-1c"))
+        stop = min(line_count, first + max(1, limit) - 1)
+        lines = self.text.get(f"{first}.0", f"{stop}.0 lineend").split("\n")
+        old_states = self._line_end_states(first, stop)
+
+        state = self._state_before(first)
+        ranges: Dict[str, List[str]] = {tag: [] for tag in HIGHLIGHT_TAGS}
+        next_line: Optional[int] = None
+        line_no = first
+        for line_no, line in enumerate(lines, first):
+            spans, state = highlight_line(line, state)
+            for tag, start, end in spans:
+                ranges[tag].extend((f"{line_no}.{start}", f"{line_no}.{end}"))
+            if state != STATE_NORMAL:
+                newline = f"{line_no}.{len(line)}"
+                ranges[STATE_TAGS[state]].extend((newline, f"{newline}+1c"))
+            if line_no >= last and state == old_states.get(line_no, STATE_NORMAL):
+                break
+        else:
+            if line_no < line_count:
+                next_line = line_no + 1
+
+        # Replace the tags of the highlighted lines, including their newlines
+        highlighted_end = f"{line_no}.0 lineend +1c"
+        for tag, indices in ranges.items():
+            self.text.tag_remove(tag, f"{first}.0", highlighted_end)
+            if indices:
+                self.text.tag_add(tag, *indices)
+        return next_line
+
+    def _state_before(self, line_no: int) -> str:
+        """Return the state carried into a line from the line before."""
+        if line_no <= 1:
+            return STATE_NORMAL
+        tags = self.text.tag_names(f"{line_no - 1}.0 lineend")
+        for state, tag in STATE_TAGS.items():
+            if tag in tags:
+                return state
+        return STATE_NORMAL
+
+    def _line_end_states(self, first: int, last: int) -> Dict[int, str]:
+        """Return the states stored at the ends of lines, other than normal."""
+        states = {}
+        end = f"{last}.0 lineend +1c"
+        for state, tag in STATE_TAGS.items():
+            index = f"{first}.0"
+            while True:
+                found = self.text.tag_nextrange(tag, index, end)
+                if not found:
+                    break
+                states[_line(found[0])] = state
+                index = found[1]
+        return states
+
+
+def _line(index: str) -> int:
+    """Return the line number of a Tk text index like "12.4"."""
+    return int(index.split(".", 1)[0])
@@ -0,0 +1,524 @@
+"""Local HTTP conversion service.
+
+A small HTTP server built on the standard library that converts PlantUML
+posted to it. It only listens on the loopback interface and needs no
+external services.
+
+    POST /convert              PlantUML in the body, Draw.io XML returned
+    POST /convert?format=json  the same with JSON output
+    GET  /metrics              request counts and latency histograms in the
+                               Prometheus text format
+    GET  /health               "ok" while the service is running
+
+Recent results are kept in an in-memory LRU cache keyed by the content hash,
+identical requests that arrive while the first one is still being converted
+wait for that conversion instead of starting their own, and the conversions
+run on a pool of worker processes that is warmed up at start.
+"""
+
+import argparse
+import bisect
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from plantuml2drawio import api
+from plantuml2drawio.api import ConversionResult
+from plantuml2drawio.cache import make_cache_key
+from plantuml2drawio.core import ConversionError
+from plantuml2drawio.logging_config import get_logger, setup_logging
+from plantuml2drawio.stats import ConversionStats
+
+logger = get_logger("http_server")
+
+# Only the loopback interface is served
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Upper bound for a request body, protects the service from bogus clients
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# Bounds of the in-memory result cache
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# How a conversion request was answered, the label of its latency
+SOURCE_CACHE = "cache"
+SOURCE_COALESCED = "coalesced"
+SOURCE_CONVERTED = "converted"
+
+CONTENT_TYPES = {
+    False: "application/xml; charset=utf-8",
+    True: "application/json; charset=utf-8",
+}
+
+
+class LRUCache:
+    """Thread-safe in-memory cache bounded by entries and output size."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Upper bound for the number of entries
+            max_bytes: Upper bound for the total size of the outputs
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "collections.OrderedDict[str, ConversionResult]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[ConversionResult]:
+        """Return the entry of a key and mark it as recently used.
+
+        Args:
+            key: Cache key, see cache.make_cache_key
+
+        Returns:
+            The cached result or None on a miss
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: ConversionResult) -> None:
+        """Store a result, evicting the least recently used entries.
+
+        Args:
+            key: Cache key, see cache.make_cache_key
+            result: Result of the conversion
+        """
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= _result_size(previous)
+            self._entries[key] = result
+            self.total_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= _result_size(evicted)
+
+
+def _result_size(result: ConversionResult) -> int:
+    """Approximate the memory held by a cached result."""
+    return len(result.output or "") + len(str(result.error or ""))
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of request latencies with fixed buckets."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Ascending upper bounds of the buckets in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency.
+
+        Args:
+            seconds: Latency in seconds
+        """
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+
+    def render(self, name: str, labels: str) -> List[str]:
+        """Return the histogram in the Prometheus text format.
+
+        Args:
+            name: Metric name
+            labels: Labels of this histogram, e.g. 'source="cache"'
+
+        Returns:
+            Lines of the bucket, sum and count samples
+        """
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class ServiceMetrics:
+    """Counters and latency histograms of the service."""
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.latency: Dict[str, LatencyHistogram] = {
+            source: LatencyHistogram()
+            for source in (SOURCE_CACHE, SOURCE_COALESCED, SOURCE_CONVERTED)
+        }
+        self.responses: Dict[int, int] = collections.Counter()
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def record(self, status: int, source: Optional[str], seconds: float) -> None:
+        """Record a finished request.
+
+        Args:
+            status: HTTP status code of the response
+            source: How a conversion request was answered, None for others
+            seconds: Time from receiving the request to sending the response
+        """
+        with self._lock:
+            self.responses[status] += 1
+        if source is not None:
+            self.latency[source].observe(seconds)
+
+    def render(self, cache: LRUCache) -> str:
+        """Return all metrics in the Prometheus text format.
+
+        Args:
+            cache: Result cache of the service
+
+        Returns:
+            The metrics page
+        """
+        name = "p2d_request_duration_seconds"
+        lines = [
+            f"# HELP {name} Latency of conversion requests by how they were "
+            "answered.",
+            f"# TYPE {name} histogram",
+        ]
+        for source, histogram in self.latency.items():
+            lines.extend(histogram.render(name, f'source="{source}"'))
+
+        lines.append("# HELP p2d_responses_total Responses by HTTP status code.")
+        lines.append("# TYPE p2d_responses_total counter")
+        with self._lock:
+            responses = sorted(self.responses.items())
+            in_flight = self.in_flight
+        for status, count in responses:
+            lines.append(f'p2d_responses_total{{status="{status}"}} {count}')
+
+        lines.extend(
+            [
+                "# HELP p2d_conversions_in_flight Conversions running right now.",
+                "# TYPE p2d_conversions_in_flight gauge",
+                f"p2d_conversions_in_flight {in_flight}",
+                "# HELP p2d_cache_entries Results in the in-memory cache.",
+                "# TYPE p2d_cache_entries gauge",
+                f"p2d_cache_entries {len(cache)}",
+                "# HELP p2d_cache_bytes Size of the results in the cache.",
+                "# TYPE p2d_cache_bytes gauge",
+                f"p2d_cache_bytes {cache.total_bytes}",
+            ]
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _warm_worker() -> None:
+    """Load the processors in a worker before it receives its first request."""
+    from plantuml2drawio.processors import ProcessorRegistry
+
+    ProcessorRegistry.get_all_processors()
+
+
+class ConversionService:
+    """Converts diagrams through the cache, coalescing and the worker pool.
+
+    The service is thread-safe; the HTTP server calls it from one thread per
+    request.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        workers: Optional[int] = None,
+        cache: Optional[LRUCache] = None,
+    ):
+        """Initialize the service and warm up its worker pool.
+
+        Args:
+            executor: Executor to convert on; None creates a process pool
+                that is shut down by close
+            workers: Number of worker processes of a created pool; None
+                uses the number of CPUs
+            cache: Result cache; None creates one with the default bounds
+        """
+        self._owns_executor = executor is None
+        if executor is None:
+            workers = workers or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_warm_worker
+            )
+            # Start every worker now, so the first requests are served warm
+            for future in [executor.submit(_warm_worker) for _ in range(workers)]:
+                future.result()
+        self.executor = executor
+        self.cache = cache if cache is not None else LRUCache()
+        self.metrics = ServiceMetrics()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def convert(
+        self, content: str, output_json: bool
+    ) -> Tuple[ConversionResult, str]:
+        """Convert a diagram, from the cache or shared with identical requests.
+
+        Args:
+            content: Content of the PlantUML diagram
+            output_json: If True, output JSON, otherwise XML
+
+        Returns:
+            Tuple of (result, SOURCE_CACHE, SOURCE_COALESCED or
+            SOURCE_CONVERTED)
+        """
+        key = make_cache_key(content, output_json)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached, SOURCE_CACHE
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                source = SOURCE_COALESCED
+            else:
+                source = SOURCE_CONVERTED
+                future = self.executor.submit(api.convert, content, output_json)
+                self._in_flight[key] = future
+                self.metrics.in_flight += 1
+                future.add_done_callback(lambda done: self._finish(key, done))
+
+        try:
+            return future.result(), source
+        except Exception as e:
+            # The pool itself failed, e.g. a worker process died
+            error = ConversionError(f"Worker error: {e}")
+            stats = ConversionStats()
+            return ConversionResult(None, None, None, stats, 0.0, error), source
+
+    def _finish(self, key: str, future: Future) -> None:
+        """Cache the result of a finished conversion and forget the request."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+            self.metrics.in_flight -= 1
+            if not future.cancelled() and future.exception() is None:
+                # Errors are cached as well, conversions are deterministic
+                self.cache.put(key, future.result())
+
+    def close(self) -> None:
+        """Shut down the worker pool if the service created it."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+
+class ConversionHTTPRequestHandler(BaseHTTPRequestHandler):
+    """Answers the requests of one HTTP connection."""
+
+    server: "ConversionHTTPServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Serve the metrics and health pages."""
+        started = time.perf_counter()
+        path = urlsplit(self.path).path
+        service = self.server.service
+        if path == "/metrics":
+            body = service.metrics.render(service.cache)
+            status = self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/health":
+            status = self._send(200, "ok\n", "text/plain; charset=utf-8")
+        else:
+            status = self._send(404, "Not found\n", "text/plain; charset=utf-8")
+        service.metrics.record(status, None, time.perf_counter() - started)
+
+    def do_POST(self) -> None:
+        """Convert the PlantUML in the request body."""
+        started = time.perf_counter()
+        service = self.server.service
+        url = urlsplit(self.path)
+        source = None
+        if url.path != "/convert":
+            status = self._send(404, "Not found\n", "text/plain; charset=utf-8")
+            service.metrics.record(status, source, time.perf_counter() - started)
+            return
+
+        output_format = parse_qs(url.query).get("format", ["drawio"])[-1]
+        content, problem = self._read_body()
+        if problem is not None:
+            status, message = problem
+            status = self._send(status, f"{message}\n", "text/plain; charset=utf-8")
+        elif output_format not in ("drawio", "json"):
+            status = self._send(
+                400, "format must be drawio or json\n", "text/plain; charset=utf-8"
+            )
+        else:
+            output_json = output_format == "json"
+            result, source = service.convert(content, output_json)
+            if result.ok:
+                status = self._send(
+                    200, result.output, CONTENT_TYPES[output_json], source
+                )
+            else:
+                status = self._send(
+                    422, f"{result.error}\n", "text/plain; charset=utf-8", source
+                )
+        service.metrics.record(status, source, time.perf_counter() - started)
+
+    def _read_body(self) -> Tuple[str, Optional[Tuple[int, str]]]:
+        """Read the request body as text.
+
+        Returns:
+            Tuple of (body, None) or ("", (status, message)) if it is invalid
+        """
+        header = self.headers.get("Content-Length")
+        if header is None:
+            self.close_connection = True
+            return "", (411, "Content-Length required")
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # A negative length would make rfile.read wait for the client to
+            # close the connection
+            self.close_connection = True
+            return "", (400, "Content-Length must be a non-negative integer")
+        if length > MAX_REQUEST_BYTES:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            return "", (413, f"Request body exceeds {MAX_REQUEST_BYTES} bytes")
+        data = self.rfile.read(length)
+        try:
+            return data.decode("utf-8"), None
+        except UnicodeDecodeError:
+            return "", (400, "Request body is not valid UTF-8")
+
+    def _send(
+        self, status: int, body: str, content_type: str, source: Optional[str] = None
+    ) -> int:
+        """Send a complete response and return its status code."""
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if source is not None:
+            self.send_header("X-P2D-Source", source)
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+        return status
+
+    def log_message(self, format: str, *args) -> None:
+        """Log requests at debug level instead of writing them to stderr."""
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ConversionHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server that hands conversions to a ConversionService."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int, service: ConversionService):
+        """Bind the server to the loopback interface.
+
+        Args:
+            port: TCP port; 0 picks a free one
+            service: Service that converts the requests
+        """
+        self.service = service
+        super().__init__((HOST, port), ConversionHTTPRequestHandler)
+
+
+def serve(port: int, workers: Optional[int] = None) -> None:
+    """Run the service until it is interrupted.
+
+    Args:
+        port: TCP port on the loopback interface
+        workers: Number of worker processes; None uses the number of CPUs
+    """
+    service = ConversionService(workers=workers)
+    try:
+        with ConversionHTTPServer(port, service) as server:
+            print(f"Listening on http://{HOST}:{server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        service.close()
+
+
+def main() -> None:
+    """Entry point of p2d-http."""
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Runs a local HTTP service that converts PlantUML posted to "
+            "/convert and reports metrics on /metrics."
+        )
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"TCP port on {HOST} (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    args = parser.parse_args()
+
+    # Shut down cleanly when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        serve(args.port, args.workers)
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
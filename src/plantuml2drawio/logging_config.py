@@ -1,14 +1,15 @@
 """Logging configuration for the plantuml2drawio package."""
 
 import logging
-import logging.handlers
-from pathlib import Path
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Union
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 
 def setup_logging(
     log_level: Union[str, int] = logging.INFO,
-    log_file: Optional[Union[str, Path]] = None,
+    log_file: Optional[Union[str, "Path"]] = None,
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
     backup_count: int = 5,
@@ -40,9 +41,12 @@ def setup_logging(
 
     # File handler (if log_file is specified)
     if log_file:
+        from logging.handlers import RotatingFileHandler
+        from pathlib import Path
+
         log_file = Path(log_file)
         log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = RotatingFileHandler(
             log_file,
             maxBytes=max_bytes,
             backupCount=backup_count,
@@ -4,6 +4,8 @@ This module contains the base classes for diagram elements that are used
 across different diagram types.
 """
 
+from typing import Optional
+
 
 class Node:
     """Base class for diagram nodes.
@@ -20,6 +22,10 @@ class Node:
         height: Height of the node.
     """
 
+    # Diagrams can contain hundreds of thousands of nodes, so instances do
+    # without a per-instance __dict__
+    __slots__ = ("id", "label", "type", "x", "y", "width", "height")
+
     def __init__(
         self,
         node_id: str,
@@ -62,6 +68,8 @@ class Edge:
         label: Optional label for the edge.
     """
 
+    __slots__ = ("source", "target", "label", "_id")
+
     def __init__(self, source: str, target: str, label: str = ""):
         """Initialize an edge.
 
@@ -70,7 +78,18 @@ class Edge:
             target: ID of the target node.
             label: Optional label for the edge.
         """
-        self.id = f"{source}_{target}"
         self.source = source
         self.target = target
         self.label = label
+        self._id: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        """Unique identifier, derived from source and target unless set."""
+        if self._id is None:
+            return f"{self.source}_{self.target}"
+        return self._id
+
+    @id.setter
+    def id(self, value: str) -> None:
+        self._id = value
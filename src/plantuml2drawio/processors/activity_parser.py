@@ -0,0 +1,430 @@
+"""Single-pass lexer and recursive-descent parser for activity diagrams.
+
+The lexer walks the PlantUML source once, line by line, and produces tokens
+with their source offsets. The parser turns the token stream into a small
+abstract syntax tree, which build_activity_graph converts into the nodes and
+edges used by layout and export. Every step is linear in the input size.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Try to import from installed package or development path
+try:
+    # Installed package path
+    from plantuml2drawio.models import Edge, Node
+except ImportError:
+    # Development path
+    from src.plantuml2drawio.models import Edge, Node
+
+# Token kinds
+TOKEN_START = "start"
+TOKEN_STOP = "stop"
+TOKEN_ACTIVITY = "activity"
+TOKEN_IF = "if"
+TOKEN_ELSEIF = "elseif"
+TOKEN_ELSE = "else"
+TOKEN_ENDIF = "endif"
+
+# All patterns are applied to a single stripped line
+RE_ACTIVITY_TEXT = re.compile(r":\s*(.+?);", re.DOTALL)
+RE_IF_OPEN = re.compile(r"if\s*\(", re.IGNORECASE)
+RE_IF = re.compile(r"if\s*\((.*)\)\s*then\b(?:\s*\((.*?)\))?", re.IGNORECASE)
+RE_ELSEIF = re.compile(
+    r"else\s*if\s*\((.*)\)\s*then\b(?:\s*\((.*?)\))?", re.IGNORECASE
+)
+RE_ELSE = re.compile(r"else\b\s*(?:\((.*?)\))?\s*$", re.IGNORECASE)
+RE_ENDIF = re.compile(r"end\s*if\s*$", re.IGNORECASE)
+
+
+class Token(NamedTuple):
+    """A lexical token of an activity diagram.
+
+    Attributes:
+        kind: One of the TOKEN_* constants.
+        text: Activity label or if/elseif condition.
+        label: Branch label of if/elseif/else tokens.
+        offset: Offset of the token's first character in the source.
+        line: 1-based line number of the token's first line.
+    """
+
+    kind: str
+    text: str
+    label: str
+    offset: int
+    line: int
+
+
+def tokenize(content: str) -> Iterator[Token]:
+    """Split PlantUML activity diagram content into tokens.
+
+    Comments, blank lines and @-directives are skipped, as are statements the
+    converter does not model (while, fork, partitions, notes, ...). Activities
+    and if conditions may span several lines.
+
+    Args:
+        content: PlantUML content to tokenize
+
+    Yields:
+        Tokens in source order
+    """
+    pos = 0
+    line_no = 0
+    length = len(content)
+
+    # State of a statement that continues on the following lines
+    pending_kind = None
+    pending_parts: List[str] = []
+    pending_offset = 0
+    pending_line = 0
+
+    while pos < length:
+        end = content.find("\n", pos)
+        if end == -1:
+            end = length
+        raw = content[pos:end]
+        line_no += 1
+        line_offset = pos + len(raw) - len(raw.lstrip())
+        pos = end + 1
+
+        line = raw.strip()
+        if not line or line.startswith("@") or line.startswith("'"):
+            continue
+
+        if pending_kind == TOKEN_ACTIVITY:
+            pending_parts.append(line)
+            if line.endswith(";"):
+                match = RE_ACTIVITY_TEXT.search("\n".join(pending_parts))
+                if match:
+                    label = match.group(1).strip()
+                    yield Token(TOKEN_ACTIVITY, label, "", pending_offset, pending_line)
+                pending_kind = None
+            continue
+
+        if line.startswith(":") and not line.endswith(";"):
+            pending_kind = TOKEN_ACTIVITY
+            pending_parts = [line]
+            pending_offset, pending_line = line_offset, line_no
+            continue
+
+        if pending_kind == TOKEN_IF:
+            pending_parts.append(line)
+            if "then" in line.lower():
+                token = _match_if(" ".join(pending_parts), pending_offset, pending_line)
+                if token:
+                    yield token
+                pending_kind = None
+            continue
+
+        if RE_IF_OPEN.match(line) and "then" not in line.lower():
+            pending_kind = TOKEN_IF
+            pending_parts = [line]
+            pending_offset, pending_line = line_offset, line_no
+            continue
+
+        yield from _tokenize_line(line, line_offset, line_no)
+
+
+def _match_if(text: str, offset: int, line_no: int) -> Optional[Token]:
+    """Create an if token from a complete if statement, if it is one."""
+    match = RE_IF.match(text)
+    if not match:
+        return None
+    return Token(
+        TOKEN_IF,
+        match.group(1).strip(),
+        (match.group(2) or "").strip(),
+        offset,
+        line_no,
+    )
+
+
+def _tokenize_line(line: str, offset: int, line_no: int) -> Iterator[Token]:
+    """Create the tokens of a single complete, stripped line."""
+    keyword = line.lower()
+    if keyword == TOKEN_START:
+        yield Token(TOKEN_START, "", "", offset, line_no)
+        return
+    if keyword == TOKEN_STOP:
+        yield Token(TOKEN_STOP, "", "", offset, line_no)
+        return
+
+    if keyword.startswith("if"):
+        token = _match_if(line, offset, line_no)
+        if token:
+            yield token
+            return
+
+    if keyword.startswith("else"):
+        match = RE_ELSEIF.match(line)
+        if match:
+            yield Token(
+                TOKEN_ELSEIF,
+                match.group(1).strip(),
+                (match.group(2) or "").strip(),
+                offset,
+                line_no,
+            )
+            return
+        match = RE_ELSE.match(line)
+        if match:
+            yield Token(TOKEN_ELSE, "", (match.group(1) or "").strip(), offset, line_no)
+            return
+
+    if keyword.startswith("end") and RE_ENDIF.match(line):
+        yield Token(TOKEN_ENDIF, "", "", offset, line_no)
+        return
+
+    # Only scan up to the last semicolon, so colons without a closing
+    # semicolon cannot make the search quadratic in the line length
+    for match in RE_ACTIVITY_TEXT.finditer(line, 0, line.rfind(";") + 1):
+        yield Token(
+            TOKEN_ACTIVITY,
+            match.group(1).strip(),
+            "",
+            offset + match.start(),
+            line_no,
+        )
+
+
+class Activity(NamedTuple):
+    """An activity statement."""
+
+    label: str
+    offset: int
+
+
+class IfBlock(NamedTuple):
+    """An if statement with its two branches."""
+
+    condition: str
+    then_label: str
+    then_body: List["Statement"]
+    else_label: str
+    else_body: List["Statement"]
+    offset: int
+
+
+class Terminal(NamedTuple):
+    """A start or stop statement."""
+
+    kind: str
+    offset: int
+
+
+Statement = Union[Activity, IfBlock, Terminal]
+
+
+class ActivityParser:
+    """Recursive-descent parser from tokens to an activity diagram AST."""
+
+    def __init__(self, tokens: Iterator[Token]):
+        """Initialize the parser.
+
+        Args:
+            tokens: Token stream as produced by tokenize
+        """
+        self._tokens = tokens
+        self._current: Optional[Token] = next(tokens, None)
+
+    def _advance(self) -> Optional[Token]:
+        """Consume the current token and return it."""
+        token = self._current
+        self._current = next(self._tokens, None)
+        return token
+
+    def parse(self) -> List[Statement]:
+        """Parse the whole token stream.
+
+        Branch keywords without a matching if are ignored.
+
+        Returns:
+            Top-level statements of the diagram
+        """
+        statements = []
+        while self._current is not None:
+            statements.extend(self._parse_block())
+            if self._current is not None:
+                # Stray else/elseif/endif on the top level
+                self._advance()
+        return statements
+
+    def _parse_block(self) -> List[Statement]:
+        """Parse statements up to the next branch keyword or the end."""
+        statements: List[Statement] = []
+        while self._current is not None:
+            token = self._current
+            if token.kind in (TOKEN_ELSEIF, TOKEN_ELSE, TOKEN_ENDIF):
+                break
+            self._advance()
+            if token.kind == TOKEN_ACTIVITY:
+                statements.append(Activity(token.text, token.offset))
+            elif token.kind == TOKEN_IF:
+                statements.append(self._parse_if(token))
+            else:
+                statements.append(Terminal(token.kind, token.offset))
+        return statements
+
+    def _parse_if(self, if_token: Token) -> IfBlock:
+        """Parse the branches of an if statement up to its endif.
+
+        An elseif chain is represented as nested if blocks in the else
+        branches. The chain is collected iteratively, so long chains do not
+        deepen the recursion. A missing endif closes the block at the end of
+        the input.
+        """
+        chain = [(if_token, self._parse_block())]
+        else_label = ""
+        else_body: List[Statement] = []
+
+        while self._current is not None and self._current.kind == TOKEN_ELSEIF:
+            elseif_token = self._current
+            self._advance()
+            chain.append((elseif_token, self._parse_block()))
+
+        if self._current is not None and self._current.kind == TOKEN_ELSE:
+            else_label = self._current.label
+            self._advance()
+            else_body = self._parse_block()
+
+        if self._current is not None and self._current.kind == TOKEN_ENDIF:
+            self._advance()
+
+        token, body = chain.pop()
+        block = IfBlock(
+            token.text, token.label, body, else_label, else_body, token.offset
+        )
+        while chain:
+            token, body = chain.pop()
+            block = IfBlock(token.text, token.label, body, "", [block], token.offset)
+        return block
+
+
+def parse_activity_ast(content: str) -> List[Statement]:
+    """Parse PlantUML activity diagram content into an AST.
+
+    Args:
+        content: PlantUML content to parse
+
+    Returns:
+        Top-level statements of the diagram
+    """
+    return ActivityParser(tokenize(content)).parse()
+
+
+class _GraphBuilder:
+    """Converts an activity diagram AST into nodes and edges."""
+
+    def __init__(self) -> None:
+        self.nodes: List[Node] = []
+        self.edges: List[Edge] = []
+        # Current node ID counter starting at 10 (0 and 1 are reserved)
+        self.next_id = 10
+
+    def add_node(self, label: str, node_type: str) -> str:
+        """Create a node and return its ID."""
+        node_id = str(self.next_id)
+        self.next_id += 1
+        self.nodes.append(Node(node_id, label, node_type))
+        return node_id
+
+    def add_edge(self, source: Optional[str], target: str, label: str = "") -> None:
+        """Connect source to target, if there is a source."""
+        if source is not None:
+            self.edges.append(Edge(source, target, label))
+
+    def build_block(
+        self, statements: List[Statement], previous: Optional[str], label: str = ""
+    ) -> Optional[str]:
+        """Create the nodes of a block and chain them to previous.
+
+        Args:
+            statements: Statements of the block
+            previous: ID of the node the block follows, if any
+            label: Label of the edge into the first node of the block
+
+        Returns:
+            ID of the last node of the block; previous if the block is empty
+        """
+        for statement in statements:
+            if isinstance(statement, Activity):
+                node_id = self.add_node(statement.label, "activity")
+                self.add_edge(previous, node_id, label)
+                previous, label = node_id, ""
+            elif isinstance(statement, IfBlock):
+                previous = self.build_if(statement, previous, label)
+                label = ""
+        return previous
+
+    def build_if(self, block: IfBlock, previous: Optional[str], label: str) -> str:
+        """Create the decision, branch and merge nodes of an if block.
+
+        Empty branches are not connected to the merge node, so a decision
+        never links directly to its merge.
+
+        Returns:
+            ID of the merge node, or of the decision if both branches are empty
+        """
+        decision_id = self.add_node(block.condition, "decision")
+        self.add_edge(previous, decision_id, label)
+
+        branch_ends = []
+        for branch_label, body in (
+            (block.then_label, block.then_body),
+            (block.else_label, block.else_body),
+        ):
+            branch_end = self.build_block(body, decision_id, branch_label)
+            if branch_end != decision_id:
+                branch_ends.append(branch_end)
+
+        if not branch_ends:
+            return decision_id
+
+        merge_id = self.add_node("", "merge")
+        for branch_end in branch_ends:
+            self.add_edge(branch_end, merge_id)
+        return merge_id
+
+
+def _contains_terminal(statements: List[Statement], kind: str) -> bool:
+    """Check whether a start/stop statement occurs anywhere in the AST."""
+    stack = [statements]
+    while stack:
+        for statement in stack.pop():
+            if isinstance(statement, Terminal) and statement.kind == kind:
+                return True
+            if isinstance(statement, IfBlock):
+                stack.append(statement.then_body)
+                stack.append(statement.else_body)
+    return False
+
+
+def build_activity_graph(statements: List[Statement]) -> Tuple[List[Node], List[Edge]]:
+    """Convert an activity diagram AST into nodes and edges.
+
+    A single start and a single stop node are created if the diagram contains
+    start/stop statements. The flow begins at the start node and the last node
+    of the flow is connected to the stop node.
+
+    Args:
+        statements: Top-level statements as returned by parse_activity_ast
+
+    Returns:
+        A tuple of (nodes, edges)
+    """
+    builder = _GraphBuilder()
+
+    start_id = None
+    if _contains_terminal(statements, TOKEN_START):
+        start_id = builder.add_node("Start", "start_stop")
+
+    stop_id = None
+    if _contains_terminal(statements, TOKEN_STOP):
+        stop_id = builder.add_node("Stop", "start_stop")
+
+    last_id = builder.build_block(statements, start_id)
+
+    if last_id is not None and stop_id is not None and last_id != stop_id:
+        builder.add_edge(last_id, stop_id)
+
+    return builder.nodes, builder.edges
@@ -1,30 +1,76 @@
 """Activity diagram processor module for PlantUML to Draw.io conversion."""
 
-import json
 import re
 import sys
 import uuid
 from collections import defaultdict
-from typing import Dict, List, Optional, Tuple, Union
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 # Try to import from installed package or development path
 try:
     # Installed package path
+    from plantuml2drawio.drawio_writer import (DrawioWriter, EdgeCell,
+                                               VertexCell)
     from plantuml2drawio.models import Edge, Node
+    from plantuml2drawio.processors.activity_parser import (
+        build_activity_graph, parse_activity_ast)
     from plantuml2drawio.processors.base_processor import BaseDiagramProcessor
+    from plantuml2drawio.processors.features import DiagramFeatures
 except ImportError:
     # Development path
+    from src.plantuml2drawio.drawio_writer import (DrawioWriter, EdgeCell,
+                                                   VertexCell)
     from src.plantuml2drawio.models import Edge, Node
+    from src.plantuml2drawio.processors.activity_parser import (
+        build_activity_graph, parse_activity_ast)
     from src.plantuml2drawio.processors.base_processor import BaseDiagramProcessor
+    from src.plantuml2drawio.processors.features import DiagramFeatures
+
+# Layout steps between two checks whether the run has been cancelled
+CANCEL_CHECK_INTERVAL = 1024
 
 # Predefined regex patterns for better performance
-RE_ACTIVITY = re.compile(
-    r":\s*(.+?);", re.DOTALL
-)  # DOTALL allows newlines in activities
-RE_IF_BLOCK = re.compile(r"if\s*\(.+?\).+?endif", re.DOTALL | re.IGNORECASE)
+RE_IF_OPEN = re.compile(r"if\s*\(", re.IGNORECASE)
 RE_START_STOP = re.compile(r"start|stop", re.IGNORECASE)
 
 
+def has_activity(content: str) -> bool:
+    """Check if the content contains an activity (": ... ;").
+
+    This scans the content once. A regex like ":\\s*(.+?);" would rescan the
+    rest of the content from every colon that has no closing semicolon, which
+    is quadratic on large inputs.
+
+    Args:
+        content: PlantUML content to check
+
+    Returns:
+        True if a colon is followed by a semicolon with text in between
+    """
+    colon = content.find(":")
+    return colon != -1 and content.find(";", colon + 2) != -1
+
+
+def has_if_block(content: str) -> bool:
+    """Check if the content contains an if block ("if (...) ... endif").
+
+    The earliest "if (" is the best candidate for a match, so a single
+    forward scan decides this in linear time.
+
+    Args:
+        content: PlantUML content to check, in lower case
+
+    Returns:
+        True if an if condition is followed by a closing endif
+    """
+    match = RE_IF_OPEN.search(content)
+    if not match:
+        return False
+    close = content.find(")", match.end() + 1)
+    return close != -1 and content.find("endif", close + 2) != -1
+
+
 def calculate_width(node: Node) -> float:
     """Calculate the width of a node based on its label length."""
     if "\n" in node.label:
@@ -121,10 +167,10 @@ def is_valid_activity_diagram(content: str) -> bool:
     if "start" not in content_lower or "stop" not in content_lower:
         return False
 
-    # Check for activity lines or if-blocks with compiled regex patterns
-    if not RE_ACTIVITY.search(content):
+    # Check for activity lines or if-blocks with linear-time scans
+    if not has_activity(content):
         # If no activity line is found, alternatively check for an if-block
-        if not RE_IF_BLOCK.search(content):
+        if not has_if_block(content_lower):
             return False
 
     return True
@@ -133,6 +179,26 @@ def is_valid_activity_diagram(content: str) -> bool:
 class ActivityDiagramProcessor(BaseDiagramProcessor):
     """Processor for converting PlantUML activity diagrams to Draw.io format."""
 
+    # Activity keywords
+    ACTIVITY_KEYWORDS = (
+        "if",
+        "then",
+        "else",
+        "endif",
+        "fork",
+        "end fork",
+        "split",
+        "end split",
+        "repeat",
+        "backward",
+        "while",
+        "endwhile",
+        "switch",
+        "case",
+        "endswitch",
+    )
+    KEYWORDS = ("start", "stop") + ACTIVITY_KEYWORDS
+
     @classmethod
     def detect_diagram_type(cls, content: str) -> float:
         """Detect if the content is an activity diagram.
@@ -147,46 +213,38 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
             return 0.0
 
         # Check basic requirements
-        content_lower = content.lower()
         if "@startuml" not in content or "@enduml" not in content:
             return 0.0
 
+        return cls.score_features(DiagramFeatures.extract(content, cls.KEYWORDS))
+
+    @classmethod
+    def score_features(cls, features: DiagramFeatures) -> float:
+        """Score the shared features of a document as an activity diagram.
+
+        Args:
+            features: Features extracted once per document
+
+        Returns:
+            Confidence score between 0.0 and 1.0
+        """
         # Start calculating confidence score
         confidence = 0.0
 
         # Strong indicators
-        if "start" in content_lower and "stop" in content_lower:
+        if features.has_keyword("start") and features.has_keyword("stop"):
             confidence += 0.5
 
-        # Activity keywords
-        activity_keywords = [
-            "if",
-            "then",
-            "else",
-            "endif",
-            "fork",
-            "end fork",
-            "split",
-            "end split",
-            "repeat",
-            "backward",
-            "while",
-            "endwhile",
-            "switch",
-            "case",
-            "endswitch",
-        ]
-
-        for keyword in activity_keywords:
-            if keyword in content_lower:
+        for keyword in cls.ACTIVITY_KEYWORDS:
+            if features.has_keyword(keyword):
                 confidence += 0.1
 
         # Activity actions
-        if RE_ACTIVITY.search(content):
+        if has_activity(features.content):
             confidence += 0.3
 
         # If-blocks
-        if RE_IF_BLOCK.search(content):
+        if has_if_block(features.content_lower):
             confidence += 0.2
 
         # Cap at 1.0
@@ -206,6 +264,10 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
     def parse_diagram(self, content: str) -> Tuple[List[Node], List[Edge]]:
         """Parse the PlantUML activity diagram content into nodes and edges.
 
+        The content is tokenized in a single pass and parsed into an AST by
+        a recursive-descent parser (see activity_parser), so parse time is
+        linear in the input size and nested if blocks keep their structure.
+
         Args:
             content: PlantUML content to parse
 
@@ -214,271 +276,7 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
             - nodes: List of Node objects representing the activity diagram elements
             - edges: List of Edge objects representing the connections between elements
         """
-        # Initialize collections for nodes and edges
-        nodes = []
-        edges = []
-
-        # Dictionary to track node IDs by labels to ensure we connect things properly
-        node_id_map = {}
-
-        # Clean up the content: remove comments, empty lines, and merge multiline
-        # activities (": ... ;" across lines) and multiline if ( "if (...) then" )
-        lines = content.split("\n")
-        clean_lines = []
-        in_multiline_activity = False
-        activity_buffer = ""
-        in_multiline_if = False
-        if_buffer = ""
-
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("@") or line.startswith("'"):
-                continue
-
-            if in_multiline_activity:
-                activity_buffer += "\n" + line
-                if line.endswith(";"):
-                    clean_lines.append(activity_buffer)
-                    in_multiline_activity = False
-                    activity_buffer = ""
-                continue
-
-            if line.startswith(":") and not line.endswith(";"):
-                in_multiline_activity = True
-                activity_buffer = line
-                continue
-
-            if in_multiline_if:
-                if_buffer += " " + line
-                if "then" in line.lower():
-                    clean_lines.append(if_buffer)
-                    in_multiline_if = False
-                    if_buffer = ""
-                continue
-
-            if line.lower().startswith("if (") and "then" not in line.lower():
-                in_multiline_if = True
-                if_buffer = line
-                continue
-
-            clean_lines.append(line)
-
-        # Current node ID counter starting at 10 (0 and 1 are reserved)
-        next_id = 10
-        last_node_id = None
-
-        # Process start node first
-        start_match = re.search(r"\bstart\b", content, re.IGNORECASE)
-        if start_match:
-            node_id = str(next_id)
-            start_node = Node(node_id, "Start", "start_stop")
-            nodes.append(start_node)
-            node_id_map["start"] = node_id
-            last_node_id = node_id
-            next_id += 1
-
-        # Create a stop node, but don't set connections yet
-        stop_match = re.search(r"\bstop\b", content, re.IGNORECASE)
-        if stop_match:
-            node_id = str(next_id)
-            stop_node = Node(node_id, "Stop", "start_stop")
-            nodes.append(stop_node)
-            node_id_map["stop"] = node_id
-            next_id += 1
-
-        # Now process lines sequentially to maintain proper order
-        in_if_block = False
-        if_block_content = ""
-        decision_node_id = None
-        branch_end_nodes = []
-
-        for line in clean_lines:
-            # Skip start/stop as they are already processed
-            if re.match(r"^\s*(start|stop)\s*$", line, re.IGNORECASE):
-                continue
-
-            # If we're inside an if block, collect lines until endif
-            if in_if_block:
-                if_block_content += line + "\n"
-
-                # Check if this is the end of the if block
-                if re.match(r"^\s*endif\s*$", line, re.IGNORECASE):
-                    in_if_block = False
-
-                    # Process the complete if block
-                    # Extract the condition text between if( and )
-                    condition_match = re.search(
-                        r"if\s*\((.+?)\)", if_block_content, re.DOTALL | re.IGNORECASE
-                    )
-                    if condition_match:
-                        condition = condition_match.group(1).strip()
-
-                        # Extract the 'then' and 'else' branches
-                        then_match = re.search(
-                            r"then\s*\((.*?)\)(.*?)(?:else|endif)",
-                            if_block_content,
-                            re.DOTALL | re.IGNORECASE,
-                        )
-                        else_match = re.search(
-                            r"else\s*\((.*?)\)(.*?)endif",
-                            if_block_content,
-                            re.DOTALL | re.IGNORECASE,
-                        )
-
-                        # Process 'then' branch activities
-                        if then_match:
-                            then_label = then_match.group(1).strip()
-                            then_content = then_match.group(2).strip()
-                            then_activities = RE_ACTIVITY.finditer(then_content)
-
-                            last_branch_node_id = decision_node_id
-                            for activity_match in then_activities:
-                                activity_label = activity_match.group(1).strip()
-                                activity_node_id = str(next_id)
-                                next_id += 1
-
-                                activity_node = Node(
-                                    activity_node_id, activity_label, "activity"
-                                )
-                                nodes.append(activity_node)
-
-                                # Connect to the previous node in this branch
-                                if last_branch_node_id == decision_node_id:
-                                    # First node after decision gets the branch label
-                                    edges.append(
-                                        Edge(
-                                            last_branch_node_id,
-                                            activity_node_id,
-                                            then_label,
-                                        )
-                                    )
-                                else:
-                                    edges.append(
-                                        Edge(last_branch_node_id, activity_node_id)
-                                    )
-
-                                last_branch_node_id = activity_node_id
-
-                            # Add last node of this branch to the collection for merge connection
-                            if last_branch_node_id != decision_node_id:
-                                branch_end_nodes.append(last_branch_node_id)
-
-                        # Process 'else' branch activities
-                        if else_match:
-                            else_label = else_match.group(1).strip()
-                            else_content = else_match.group(2).strip()
-                            else_activities = RE_ACTIVITY.finditer(else_content)
-
-                            last_branch_node_id = decision_node_id
-                            for activity_match in else_activities:
-                                activity_label = activity_match.group(1).strip()
-                                activity_node_id = str(next_id)
-                                next_id += 1
-
-                                activity_node = Node(
-                                    activity_node_id, activity_label, "activity"
-                                )
-                                nodes.append(activity_node)
-
-                                # Connect to the previous node in this branch
-                                if last_branch_node_id == decision_node_id:
-                                    # First node after decision gets the branch label
-                                    edges.append(
-                                        Edge(
-                                            last_branch_node_id,
-                                            activity_node_id,
-                                            else_label,
-                                        )
-                                    )
-                                else:
-                                    edges.append(
-                                        Edge(last_branch_node_id, activity_node_id)
-                                    )
-
-                                last_branch_node_id = activity_node_id
-
-                            # Add last node of this branch to the collection for merge connection
-                            if last_branch_node_id != decision_node_id:
-                                branch_end_nodes.append(last_branch_node_id)
-
-                    # Create a merge node if we have branches to connect
-                    if branch_end_nodes:
-                        merge_node_id = str(next_id)
-                        next_id += 1
-                        merge_node = Node(merge_node_id, "", "merge")
-                        nodes.append(merge_node)
-
-                        # Connect branch end nodes to merge node
-                        for branch_node_id in branch_end_nodes:
-                            edges.append(Edge(branch_node_id, merge_node_id))
-
-                        # Use merge node as the last node for connecting next elements
-                        last_node_id = merge_node_id
-                        branch_end_nodes = []
-
-                    if_block_content = ""
-
-                # Continue to next line since we're still processing the if block
-                continue
-
-            # Check if this is the start of an if block
-            if_start_match = re.match(r"^\s*if\s*\(.+?\)\s*then", line, re.IGNORECASE)
-            if if_start_match:
-                in_if_block = True
-                if_block_content = line + "\n"
-
-                # Extract the condition
-                condition_match = re.search(r"if\s*\((.+?)\)", line, re.IGNORECASE)
-                condition = (
-                    condition_match.group(1).strip() if condition_match else "Condition"
-                )
-
-                # Create decision node
-                decision_node_id = str(next_id)
-                next_id += 1
-                decision_node = Node(decision_node_id, condition, "decision")
-                nodes.append(decision_node)
-
-                # Connect to previous node
-                if last_node_id:
-                    edges.append(Edge(last_node_id, decision_node_id))
-
-                continue
-
-            # Handle normal activity lines
-            activity_match = RE_ACTIVITY.search(line)
-            if activity_match:
-                label = activity_match.group(1).strip()
-
-                # Create activity node
-                node_id = str(next_id)
-                next_id += 1
-                activity_node = Node(node_id, label, "activity")
-                nodes.append(activity_node)
-
-                # Connect to previous node
-                if last_node_id:
-                    edges.append(Edge(last_node_id, node_id))
-
-                last_node_id = node_id
-
-        # Connect last node to stop node if both exist and not already connected
-        if (
-            last_node_id
-            and "stop" in node_id_map
-            and last_node_id != node_id_map["stop"]
-        ):
-            # Check if connection already exists
-            connection_exists = False
-            for edge in edges:
-                if edge.source == last_node_id and edge.target == node_id_map["stop"]:
-                    connection_exists = True
-                    break
-
-            if not connection_exists:
-                edges.append(Edge(last_node_id, node_id_map["stop"]))
-
-        return nodes, edges
+        return build_activity_graph(parse_activity_ast(content))
 
     def layout_diagram(self, nodes: List[Node], edges: List[Edge]) -> None:
         """Calculate the layout for the activity diagram elements.
@@ -493,8 +291,16 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
         if not nodes:
             return
 
-        # First, set dimensions for all nodes
+        # First, set dimensions for all nodes and remember the stop node,
+        # which is moved below everything else at the end
+        stop_node = None
         for node in nodes:
+            if (
+                stop_node is None
+                and node.type == "start_stop"
+                and node.label.lower() == "stop"
+            ):
+                stop_node = node
             # Adjust width and height based on node type
             if node.label.lower() in ["start", "stop"] or node.type == "start_stop":
                 # Smaller fixed size for start/stop nodes
@@ -519,11 +325,17 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
                 node.width = 120
                 node.height = 60
 
-        # Constants for layout
+        # Nodes are compared by id, as they may be views created on access
+        stop_id = stop_node.id if stop_node is not None else None
+
+        # Constants for layout; changing any of them changes the output, so
+        # config.LAYOUT_VERSION has to be increased along with them
         start_x = 350  # Center X position
         start_y = 100  # Starting Y position
         vertical_spacing = 50  # Spacing between nodes vertically
         horizontal_spacing = 180  # Spacing between branches horizontally
+        component_spacing = 100  # Gap between disconnected components
+        left_margin = 40  # Smallest x of any node
 
         # Create adjacency lists (both incoming and outgoing)
         outgoing = defaultdict(list)
@@ -550,12 +362,27 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
             # Still no start node, use the first node
             start_node = nodes[0]
 
-        # Track visited nodes and their positions
+        # Track visited nodes, and the nodes in the order they were placed so
+        # that the nodes of one component can be told apart afterwards
         visited = set()
+        placed = []
+
+        # Merge nodes reached before all of their incoming branches were
+        # placed, with the x position they were reached at. A merge is only
+        # placed once every predecessor is, below the lowest of them; the
+        # number of unplaced incoming edges tells when that is, and merges
+        # that got there wait in ready_merges for the decision they close.
+        pending_merges: Dict[str, float] = {}
+        unplaced_inputs: Dict[str, int] = {}
+        ready_merges: List[str] = []
 
         # Create a node id to node object mapping
         node_map = {node.id: node for node in nodes}
 
+        # Position of each node in the node list, used to keep the order of
+        # merge nodes stable without scanning the list per decision
+        node_index = {node.id: index for index, node in enumerate(nodes)}
+
         # Function to determine if a node is a decision node
         def is_decision(node_id):
             return node_map.get(node_id) and node_map[node_id].type == "decision"
@@ -564,13 +391,48 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
         def is_merge(node_id):
             return node_map.get(node_id) and node_map[node_id].type == "merge"
 
-        # Helper function for traversal to position nodes
+        # Function to count a placed node as an input of the merges it leads to
+        def count_placed_input(node_id):
+            for child, _ in outgoing[node_id]:
+                if is_merge(child):
+                    remaining = unplaced_inputs.get(child, len(incoming[child])) - 1
+                    unplaced_inputs[child] = remaining
+                    if remaining == 0 and child in pending_merges:
+                        ready_merges.append(child)
+
+        # Function to defer a merge node until all its branches are placed
+        def defer_merge(node_id, x):
+            if node_id in pending_merges:
+                return
+            pending_merges[node_id] = x
+            if unplaced_inputs.get(node_id, len(incoming[node_id])) == 0:
+                ready_merges.append(node_id)
+
+        # Function to position a merge node below all of its predecessors,
+        # at least at min_y. Yields the merge's arguments like position_node.
+        def merge_args(merge_id, x, min_y, branch_offset):
+            del pending_merges[merge_id]
+            bottoms = [
+                node_map[source].y + node_map[source].height
+                for source, _ in incoming[merge_id]
+                if source in node_map
+            ]
+            merge_y = max([min_y] + [b + vertical_spacing for b in bottoms])
+            return (merge_id, x, merge_y, branch_offset)
+
+        # Traversal step that positions one node. It is written as a
+        # generator: instead of recursing into a child it yields the child's
+        # arguments (node_id, x, y, branch_offset) and receives the child's
+        # result back, so run_positioning can drive it with an explicit
+        # stack. Long chains of nodes therefore do not hit the recursion limit.
         def position_node(node_id, x, y, branch_offset=0):
             if node_id in visited:
                 return y
 
             visited.add(node_id)
             node = node_map[node_id]
+            placed.append(node)
+            count_placed_input(node_id)
 
             # Position this node
             node.x = x - node.width / 2  # Center horizontally on x
@@ -604,47 +466,61 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
                         else:
                             else_branches.append(target)
 
-                # Position 'then' branches (to the right)
+                # Position 'then' branches (to the right). A branch that
+                # leads straight into a merge is placed with the merge.
                 then_end_y = next_y
                 for branch in then_branches:
-                    if branch not in visited:
-                        branch_end_y = position_node(
-                            branch, x + horizontal_spacing, next_y, 1
+                    if is_merge(branch):
+                        defer_merge(branch, x)
+                    elif branch not in visited:
+                        branch_end_y = yield (
+                            branch,
+                            x + horizontal_spacing,
+                            next_y,
+                            1,
                         )
                         then_end_y = max(then_end_y, branch_end_y)
 
                 # Position 'else' branches (to the left)
                 else_end_y = next_y
                 for branch in else_branches:
-                    if branch not in visited:
-                        branch_end_y = position_node(
-                            branch, x - horizontal_spacing, next_y, -1
+                    if is_merge(branch):
+                        defer_merge(branch, x)
+                    elif branch not in visited:
+                        branch_end_y = yield (
+                            branch,
+                            x - horizontal_spacing,
+                            next_y,
+                            -1,
                         )
                         else_end_y = max(else_end_y, branch_end_y)
 
                 # Return the maximum y reached across all branches
                 max_branch_y = max(then_end_y, else_end_y)
 
-                # Check if there's a merge node connected to this decision path
-                merge_nodes = []
-                for n in nodes:
-                    if n.type == "merge" and n.id not in visited:
-                        # Check if this merge has incoming edges from the branches
-                        merge_connected_to_branches = False
-                        for branch in then_branches + else_branches:
-                            for child, _ in outgoing[branch]:
-                                if child == n.id:
-                                    merge_connected_to_branches = True
-                                    break
-                        if merge_connected_to_branches:
-                            merge_nodes.append(n.id)
+                # Merge nodes whose branches are now all placed close this
+                # decision; merges still waiting for other branches belong
+                # to an enclosing decision. They keep the order of the node
+                # list, as a full scan would have.
+                merge_nodes = sorted(
+                    (
+                        merge_id
+                        for merge_id in ready_merges
+                        if merge_id in pending_merges
+                    ),
+                    key=node_index.__getitem__,
+                )
+                ready_merges.clear()
 
                 # Position merge node after the branches
                 for merge_id in merge_nodes:
-                    merge_y = max_branch_y + vertical_spacing
-                    position_node(merge_id, x, merge_y, branch_offset)
-                    max_branch_y = (
-                        merge_y + node_map[merge_id].height + vertical_spacing
+                    args = merge_args(
+                        merge_id, x, max_branch_y + vertical_spacing, branch_offset
+                    )
+                    merge_end_y = yield args
+                    max_branch_y = max(
+                        args[2] + node_map[merge_id].height + vertical_spacing,
+                        merge_end_y,
                     )
 
                 return max_branch_y
@@ -660,48 +536,95 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
                         offset_x = (
                             x + branch_offset * 10
                         )  # Subtle offset for branching clarity
-                        child_end_y = position_node(
-                            child, offset_x, max_child_y, branch_offset
+                        if is_merge(child):
+                            # Placed by its decision once all branches are
+                            defer_merge(child, offset_x)
+                            continue
+                        child_end_y = yield (
+                            child,
+                            offset_x,
+                            max_child_y,
+                            branch_offset,
                         )
                         max_child_y = max(max_child_y, child_end_y + vertical_spacing)
 
                 return max_child_y
 
+        # Drive position_node with an explicit stack of suspended steps.
+        # Merges that no decision closed, e.g. in graphs not built by the
+        # parser, are placed afterwards where they were first reached.
+        def run_positioning(node_id, x, y):
+            stack = [position_node(node_id, x, y)]
+            result = None
+            steps = 0
+            while stack:
+                # Let a cancelled run stop in the middle of a large layout
+                if steps % CANCEL_CHECK_INTERVAL == 0:
+                    self.check_cancelled()
+                steps += 1
+                try:
+                    child_args = stack[-1].send(result)
+                except StopIteration as finished:
+                    stack.pop()
+                    result = finished.value
+                    if not stack and pending_merges:
+                        merge_id = min(pending_merges, key=node_index.__getitem__)
+                        stack.append(
+                            position_node(
+                                *merge_args(
+                                    merge_id, pending_merges[merge_id], y, 0
+                                )
+                            )
+                        )
+                    continue
+                stack.append(position_node(*child_args))
+                result = None
+            return result
+
         # Start positioning from the start node
         if start_node:
-            position_node(start_node.id, start_x, start_y)
+            run_positioning(start_node.id, start_x, start_y)
+
+        # Running bounding box of the placed nodes. The stop node does not
+        # count towards the bottom edge, since it is moved below it anyway.
+        right_edge = max((node.x + node.width for node in placed), default=start_x)
+        bottom_edge = max(
+            (node.y + node.height for node in placed if node.id != stop_id),
+            default=None,
+        )
 
-        # Handle any unvisited nodes (disconnected components)
-        current_y = start_y
-        for node in nodes:
-            if node.id not in visited:
-                # Find the maximum y position among visited nodes
-                if visited:
-                    current_y = (
-                        max(
-                            [
-                                node_map[node_id].y + node_map[node_id].height
-                                for node_id in visited
-                            ]
-                        )
-                        + vertical_spacing
-                    )
-                node.x = start_x - node.width / 2  # Center on start_x
-                node.y = current_y
-                current_y += node.height + vertical_spacing
+        # Lay out any unvisited nodes (disconnected components) side by side
+        # to the right of what has been placed, each one starting at the top.
+        # Nodes without incoming edges are tried first, as they are the
+        # natural entry points of their components.
+        roots = chain((node for node in nodes if node.id not in incoming), nodes)
+        for root in roots:
+            if root.id in visited:
+                continue
+
+            first = len(placed)
+            run_positioning(root.id, start_x, start_y)
+            component = placed[first:]
+
+            shift = right_edge + component_spacing - min(n.x for n in component)
+            for node in component:
+                node.x += shift
+                right_edge = max(right_edge, node.x + node.width)
+                if node.id != stop_id:
+                    bottom = node.y + node.height
+                    if bottom_edge is None or bottom > bottom_edge:
+                        bottom_edge = bottom
 
         # Final pass - ensure stop node is at the bottom
-        stop_nodes = [
-            node
-            for node in nodes
-            if node.type == "start_stop" and node.label.lower() == "stop"
-        ]
-        if stop_nodes:
-            # Find maximum y of all nodes
-            max_y = max(
-                [node.y + node.height for node in nodes if node.id != stop_nodes[0].id]
-            )
-            stop_nodes[0].y = max_y + vertical_spacing
+        if stop_node is not None and bottom_edge is not None:
+            stop_node.y = bottom_edge + vertical_spacing
+
+        # Nested else branches can extend left of the start node; move the
+        # whole diagram right so that no node ends up at a negative x
+        left_edge = min((node.x for node in placed), default=left_margin)
+        if left_edge < left_margin:
+            for node in placed:
+                node.x += left_margin - left_edge
 
     def export_to_drawio(self, nodes: List[Node], edges: List[Edge]) -> str:
         """Export the activity diagram to Draw.io XML format.
@@ -713,84 +636,73 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
         Returns:
             String containing the Draw.io XML representation
         """
+        return "".join(self.iter_drawio(nodes, edges))
+
+    def iter_drawio(self, nodes: List[Node], edges: List[Edge]) -> Iterator[str]:
+        """Yield the Draw.io XML of the activity diagram in chunks.
+
+        Args:
+            nodes: List of Node objects with position information
+            edges: List of Edge objects defining connections
+
+        Yields:
+            Consecutive parts of the Draw.io XML, one per mxCell record
+        """
         if not nodes:
-            return ""
-
-        # Import html module for escaping
-        import html
-
-        # XML header
-        xml = (
-            '<?xml version="1.0" encoding="UTF-8"?>\n'
-            '<mxfile host="app.diagrams.net" modified="2023-01-01T00:00:00.000Z" '
-            'agent="PlantUML2Drawio" version="14.6.13">\n'
-            '  <diagram id="activity_diagram" name="Activity Diagram">\n'
-            '    <mxGraphModel dx="1422" dy="798" grid="1" gridSize="10" '
-            'guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" '
-            'pageScale="1" pageWidth="827" pageHeight="1169" math="0" '
-            'shadow="0">\n'
-            "      <root>\n"
-            '        <mxCell id="0"/>\n'
-            '        <mxCell id="1" parent="0"/>\n'
-        )
+            return
 
-        # Add nodes to XML
-        for node in nodes:
-            style = self._get_node_style(node)
-
-            # Handle multiline labels by replacing newlines with HTML line breaks
-            label = node.label
-            if "\n" in label:
-                # First escape all XML special characters
-                escaped_label = html.escape(label)
-                # Then replace newlines with HTML br tag escape sequence
-                label = escaped_label.replace("\n", "&lt;br&gt;")
-            else:
-                # Always escape the label to handle special characters
-                label = html.escape(label)
-
-            xml += (
-                f'        <mxCell id="{node.id}" value="{label}" '
-                f'style="{style}" vertex="1" parent="1">\n'
-                f'          <mxGeometry x="{node.x}" y="{node.y}" '
-                f'width="{node.width}" height="{node.height}" as="geometry"/>\n'
-                "        </mxCell>\n"
-            )
+        writer = DrawioWriter("activity_diagram", "Activity Diagram")
+        yield from writer.iter_chunks(*self._cells(nodes, edges))
 
-        # Add edges to XML with simple numeric IDs
-        edge_start_id = 1000  # Start edge IDs from 1000 to avoid conflicts
-        for i, edge in enumerate(edges):
-            style = self._get_edge_style(edge)
-
-            # Handle edge labels (which could be None)
-            label = edge.label or ""
-            if "\n" in label:
-                # First escape all XML special characters
-                escaped_label = html.escape(label)
-                # Then replace newlines with HTML br tag escape sequence
-                label = escaped_label.replace("\n", "&lt;br&gt;")
-            else:
-                # Always escape the label to handle special characters
-                label = html.escape(label)
-
-            # Create a numeric edge ID
-            edge_id = str(edge_start_id + i)
-
-            xml += (
-                f'        <mxCell id="{edge_id}" value="{label}" '
-                f'style="{style}" edge="1" parent="1" source="{edge.source}" '
-                f'target="{edge.target}">\n'
-                '          <mxGeometry relative="1" as="geometry"/>\n'
-                "        </mxCell>\n"
-            )
+    def iter_drawio_page(
+        self, nodes: List[Node], edges: List[Edge], page_id: str, page_name: str
+    ) -> Iterator[str]:
+        """Yield only the <diagram> page of the activity diagram in chunks.
 
-        # XML footer
-        xml += """      </root>
-    </mxGraphModel>
-  </diagram>
-</mxfile>"""
+        Args:
+            nodes: List of Node objects with position information
+            edges: List of Edge objects defining connections
+            page_id: ID of the page, unique within the document
+            page_name: Name of the page shown by Draw.io
 
-        return xml
+        Yields:
+            Consecutive parts of the page, one per mxCell record
+        """
+        if not nodes:
+            return
+
+        writer = DrawioWriter(page_id, page_name)
+        yield from writer.iter_page_chunks(*self._cells(nodes, edges))
+
+    def _cells(
+        self, nodes: List[Node], edges: List[Edge]
+    ) -> Tuple[Iterator[VertexCell], Iterator[EdgeCell]]:
+        """Return generators of the vertex and edge cells of the diagram."""
+        # Edges get simple numeric IDs starting at 1000 to avoid conflicts
+        edge_start_id = 1000
+        vertices = (
+            VertexCell(
+                node.id,
+                node.label,
+                self._get_node_style(node),
+                node.x,
+                node.y,
+                node.width,
+                node.height,
+            )
+            for node in nodes
+        )
+        edge_cells = (
+            EdgeCell(
+                str(edge_start_id + i),
+                edge.label,
+                self._get_edge_style(edge),
+                edge.source,
+                edge.target,
+            )
+            for i, edge in enumerate(edges)
+        )
+        return vertices, edge_cells
 
     def _get_node_style(self, node: Node) -> str:
         """Get the Draw.io style for a node based on its type.
@@ -846,62 +758,18 @@ class ActivityDiagramProcessor(BaseDiagramProcessor):
             "jettySize=auto;html=1;strokeWidth=1.5;strokeColor=#000000;"
         )
 
-    def convert_to_drawio(self, content: str) -> str:
-        """Convert the PlantUML activity diagram to Draw.io format.
-
-        Args:
-            content: The PlantUML diagram content to convert.
-
-        Returns:
-            The diagram converted to Draw.io XML format.
-        """
-        # Parse the diagram
-        nodes, edges = self.parse_diagram(content)
-
-        # Layout the diagram
-        self.layout_diagram(nodes, edges)
-
-        # Create the Draw.io XML
-        return self.export_to_drawio(nodes, edges)
-
-    def convert_to_json(self, content: str) -> str:
-        """Convert the PlantUML diagram to JSON representation.
+    def _edge_to_dict(self, edge: Edge) -> Dict:
+        """Convert an edge to a dictionary for the JSON representation.
 
         Args:
-            content: PlantUML content to convert
+            edge: Edge object
 
         Returns:
-            JSON string representing the diagram
+            Dictionary representation of the edge
         """
-        # Parse the diagram
-        nodes, edges = self.parse_diagram(content)
-
-        # Layout the diagram
-        self.layout_diagram(nodes, edges)
-
-        # Create the JSON representation
-        diagram_data = {
-            "nodes": [
-                {
-                    "id": node.id,
-                    "label": node.label,
-                    "type": node.type,
-                    "x": node.x,
-                    "y": node.y,
-                    "width": node.width,
-                    "height": node.height,
-                }
-                for node in nodes
-            ],
-            "edges": [
-                {
-                    "id": f"edge_{edge.source}_{edge.target}",
-                    "source": edge.source,
-                    "target": edge.target,
-                    "label": edge.label,
-                }
-                for edge in edges
-            ],
+        return {
+            "id": f"edge_{edge.source}_{edge.target}",
+            "source": edge.source,
+            "target": edge.target,
+            "label": edge.label,
         }
-
-        return json.dumps(diagram_data, indent=2)
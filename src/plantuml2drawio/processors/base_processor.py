@@ -1,14 +1,58 @@
 """Base class for diagram processors."""
 
+import html
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple, Type
+from typing import (Dict, Iterator, List, Optional, TextIO, Tuple, Type,
+                    Union)
 
+from plantuml2drawio.config import AVAILABLE_PROCESSORS
 from plantuml2drawio.models import Edge, Node
+from plantuml2drawio.processors.discovery import (discover_processors,
+                                                  import_object)
+from plantuml2drawio.processors.features import (DiagramFeatures,
+                                                 KeywordScanner,
+                                                 get_keyword_scanner)
+from plantuml2drawio.processors.result import (STAGE_LAYOUT, STAGE_PARSE,
+                                               ConversionCancelled,
+                                               DiagramResult, StageError,
+                                               check_cancelled)
+from plantuml2drawio.stats import ConversionStats, timed
+
+logger = logging.getLogger(__name__)
+
+# Name this package is imported as, "plantuml2drawio" when installed
+_PACKAGE = __name__.rsplit(".processors.", 1)[0]
 
 
 class BaseDiagramProcessor(ABC):
     """Base class for all diagram processors."""
 
+    # Lower-case keywords scored by score_features. The registry finds the
+    # keywords of all processors in a single scan of the content.
+    KEYWORDS: Tuple[str, ...] = ()
+
+    # Event that cancels the current run, see check_cancelled
+    _cancel: Optional[threading.Event] = None
+
+    @classmethod
+    def score_features(cls, features: DiagramFeatures) -> float:
+        """Score the shared features of a document for this diagram type.
+
+        ProcessorRegistry.detect_diagram_type calls this with features that
+        contain at least the processor's KEYWORDS. The default implementation
+        falls back to detect_diagram_type on the raw content; processors
+        should override it to avoid scanning the content again.
+
+        Args:
+            features: Features extracted once per document
+
+        Returns:
+            A confidence score between 0.0 and 1.0
+        """
+        return cls.detect_diagram_type(features.content)
+
     @classmethod
     @abstractmethod
     def detect_diagram_type(cls, content: str) -> float:
@@ -70,53 +114,179 @@ class BaseDiagramProcessor(ABC):
         """
         pass
 
-    def convert_to_drawio(self, content: str) -> str:
-        """Convert the PlantUML diagram to Draw.io format.
+    def iter_drawio(self, nodes: List[Node], edges: List[Edge]) -> Iterator[str]:
+        """Yield the Draw.io XML of the diagram in chunks.
 
-        This method follows the standard process flow:
-        1. Parse the diagram to get nodes and edges
-        2. Layout the nodes based on their relationships
-        3. Export to Draw.io XML format
+        The default implementation yields the result of export_to_drawio as a
+        single chunk. Processors should override it, for example with
+        DrawioWriter, so that large diagrams can be written without building
+        the whole document in memory.
+
+        Args:
+            nodes: List of Node objects
+            edges: List of Edge objects
+
+        Yields:
+            Consecutive parts of the Draw.io XML
+        """
+        yield self.export_to_drawio(nodes, edges)
+
+    def iter_drawio_page(
+        self, nodes: List[Node], edges: List[Edge], page_id: str, page_name: str
+    ) -> Iterator[str]:
+        """Yield only the <diagram> page of the diagram in chunks.
+
+        Pages of several diagrams are combined into one multi-page document
+        with drawio_writer.iter_multipage. The default implementation cuts the
+        page out of export_to_drawio and renames it; processors should
+        override it with DrawioWriter.iter_page_chunks.
+
+        Args:
+            nodes: List of Node objects
+            edges: List of Edge objects
+            page_id: ID of the page, unique within the document
+            page_name: Name of the page shown by Draw.io
+
+        Yields:
+            Consecutive parts of the <diagram> element
+        """
+        document = self.export_to_drawio(nodes, edges)
+        start = document.find("<diagram")
+        end = document.rfind("</diagram>")
+        if start < 0 or end < 0:
+            return
+        body_start = document.index(">", start) + 1
+        yield (
+            f'  <diagram id="{html.escape(page_id)}" '
+            f'name="{html.escape(page_name)}">'
+        )
+        yield document[body_start : end + len("</diagram>")] + "\n"
+
+    def write_drawio(
+        self, nodes: List[Node], edges: List[Edge], stream: TextIO
+    ) -> None:
+        """Write the Draw.io XML of the diagram to a text stream.
+
+        Args:
+            nodes: List of Node objects
+            edges: List of Edge objects
+            stream: Text file object to write to
+        """
+        for chunk in self.iter_drawio(nodes, edges):
+            stream.write(chunk)
+
+    def run(
+        self,
+        content: str,
+        stats: Optional[ConversionStats] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> DiagramResult:
+        """Parse and lay out the diagram once.
+
+        The returned result serializes the diagram to Draw.io XML or JSON
+        only when asked, so every export shares this single pipeline run.
 
         Args:
             content: The PlantUML diagram content to convert.
+            stats: Optional statistics that receive the time of each stage,
+                the node and edge counts and the size of the output.
+            cancel: Optional event that cancels the run when set from another
+                thread. It is checked between the stages, during the export
+                and wherever the processor calls check_cancelled.
 
         Returns:
-            The diagram converted to Draw.io XML format.
+            DiagramResult holding the laid-out diagram
+
+        Raises:
+            StageError: If parsing or layout fails; its stage tells which
+            ConversionCancelled: If the run is cancelled
         """
-        # Step 1: Parse the diagram
-        nodes, edges = self.parse_diagram(content)
+        self._cancel = cancel
+        try:
+            # Step 1: Parse the diagram
+            check_cancelled(cancel)
+            with timed(stats, STAGE_PARSE):
+                try:
+                    nodes, edges = self.parse_diagram(content)
+                except ConversionCancelled:
+                    raise
+                except Exception as e:
+                    raise StageError(STAGE_PARSE, str(e)) from e
+
+            # Step 2: Layout the diagram
+            check_cancelled(cancel)
+            with timed(stats, STAGE_LAYOUT):
+                try:
+                    self.layout_diagram(nodes, edges)
+                except ConversionCancelled:
+                    raise
+                except Exception as e:
+                    raise StageError(STAGE_LAYOUT, str(e)) from e
+        finally:
+            self._cancel = None
+
+        if stats is not None:
+            stats.count_graph(nodes, edges)
+        return DiagramResult(self, nodes, edges, stats, cancel)
+
+    def check_cancelled(self) -> None:
+        """Stop the current run if it has been cancelled.
+
+        Long-running parse_diagram and layout_diagram implementations should
+        call this regularly so that a run can be cancelled cooperatively.
+
+        Raises:
+            ConversionCancelled: If the run has been cancelled
+        """
+        check_cancelled(self._cancel)
+
+    def convert_to_drawio(
+        self,
+        content: str,
+        output: Optional[TextIO] = None,
+        stats: Optional[ConversionStats] = None,
+    ) -> Optional[str]:
+        """Convert the PlantUML diagram to Draw.io format.
 
-        # Step 2: Layout the diagram
-        self.layout_diagram(nodes, edges)
+        This runs the pipeline once with run and exports the result.
 
-        # Step 3: Export to Draw.io XML format
-        return self.export_to_drawio(nodes, edges)
+        Args:
+            content: The PlantUML diagram content to convert.
+            output: Optional text stream to write the XML to in chunks
+                instead of returning it as a string.
+            stats: Optional statistics that receive the time of each stage,
+                the node and edge counts and the size of the output.
 
-    def convert_to_json(self, content: str) -> str:
+        Returns:
+            The diagram converted to Draw.io XML format, or None if it was
+            written to output.
+
+        Raises:
+            StageError: If a stage of the conversion fails
+        """
+        result = self.run(content, stats)
+        if output is not None:
+            result.write_drawio(output)
+            return None
+        return result.drawio
+
+    def convert_to_json(
+        self, content: str, stats: Optional[ConversionStats] = None
+    ) -> str:
         """Convert the PlantUML diagram to JSON representation.
 
         Args:
             content: PlantUML content to convert
+            stats: Optional statistics that receive the time of each stage,
+                the node and edge counts and the size of the output.
 
         Returns:
             JSON string representing the diagram
-        """
-        # Parse the diagram
-        nodes, edges = self.parse_diagram(content)
-
-        # Layout the diagram
-        self.layout_diagram(nodes, edges)
-
-        # Create a simple JSON representation
-        import json
 
-        diagram_data = {
-            "nodes": [self._node_to_dict(node) for node in nodes],
-            "edges": [self._edge_to_dict(edge) for edge in edges],
-        }
-
-        return json.dumps(diagram_data, indent=2)
+        Raises:
+            StageError: If a stage of the conversion fails
+        """
+        return self.run(content, stats).json
 
     def _node_to_dict(self, node: Node) -> Dict:
         """Convert a node to a dictionary.
@@ -161,42 +331,167 @@ class BaseDiagramProcessor(ABC):
 
 
 class ProcessorRegistry:
-    """Registry for diagram processors."""
+    """Registry for diagram processors.
 
-    _processors: Dict[str, Type[BaseDiagramProcessor]] = {}
+    Processors are registered as classes or as import paths. The built-in
+    processors of config.AVAILABLE_PROCESSORS and those discovered through
+    entry points are registered on first use, and a processor given as an
+    import path is only imported when it is needed for detection or
+    conversion.
+    """
+
+    _processors: Dict[str, Union[Type[BaseDiagramProcessor], str]] = {}
+    _discovered: Dict[str, str] = {}
+    _defaults_loaded = False
+    _scanner: Optional[KeywordScanner] = None
+
+    # Directory of the cached entry point index; None scans in memory and
+    # writes nothing. Only the CLI and the GUI opt in to the index.
+    discovery_cache_dir: Optional[str] = None
 
     @classmethod
     def register(
-        cls, diagram_type: str, processor_class: Type[BaseDiagramProcessor]
+        cls,
+        diagram_type: str,
+        processor_class: Union[Type[BaseDiagramProcessor], str],
     ) -> None:
         """Register a processor for a specific diagram type.
 
         Args:
             diagram_type: Type identifier for the diagram
-            processor_class: Class that processes this diagram type
+            processor_class: Class that processes this diagram type, or its
+                import path as "module.Class" or "module:Class"
         """
         cls._processors[diagram_type] = processor_class
+        cls._scanner = None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Remove all processors; the defaults are registered again on next use."""
+        cls._processors = {}
+        cls._discovered = {}
+        cls._defaults_loaded = False
+        cls._scanner = None
+
+    @classmethod
+    def _load_defaults(cls) -> None:
+        """Register the built-in and discovered processors once.
+
+        Explicitly registered processors are kept, and built-in processors
+        take precedence over discovered ones of the same diagram type.
+        """
+        if cls._defaults_loaded:
+            return
+        cls._defaults_loaded = True
+
+        try:
+            discovered = discover_processors(cls.discovery_cache_dir)
+        except Exception:
+            # Broken metadata of an unrelated distribution must not stop
+            # the built-in processors from working
+            logger.warning("Could not discover processors", exc_info=True)
+            discovered = {}
+
+        defaults = dict(AVAILABLE_PROCESSORS)
+        for diagram_type, path in discovered.items():
+            if diagram_type not in defaults:
+                defaults[diagram_type] = path
+                cls._discovered[diagram_type] = path
+        for diagram_type, path in defaults.items():
+            if diagram_type not in cls._processors:
+                cls._processors[diagram_type] = path
+                cls._scanner = None
+
+    @classmethod
+    def _resolve(cls, diagram_type: str) -> Optional[Type[BaseDiagramProcessor]]:
+        """Import the processor of a diagram type if that has not happened yet.
+
+        A discovered processor that fails to import is logged and removed;
+        a built-in or explicitly registered one raises.
+
+        Args:
+            diagram_type: Type identifier for the diagram
+
+        Returns:
+            Processor class for the diagram type or None if not found
+        """
+        processor = cls._processors.get(diagram_type)
+        if not isinstance(processor, str):
+            return processor
+
+        try:
+            processor_class = import_object(_local_import_path(processor))
+        except Exception:
+            if cls._discovered.get(diagram_type) != processor:
+                raise
+            logger.warning(
+                "Could not load processor %s for %s diagrams",
+                processor,
+                diagram_type,
+                exc_info=True,
+            )
+            del cls._processors[diagram_type]
+            return None
+
+        cls._processors[diagram_type] = processor_class
+        return processor_class
+
+    @classmethod
+    def get_diagram_types(cls) -> List[str]:
+        """Get the registered diagram types without importing their processors.
+
+        Returns:
+            Diagram types in the order they are tried during detection
+        """
+        cls._load_defaults()
+        return list(cls._processors)
+
+    @classmethod
+    def get_keyword_scanner(cls) -> KeywordScanner:
+        """Get the scanner for the keywords of all registered processors.
+
+        Returns:
+            KeywordScanner for the union of all processors' KEYWORDS
+        """
+        processors = cls.get_all_processors()
+        if cls._scanner is None:
+            keywords = frozenset(
+                keyword
+                for processor_class in processors.values()
+                for keyword in processor_class.KEYWORDS
+            )
+            cls._scanner = get_keyword_scanner(keywords)
+        return cls._scanner
 
     @classmethod
     def get_processor(cls, diagram_type: str) -> Optional[Type[BaseDiagramProcessor]]:
         """Get processor class for a specific diagram type.
 
+        Only this processor is imported if it has not been yet.
+
         Args:
             diagram_type: Type identifier for the diagram
 
         Returns:
             Processor class for the diagram type or None if not found
         """
-        return cls._processors.get(diagram_type)
+        cls._load_defaults()
+        return cls._resolve(diagram_type)
 
     @classmethod
     def get_all_processors(cls) -> Dict[str, Type[BaseDiagramProcessor]]:
-        """Get all registered processors.
+        """Get all registered processors, importing those not yet imported.
 
         Returns:
             Dictionary mapping diagram types to processor classes
         """
-        return cls._processors
+        cls._load_defaults()
+        processors = {}
+        for diagram_type in list(cls._processors):
+            processor_class = cls._resolve(diagram_type)
+            if processor_class is not None:
+                processors[diagram_type] = processor_class
+        return processors
 
     @classmethod
     def detect_diagram_type(
@@ -214,16 +509,37 @@ class ProcessorRegistry:
         if not content or "@startuml" not in content or "@enduml" not in content:
             return "not_plantuml", None
 
+        # Scan the content once for the keywords of all processors
+        features = DiagramFeatures(content, cls.get_keyword_scanner())
+
         # Find the processor with the highest confidence
         max_confidence = 0.0
         best_type = "unknown"
         best_processor = None
 
-        for diagram_type, processor_class in cls._processors.items():
-            confidence = processor_class.detect_diagram_type(content)
+        for diagram_type, processor_class in cls.get_all_processors().items():
+            confidence = processor_class.score_features(features)
             if confidence > max_confidence:
                 max_confidence = confidence
                 best_type = diagram_type
                 best_processor = processor_class
 
         return best_type, best_processor
+
+
+def _local_import_path(path: str) -> str:
+    """Map an import path of this package to the name it is imported as.
+
+    In a development checkout the package may be imported as
+    src.plantuml2drawio; its built-in processors must then be imported from
+    there too, so they share the classes and configuration of the caller.
+
+    Args:
+        path: Import path starting with "plantuml2drawio." or of another package
+
+    Returns:
+        The import path to use
+    """
+    if _PACKAGE != "plantuml2drawio" and path.startswith("plantuml2drawio."):
+        return _PACKAGE + path[len("plantuml2drawio") :]
+    return path
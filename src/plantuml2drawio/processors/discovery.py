@@ -0,0 +1,141 @@
+"""Discovery of third-party processors through entry points.
+
+Distributions provide processors in the entry point group
+config.PROCESSOR_ENTRY_POINT_GROUP, named after the diagram type, e.g.
+
+    entry_points={
+        "plantuml2drawio.processors": [
+            "sequence = my_package.sequence:SequenceDiagramProcessor",
+        ],
+    }
+
+Scanning the installed distributions is slow, so the CLI and the GUI cache
+the discovered index on disk together with a fingerprint of the directories
+on sys.path. It is only scanned again when one of them changes, e.g.
+because a distribution was installed or removed. Library use scans in
+memory and writes nothing.
+"""
+
+import importlib
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, cast
+
+from plantuml2drawio.config import (PROCESSOR_ENTRY_POINT_GROUP,
+                                    PROCESSOR_INDEX_FILE, VERSION)
+
+
+def path_fingerprint(paths: Sequence[str]) -> List:
+    """Fingerprint import paths by their names and modification times.
+
+    Installing or removing a distribution adds or removes its metadata
+    directory, which changes the modification time of the directory on the
+    path it was installed to. The fingerprint is kept as a plain list, as
+    hashing it would cost more start-up time than comparing it.
+
+    Args:
+        paths: Import paths, typically sys.path
+
+    Returns:
+        JSON-serializable list of the version and each path with its time
+    """
+    fingerprint: List = [VERSION]
+    for path in paths:
+        try:
+            modified = os.stat(path or os.curdir).st_mtime_ns
+        except OSError:
+            modified = -1
+        fingerprint.append([path, modified])
+    return fingerprint
+
+
+def scan_entry_points(group: str = PROCESSOR_ENTRY_POINT_GROUP) -> Dict[str, str]:
+    """Scan the installed distributions for processor entry points.
+
+    Args:
+        group: Entry point group to scan
+
+    Returns:
+        Dictionary of diagram type to the import path of its processor
+    """
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    selected: Iterable[metadata.EntryPoint]
+    if hasattr(entry_points, "select"):
+        selected = entry_points.select(group=group)
+    else:
+        # Python 3.8 and 3.9 return a dictionary of groups
+        groups = cast(Dict[str, Iterable[metadata.EntryPoint]], entry_points)
+        selected = groups.get(group, ())
+    return {entry_point.name: entry_point.value for entry_point in selected}
+
+
+def discover_processors(cache_dir: Optional[str] = None) -> Dict[str, str]:
+    """Return the processors provided by installed distributions.
+
+    Args:
+        cache_dir: Directory of the cached index; None always scans and
+            neither reads nor writes an index
+
+    Returns:
+        Dictionary of diagram type to the import path of its processor
+    """
+    if not cache_dir:
+        return scan_entry_points()
+
+    fingerprint = path_fingerprint(sys.path)
+    index_path = os.path.join(cache_dir, PROCESSOR_INDEX_FILE)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("fingerprint") == fingerprint:
+            return dict(index["processors"])
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    processors = scan_entry_points()
+    _write_index(index_path, {"fingerprint": fingerprint, "processors": processors})
+    return processors
+
+
+def _write_index(index_path: str, index: Dict) -> None:
+    """Write the index atomically; failures are ignored, it is only a cache."""
+    import tempfile
+
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(index_path))
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(temp_path, index_path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass
+
+
+def import_object(path: str) -> object:
+    """Import an object given as "module:name" or "module.name".
+
+    Args:
+        path: Import path of the object
+
+    Returns:
+        The imported object
+
+    Raises:
+        ImportError: If the module cannot be imported
+        AttributeError: If the module has no such object
+    """
+    if ":" in path:
+        module_name, _, attribute_path = path.partition(":")
+    else:
+        module_name, _, attribute_path = path.rpartition(".")
+    imported = importlib.import_module(module_name)
+    for attribute in attribute_path.split("."):
+        imported = getattr(imported, attribute)
+    return imported
@@ -0,0 +1,110 @@
+"""Shared keyword feature extraction for diagram type detection.
+
+Every processor scores a document by the keywords it contains. Instead of
+letting each processor lowercase the whole content and search it for its own
+keywords, the registry lowercases it once, looks up the keywords of all
+processors in it and hands the resulting DiagramFeatures to every processor.
+"""
+
+import functools
+from typing import FrozenSet, Iterable, Set, Tuple
+
+
+class KeywordScanner:
+    """Finds which of a set of keywords occur in a text.
+
+    Each keyword is looked up with a substring search, which runs in C and
+    is far faster than any scan that visits the matches in Python. The text
+    is lowercased once by the caller and shared by all keywords, so the
+    union of the processors' keywords costs one lowercase pass plus one
+    search per keyword, instead of a lowercase pass per processor.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """Initialize the scanner.
+
+        Args:
+            keywords: Lower-case keywords to look for
+        """
+        self.keywords: FrozenSet[str] = frozenset(k for k in keywords if k)
+        # Longest first, so that a shorter keyword contained in a longer one
+        # that was found does not need a search of its own
+        self._ordered: Tuple[str, ...] = tuple(
+            sorted(self.keywords, key=lambda k: (-len(k), k))
+        )
+
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Find all keywords occurring in the text.
+
+        Args:
+            text: Lower-case text to scan
+
+        Returns:
+            The set of keywords that occur in the text
+        """
+        found: Set[str] = set()
+        for keyword in self._ordered:
+            if keyword in found:
+                continue
+            if keyword in text:
+                found.add(keyword)
+                found.update(k for k in self._ordered if k in keyword)
+        return frozenset(found)
+
+
+@functools.lru_cache(maxsize=32)
+def get_keyword_scanner(keywords: FrozenSet[str]) -> KeywordScanner:
+    """Return a cached scanner for a set of keywords.
+
+    Args:
+        keywords: Lower-case keywords to look for
+
+    Returns:
+        KeywordScanner for the keywords
+    """
+    return KeywordScanner(keywords)
+
+
+class DiagramFeatures:
+    """Features of a PlantUML document shared by all processors.
+
+    Attributes:
+        content: The original content.
+        content_lower: The content in lower case, computed once.
+        keywords: The scanned keywords that occur in the content.
+    """
+
+    def __init__(self, content: str, scanner: KeywordScanner):
+        """Extract the features of a document.
+
+        Args:
+            content: PlantUML content to analyze
+            scanner: Scanner for the keywords of interest
+        """
+        self.content = content
+        self.content_lower = content.lower()
+        self.keywords = scanner.scan(self.content_lower)
+
+    @classmethod
+    def extract(cls, content: str, keywords: Iterable[str]) -> "DiagramFeatures":
+        """Extract the features of a document for the given keywords.
+
+        Args:
+            content: PlantUML content to analyze
+            keywords: Lower-case keywords to look for
+
+        Returns:
+            DiagramFeatures of the content
+        """
+        return cls(content, get_keyword_scanner(frozenset(keywords)))
+
+    def has_keyword(self, keyword: str) -> bool:
+        """Check whether a keyword occurs in the content.
+
+        Args:
+            keyword: A lower-case keyword that was part of the scan
+
+        Returns:
+            True if the keyword occurs in the content
+        """
+        return keyword in self.keywords
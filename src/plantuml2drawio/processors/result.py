@@ -0,0 +1,231 @@
+"""Result of running a diagram through the conversion pipeline once.
+
+BaseDiagramProcessor.run parses and lays out a diagram and returns a
+DiagramResult. The result holds the laid-out model and serializes it to
+Draw.io XML or JSON only when asked, so the CLI, the library and the GUI
+can export it in whatever form they need without parsing it again.
+
+Failures of a stage are raised as StageError, which tells parse, layout and
+export failures apart. A run can be given a threading.Event to cancel it
+cooperatively from another thread; the pipeline then stops at its next
+check with ConversionCancelled.
+"""
+
+import functools
+import json
+import threading
+from typing import (TYPE_CHECKING, Callable, Iterable, Iterator, List,
+                    Optional, TextIO)
+
+from plantuml2drawio.models import Edge, Node
+from plantuml2drawio.stats import ConversionStats, timed
+
+if TYPE_CHECKING:
+    from plantuml2drawio.processors.base_processor import BaseDiagramProcessor
+
+# Stages of the pipeline, named like the stages of ConversionStats
+STAGE_PARSE = "parse"
+STAGE_LAYOUT = "layout"
+STAGE_EXPORT = "export"
+
+
+class StageError(Exception):
+    """Raised when a stage of the conversion pipeline fails.
+
+    The message is that of the original error, which is chained as
+    __cause__.
+
+    Attributes:
+        stage: Name of the failed stage, e.g. STAGE_PARSE.
+    """
+
+    def __init__(self, stage: str, message: str):
+        """Initialize the error.
+
+        Args:
+            stage: Name of the failed stage
+            message: Description of the failure
+        """
+        super().__init__(message)
+        self.stage = stage
+
+    def __reduce__(self):
+        """Keep the stage when the error is sent to another process."""
+        return self.__class__, (self.stage, str(self))
+
+
+class ConversionCancelled(Exception):
+    """Raised when a conversion stops because it was cancelled."""
+
+
+def check_cancelled(cancel: Optional[threading.Event]) -> None:
+    """Stop the conversion if it has been cancelled.
+
+    Args:
+        cancel: Event set to cancel the conversion, or None
+
+    Raises:
+        ConversionCancelled: If the event is set
+    """
+    if cancel is not None and cancel.is_set():
+        raise ConversionCancelled("Conversion cancelled")
+
+
+class DiagramResult:
+    """Parsed and laid-out diagram with lazily serialized output.
+
+    Layout positions the parsed nodes in place, so nodes and edges are the
+    parsed model and the laid-out model at once.
+
+    Attributes:
+        processor: Processor that produced the result and exports it.
+        nodes: Laid-out nodes of the diagram.
+        edges: Edges of the diagram.
+        stats: Statistics that receive the export time and output size, or
+            None.
+        cancel: Event that cancels the export between chunks, or None.
+    """
+
+    def __init__(
+        self,
+        processor: "BaseDiagramProcessor",
+        nodes: List[Node],
+        edges: List[Edge],
+        stats: Optional[ConversionStats] = None,
+        cancel: Optional[threading.Event] = None,
+    ):
+        """Initialize the result of a pipeline run.
+
+        Args:
+            processor: Processor that produced the result
+            nodes: Laid-out nodes of the diagram
+            edges: Edges of the diagram
+            stats: Optional statistics filled in during the export
+            cancel: Optional event that cancels the export when set
+        """
+        self.processor = processor
+        self.nodes = nodes
+        self.edges = edges
+        self.stats = stats
+        self.cancel = cancel
+        self._drawio: Optional[str] = None
+        self._json: Optional[str] = None
+
+    @property
+    def drawio(self) -> str:
+        """The Draw.io XML of the diagram, serialized on first access.
+
+        Raises:
+            StageError: If the export fails
+        """
+        if self._drawio is None:
+            self._drawio = "".join(self.iter_drawio())
+        return self._drawio
+
+    @property
+    def json(self) -> str:
+        """The JSON representation of the diagram, serialized on first access.
+
+        Raises:
+            StageError: If the export fails
+        """
+        if self._json is None:
+            with timed(self.stats, STAGE_EXPORT):
+                try:
+                    diagram_data = {
+                        "nodes": [
+                            self.processor._node_to_dict(node) for node in self.nodes
+                        ],
+                        "edges": [
+                            self.processor._edge_to_dict(edge) for edge in self.edges
+                        ],
+                    }
+                    output = json.dumps(diagram_data, indent=2)
+                except Exception as e:
+                    raise StageError(STAGE_EXPORT, str(e)) from e
+            if self.stats is not None:
+                self.stats.count_output(output)
+            self._json = output
+        return self._json
+
+    def iter_drawio(self) -> Iterator[str]:
+        """Yield the Draw.io XML in chunks without building the whole document.
+
+        Once the drawio property has been read, its text is yielded instead.
+
+        Yields:
+            Consecutive parts of the Draw.io XML
+
+        Raises:
+            StageError: If the export fails
+            ConversionCancelled: If the export is cancelled
+        """
+        if self._drawio is not None:
+            yield self._drawio
+            return
+        yield from self._track(
+            functools.partial(self.processor.iter_drawio, self.nodes, self.edges)
+        )
+
+    def iter_drawio_page(self, page_id: str, page_name: str) -> Iterator[str]:
+        """Yield only the <diagram> page of the diagram in chunks.
+
+        Args:
+            page_id: ID of the page, unique within the document
+            page_name: Name of the page shown by Draw.io
+
+        Yields:
+            Consecutive parts of the <diagram> element
+
+        Raises:
+            StageError: If the export fails
+        """
+        yield from self._track(
+            functools.partial(
+                self.processor.iter_drawio_page,
+                self.nodes,
+                self.edges,
+                page_id,
+                page_name,
+            )
+        )
+
+    def write_drawio(self, stream: TextIO) -> None:
+        """Write the Draw.io XML to a text stream in chunks.
+
+        Args:
+            stream: Text file object to write to
+
+        Raises:
+            StageError: If the export fails
+            ConversionCancelled: If the export is cancelled
+            OSError: If the stream cannot be written
+        """
+        for chunk in self.iter_drawio():
+            stream.write(chunk)
+
+    def _track(self, export: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """Report export failures as StageError and record the statistics."""
+        chunks = _export_stage(export, self.cancel)
+        if self.stats is not None:
+            chunks = self.stats.track_chunks(chunks)
+        return chunks
+
+
+def _export_stage(
+    export: Callable[[], Iterable[str]], cancel: Optional[threading.Event]
+) -> Iterator[str]:
+    """Yield the chunks of an export, raising its failures as StageError."""
+    try:
+        iterator = iter(export())
+    except Exception as e:
+        raise StageError(STAGE_EXPORT, str(e)) from e
+    while True:
+        check_cancelled(cancel)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise StageError(STAGE_EXPORT, str(e)) from e
+        yield chunk
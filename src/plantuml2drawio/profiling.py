@@ -0,0 +1,388 @@
+"""Profiling and memory reports of conversions.
+
+cProfile profiles are written as pstats files that can be merged across the
+files of a batch. Memory reports trace allocations with tracemalloc and
+record, per conversion stage, the peak memory and the allocation sites that
+grew the most during the stage.
+"""
+
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple, Union)
+
+from plantuml2drawio.stats import ConversionStats
+
+# Number of allocation sites kept per stage
+DEFAULT_TOP_SITES = 5
+
+# Number of lines in the printed summaries
+DEFAULT_REPORT_LIMIT = 15
+
+# Allocations of the tracing machinery itself are not reported
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class AllocationSite(NamedTuple):
+    """Memory that was allocated at one source line during a stage.
+
+    Attributes:
+        site: Source file and line, e.g. "plantuml2drawio/models.py:42".
+        size: Bytes still allocated at the end of the stage.
+        blocks: Number of memory blocks still allocated at the end of the stage.
+    """
+
+    site: str
+    size: int
+    blocks: int
+
+
+class StageMemory(NamedTuple):
+    """Memory use of one conversion stage.
+
+    Attributes:
+        peak: Highest traced memory during the stage above its start, in bytes.
+        sites: Allocation sites that grew the most, largest first.
+    """
+
+    peak: int
+    sites: List[AllocationSite]
+
+
+class _Frame:
+    """Bookkeeping of a stage whose memory is currently being traced."""
+
+    __slots__ = ("start", "peak", "snapshot")
+
+    def __init__(self, start: int, snapshot: tracemalloc.Snapshot):
+        self.start = start
+        self.peak = start
+        self.snapshot = snapshot
+
+
+class MemoryStats(ConversionStats):
+    """Conversion statistics that also trace the memory of every stage.
+
+    Stages are only traced while tracemalloc is running, see tracing. The
+    export stage of streamed output also contains the memory of whatever
+    consumes the chunks, e.g. writing them to a file.
+
+    Attributes:
+        memory: Memory use of each stage, keyed by stage name.
+        peak: Highest traced memory during any stage, in bytes.
+    """
+
+    def __init__(self, top_sites: int = DEFAULT_TOP_SITES):
+        """Initialize empty statistics.
+
+        Args:
+            top_sites: Number of allocation sites kept per stage
+        """
+        super().__init__()
+        self.top_sites = top_sites
+        self.memory: Dict[str, StageMemory] = {}
+        self.peak = 0
+        self._frames: List[_Frame] = []
+
+    @contextlib.contextmanager
+    def tracing(self) -> Iterator["MemoryStats"]:
+        """Trace allocations with tracemalloc unless that is already running.
+
+        Yields:
+            These statistics
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage and trace its memory.
+
+        Args:
+            name: Name of the stage
+        """
+        with self._trace(name), super().stage(name):
+            yield
+
+    def track_chunks(
+        self, chunks: Iterable[str], stage_name: str = "export"
+    ) -> Iterator[str]:
+        """Pass chunks through, timing them and tracing the memory meanwhile.
+
+        Args:
+            chunks: Chunks of output, typically from a generator
+            stage_name: Stage the production time and memory are added to
+
+        Yields:
+            The chunks unchanged
+        """
+        with self._trace(stage_name):
+            yield from super().track_chunks(chunks, stage_name)
+
+    @contextlib.contextmanager
+    def _trace(self, name: str) -> Iterator[None]:
+        """Record the peak memory and the grown allocation sites of a stage."""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        if self._frames:
+            # The enclosing stage keeps its peak when this stage resets it
+            self._fold_peak(self._frames[-1])
+        snapshot = tracemalloc.take_snapshot()
+        _reset_peak()
+        frame = _Frame(tracemalloc.get_traced_memory()[0], snapshot)
+        self._frames.append(frame)
+        try:
+            yield
+        finally:
+            self._frames.pop()
+            self._fold_peak(frame)
+            if self._frames:
+                self._frames[-1].peak = max(self._frames[-1].peak, frame.peak)
+            self.peak = max(self.peak, frame.peak)
+            sites = self._grown_sites(frame.snapshot, tracemalloc.take_snapshot())
+            stage_memory = StageMemory(frame.peak - frame.start, sites)
+            previous = self.memory.get(name)
+            if previous is None or previous.peak < stage_memory.peak:
+                self.memory[name] = stage_memory
+            # Comparing the snapshots must not count towards an enclosing stage
+            del frame, sites
+            _reset_peak()
+
+    @staticmethod
+    def _fold_peak(frame: _Frame) -> None:
+        """Raise the peak of a frame to the traced peak since the last reset."""
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+
+    def _grown_sites(
+        self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> List[AllocationSite]:
+        """Return the allocation sites that grew the most between snapshots."""
+        differences = after.filter_traces(_TRACE_FILTERS).compare_to(
+            before.filter_traces(_TRACE_FILTERS), "lineno"
+        )
+        sites = []
+        for difference in differences:
+            if difference.size_diff <= 0:
+                continue
+            frame = difference.traceback[0]
+            site = f"{_short_path(frame.filename)}:{frame.lineno}"
+            sites.append(
+                AllocationSite(site, difference.size_diff, difference.count_diff)
+            )
+            if len(sites) == self.top_sites:
+                break
+        return sites
+
+    def memory_dict(self) -> Dict:
+        """Return the memory use as a JSON-serializable dictionary."""
+        return {
+            "peak": self.peak,
+            "stages": {
+                name: {
+                    "peak": stage_memory.peak,
+                    "sites": [site._asdict() for site in stage_memory.sites],
+                }
+                for name, stage_memory in self._ordered_memory().items()
+            },
+        }
+
+    def to_dict(self) -> Dict:
+        """Return the statistics including the memory use as a dictionary."""
+        data = super().to_dict()
+        data["memory"] = self.memory_dict()
+        return data
+
+    def format_memory(self) -> str:
+        """Return the memory use as a human-readable report."""
+        lines = [f"peak memory: {format_size(self.peak)}"]
+        for name, stage_memory in self._ordered_memory().items():
+            lines.append(f"{name:<10} {format_size(stage_memory.peak):>12} peak")
+            for site in stage_memory.sites:
+                lines.append(
+                    f"  {format_size(site.size):>12}  {site.site} "
+                    f"({site.blocks} blocks)"
+                )
+        return "\n".join(lines)
+
+    def _ordered_memory(self) -> Dict[str, StageMemory]:
+        """Return the stage memory in reporting order."""
+        return {
+            name: self.memory[name]
+            for name in self.ordered_stages()
+            if name in self.memory
+        }
+
+
+def _reset_peak() -> None:
+    """Reset the traced peak to the current size where Python supports it.
+
+    tracemalloc.reset_peak is new in Python 3.9; before, stage peaks are the
+    peak since tracing started.
+    """
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+def _short_path(filename: str) -> str:
+    """Shorten a source path to start at the package, or to its last parts."""
+    parts = filename.replace(os.sep, "/").split("/")
+    if "plantuml2drawio" in parts[:-1]:
+        return "/".join(parts[parts.index("plantuml2drawio"):])
+    return "/".join(parts[-2:])
+
+
+def format_size(size: int) -> str:
+    """Format a number of bytes with a binary unit.
+
+    Args:
+        size: Number of bytes
+
+    Returns:
+        The size as text, e.g. "1.5 MiB"
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+@contextlib.contextmanager
+def profiled(output_path: str) -> Iterator[cProfile.Profile]:
+    """Profile the enclosed code with cProfile and write the pstats file.
+
+    The profile is written even if the enclosed code raises.
+
+    Args:
+        output_path: Path of the pstats file
+
+    Yields:
+        The running profiler
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+
+
+def merge_profiles(paths: Sequence[str], output_path: str) -> Optional[pstats.Stats]:
+    """Merge pstats files into one and write it.
+
+    Args:
+        paths: Paths of the pstats files; missing files are skipped
+        output_path: Path of the merged pstats file
+
+    Returns:
+        The merged statistics, or None if none of the files exist
+    """
+    existing = [path for path in paths if os.path.exists(path)]
+    if not existing:
+        return None
+    merged = pstats.Stats(*existing)
+    merged.dump_stats(output_path)
+    return merged
+
+
+def format_profile(
+    profile: Union[pstats.Stats, str], limit: int = DEFAULT_REPORT_LIMIT
+) -> str:
+    """Format the functions with the highest cumulative time of a profile.
+
+    Args:
+        profile: Statistics or path of a pstats file
+        limit: Number of functions to list
+
+    Returns:
+        The pstats table as text
+    """
+    stream = io.StringIO()
+    # Stats only takes paths or profilers, add() also takes other statistics
+    stats = pstats.Stats(stream=stream)
+    stats.add(profile)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue().strip()
+
+
+def format_batch_memory(
+    reports: Sequence[Tuple[str, Dict]], limit: int = DEFAULT_REPORT_LIMIT
+) -> str:
+    """Aggregate the memory reports of a batch into one report.
+
+    The report lists the files with the highest peak, the highest peak of
+    every stage with the file it occurred in, and the allocation sites that
+    grew the most summed over all files.
+
+    Args:
+        reports: Pairs of (input path, MemoryStats.memory_dict())
+        limit: Number of files and allocation sites to list
+
+    Returns:
+        The report as text
+    """
+    lines = ["Files with the highest peak memory:"]
+    by_peak = sorted(reports, key=lambda report: report[1]["peak"], reverse=True)
+    for path, memory in by_peak[:limit]:
+        lines.append(f"  {format_size(memory['peak']):>12}  {path}")
+
+    stage_peaks: Dict[str, Tuple[int, str]] = {}
+    site_sizes: Dict[str, List[int]] = {}
+    for path, memory in reports:
+        for name, stage_memory in memory["stages"].items():
+            if name not in stage_peaks or stage_memory["peak"] > stage_peaks[name][0]:
+                stage_peaks[name] = (stage_memory["peak"], path)
+            for site in stage_memory["sites"]:
+                totals = site_sizes.setdefault(site["site"], [0, 0])
+                totals[0] += site["size"]
+                totals[1] += site["blocks"]
+
+    lines.append("Highest peak per stage:")
+    for name, (peak, path) in stage_peaks.items():
+        lines.append(f"  {name:<10} {format_size(peak):>12}  {path}")
+
+    lines.append("Allocation sites over all files:")
+    by_size = sorted(site_sizes.items(), key=lambda item: item[1][0], reverse=True)
+    for site, (size, blocks) in by_size[:limit]:
+        lines.append(f"  {format_size(size):>12}  {site} ({blocks} blocks)")
+    return "\n".join(lines)
+
+
+def format_slowest_files(
+    timings: Sequence[Tuple[str, float]], limit: int = DEFAULT_REPORT_LIMIT
+) -> str:
+    """List the files of a batch that took the longest.
+
+    Args:
+        timings: Pairs of (input path, seconds)
+        limit: Number of files to list
+
+    Returns:
+        The list as text
+    """
+    total = sum(seconds for _, seconds in timings) or 1.0
+    by_time = sorted(timings, key=lambda item: item[1], reverse=True)
+    lines = ["Files with the highest conversion time:"]
+    for path, seconds in by_time[:limit]:
+        lines.append(f"  {seconds * 1000:10.1f} ms {seconds / total:6.1%}  {path}")
+    return "\n".join(lines)
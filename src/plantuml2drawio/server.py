@@ -0,0 +1,271 @@
+"""Long-lived conversion daemon listening on a Unix domain socket.
+
+Starting the interpreter and importing the processors dominates the run time
+of a single p2d-cli call. The daemon pays that cost once and then serves
+conversion requests from any number of clients concurrently.
+
+Messages in both directions are UTF-8 encoded JSON objects prefixed with
+their length as a 4-byte big-endian unsigned integer.
+
+Request:  {"content": "<PlantUML>", "json": false}
+Response: {"ok": true, "output": "<XML or JSON>", "format": "Draw.io XML"}
+          {"ok": false, "error": "<message>"}
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+from plantuml2drawio.logging_config import get_logger, setup_logging
+
+logger = get_logger("server")
+
+# Length prefix of every message
+HEADER = struct.Struct(">I")
+
+# Upper bound for a single message, protects the daemon from bogus clients
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# Seconds a client waits for the daemon before falling back
+CLIENT_TIMEOUT = 30.0
+
+
+def get_default_socket_path() -> str:
+    """Return the per-user default path of the daemon socket.
+
+    Returns:
+        Path of the socket file in the temporary directory
+    """
+    user = str(os.getuid()) if hasattr(os, "getuid") else "default"
+    return os.path.join(tempfile.gettempdir(), f"plantuml2drawio-{user}.sock")
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, returning None if the peer closed early."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]) -> None:
+    """Send a length-prefixed JSON message.
+
+    Args:
+        sock: Connected socket
+        message: JSON-serializable dictionary
+    """
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Receive a length-prefixed JSON message.
+
+    Args:
+        sock: Connected socket
+
+    Returns:
+        The decoded dictionary or None if the connection was closed
+
+    Raises:
+        ValueError: If the message is too large or not a JSON object
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {size} bytes exceeds the limit")
+
+    data = _recv_exactly(sock, size)
+    if data is None:
+        return None
+
+    message = json.loads(data.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Message is not a JSON object")
+    return message
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the diagram of a single request.
+
+    Args:
+        request: Decoded request message
+
+    Returns:
+        Response message
+    """
+    from plantuml2drawio.core import ConversionError, convert_content
+
+    content = request.get("content")
+    if not isinstance(content, str):
+        return {"ok": False, "error": "Request has no PlantUML content"}
+
+    try:
+        output, output_format = convert_content(content, bool(request.get("json")))
+    except ConversionError as e:
+        return {"ok": False, "error": str(e)}
+    except Exception as e:
+        # Reply anyway, so the client reports the bug instead of taking the
+        # dropped connection for a missing daemon and converting again
+        logger.exception("Unexpected error while converting a request")
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "output": output, "format": output_format}
+
+
+class ConversionRequestHandler(socketserver.BaseRequestHandler):
+    """Serves conversion requests of one client connection until it closes."""
+
+    def handle(self) -> None:
+        """Answer requests on the connection one after another."""
+        while True:
+            try:
+                request = recv_message(self.request)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping client connection: {e}")
+                return
+            if request is None:
+                return
+
+            try:
+                send_message(self.request, handle_request(request))
+            except OSError as e:
+                logger.warning(f"Could not send response: {e}")
+                return
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class ConversionServer(socketserver.ThreadingUnixStreamServer):
+        """Threaded Unix domain socket server for conversion requests."""
+
+        daemon_threads = True
+
+
+def _is_daemon_running(socket_path: str) -> bool:
+    """Check whether a daemon already accepts connections on socket_path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+def serve(socket_path: str) -> None:
+    """Run the daemon until it is interrupted.
+
+    Args:
+        socket_path: Path of the Unix domain socket to listen on
+    """
+    # Import the processors now, so that the first request is served warm
+    from plantuml2drawio.processors import ProcessorRegistry
+
+    ProcessorRegistry.get_all_processors()
+
+    if os.path.exists(socket_path):
+        if _is_daemon_running(socket_path):
+            raise RuntimeError(f"A daemon is already listening on '{socket_path}'")
+        # Left over from a daemon that did not shut down cleanly
+        os.unlink(socket_path)
+
+    with ConversionServer(socket_path, ConversionRequestHandler) as server:
+        os.chmod(socket_path, 0o600)
+        print(f"Listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def convert_via_daemon(
+    plantuml_content: str,
+    output_json: bool = False,
+    socket_path: Optional[str] = None,
+) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Convert PlantUML content using a running daemon.
+
+    Args:
+        plantuml_content: Content of the PlantUML diagram
+        output_json: If True, output JSON, otherwise XML
+        socket_path: Path of the daemon socket; None uses the default
+
+    Returns:
+        None if no daemon could be reached, so the caller can fall back to
+        in-process conversion. Otherwise the same result as process_diagram.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_TIMEOUT)
+    try:
+        sock.connect(socket_path or get_default_socket_path())
+        send_message(sock, {"content": plantuml_content, "json": output_json})
+        response = recv_message(sock)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+    if response is None:
+        return None
+    if not response.get("ok"):
+        print(f"Error: {response.get('error', 'Unknown daemon error')}")
+        return None, None
+    return response.get("output"), response.get("format")
+
+
+def main() -> None:
+    """Entry point of p2d-server."""
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Runs a conversion daemon that p2d-cli --daemon connects to "
+            "instead of converting in its own process."
+        )
+    )
+    parser.add_argument(
+        "--socket",
+        default=get_default_socket_path(),
+        help="Path of the Unix domain socket (default: %(default)s).",
+    )
+    args = parser.parse_args()
+
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("Error: Unix domain sockets are not supported on this platform")
+        sys.exit(1)
+
+    # Shut down cleanly and remove the socket file when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        serve(args.socket)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Per-stage timing and size statistics of a conversion.
+
+Conversion functions accept an optional ConversionStats object and fill it
+in place. When no object is passed, the stages run under a shared no-op
+context manager, so the instrumentation costs next to nothing.
+"""
+
+import contextlib
+import json
+import time
+from typing import (ContextManager, Dict, Iterable, Iterator, Optional,
+                    Sequence)
+
+# Order in which known stages are reported; other stages follow in the order
+# they were first timed
+STAGE_ORDER = ("cache", "detect", "validate", "parse", "layout", "export", "write")
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class ConversionStats:
+    """Timings and sizes collected during one conversion.
+
+    Attributes:
+        stages: Seconds spent in each stage, keyed by stage name.
+        node_count: Number of nodes of the diagram, if it was parsed.
+        edge_count: Number of edges of the diagram, if it was parsed.
+        bytes_out: Size of the produced output in UTF-8 encoded bytes.
+        cache_hit: True if the output was served from the cache.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.stages: Dict[str, float] = {}
+        self.node_count: Optional[int] = None
+        self.edge_count: Optional[int] = None
+        self.bytes_out = 0
+        self.cache_hit = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage; repeated stages of the same name add up.
+
+        Args:
+            name: Name of the stage
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add seconds to the time of a stage.
+
+        Args:
+            name: Name of the stage
+            seconds: Seconds to add
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count_graph(self, nodes: Sequence, edges: Sequence) -> None:
+        """Record the size of a parsed diagram.
+
+        The counts of several diagrams, e.g. the blocks of one file, add up.
+
+        Args:
+            nodes: Nodes of the diagram
+            edges: Edges of the diagram
+        """
+        self.node_count = (self.node_count or 0) + len(nodes)
+        self.edge_count = (self.edge_count or 0) + len(edges)
+
+    def count_output(self, text: str) -> str:
+        """Record produced output and return it unchanged.
+
+        Args:
+            text: Produced output
+
+        Returns:
+            The same text
+        """
+        self.bytes_out += len(text.encode("utf-8"))
+        return text
+
+    def track_chunks(
+        self, chunks: Iterable[str], stage_name: str = "export"
+    ) -> Iterator[str]:
+        """Pass chunks through while timing their production and counting them.
+
+        Only the time spent producing each chunk is added to the stage, not
+        the time the consumer spends on it, e.g. writing it to disk.
+
+        Args:
+            chunks: Chunks of output, typically from a generator
+            stage_name: Stage the production time is added to
+
+        Yields:
+            The chunks unchanged
+        """
+        iterator = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                self.add_time(stage_name, time.perf_counter() - started)
+                return
+            self.add_time(stage_name, time.perf_counter() - started)
+            yield self.count_output(chunk)
+
+    @property
+    def total(self) -> float:
+        """Total seconds of all stages."""
+        return sum(self.stages.values())
+
+    def ordered_stages(self) -> Dict[str, float]:
+        """Return the stages in reporting order."""
+        ordered = {
+            name: self.stages[name] for name in STAGE_ORDER if name in self.stages
+        }
+        ordered.update(self.stages)
+        return ordered
+
+    def to_dict(self) -> Dict:
+        """Return the statistics as a JSON-serializable dictionary."""
+        return {
+            "stages": self.ordered_stages(),
+            "total": self.total,
+            "nodes": self.node_count,
+            "edges": self.edge_count,
+            "bytes": self.bytes_out,
+            "cache_hit": self.cache_hit,
+        }
+
+    def to_json(self) -> str:
+        """Return the statistics as a JSON document."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def format(self) -> str:
+        """Return the statistics as a human-readable table."""
+        lines = [
+            f"{name:<10} {seconds * 1000:10.2f} ms"
+            for name, seconds in self.ordered_stages().items()
+        ]
+        lines.append(f"{'total':<10} {self.total * 1000:10.2f} ms")
+        if self.node_count is not None:
+            lines.append(f"nodes: {self.node_count}, edges: {self.edge_count}")
+        lines.append(f"output: {self.bytes_out} bytes")
+        if self.cache_hit:
+            lines.append("served from cache")
+        return "\n".join(lines)
+
+
+def timed(stats: Optional[ConversionStats], name: str) -> ContextManager:
+    """Return a context manager timing a stage if statistics are collected.
+
+    Args:
+        stats: Statistics to add the stage to, or None
+        name: Name of the stage
+
+    Returns:
+        A context manager timing the stage, or a shared no-op one
+    """
+    if stats is None:
+        return _NO_STAGE
+    return stats.stage(name)
@@ -0,0 +1,331 @@
+"""Array-backed storage for large diagrams.
+
+A DiagramStore keeps the elements of a diagram in columns instead of one
+object per element: integer node ids, type codes, coordinates and sizes live
+in compact `array` columns, and only labels are kept as Python strings. The
+columns support the buffer protocol, so they can be wrapped without copying,
+for example with numpy.frombuffer.
+
+The store hands out NodeView and EdgeView objects, thin views that offer the
+attributes of models.Node and models.Edge and read and write the columns.
+Processors only access these attributes, so layout_diagram and the Draw.io
+export work on the store directly.
+"""
+
+from array import array
+from collections.abc import Sequence
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from plantuml2drawio.models import Edge, Node
+
+
+class NodeView:
+    """View of one node of a DiagramStore with the attributes of a Node."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "DiagramStore", index: int):
+        """Initialize the view.
+
+        Args:
+            store: Store holding the node
+            index: Position of the node in the store
+        """
+        self._store = store
+        self._index = index
+
+    @property
+    def id(self) -> str:
+        """Unique identifier of the node."""
+        return str(self._store.node_ids[self._index])
+
+    @property
+    def label(self) -> str:
+        """Text label of the node."""
+        return self._store.labels[self._index]
+
+    @label.setter
+    def label(self, value: str) -> None:
+        self._store.labels[self._index] = value
+
+    @property
+    def type(self) -> str:
+        """Type of the node specific to the diagram type."""
+        return self._store.type_names[self._store.type_codes[self._index]]
+
+    @type.setter
+    def type(self, value: str) -> None:
+        self._store.type_codes[self._index] = self._store.type_code(value)
+
+    @property
+    def x(self) -> float:
+        """X-coordinate position."""
+        return self._store.xs[self._index]
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self._store.xs[self._index] = value
+
+    @property
+    def y(self) -> float:
+        """Y-coordinate position."""
+        return self._store.ys[self._index]
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self._store.ys[self._index] = value
+
+    @property
+    def width(self) -> float:
+        """Width of the node."""
+        return self._store.widths[self._index]
+
+    @width.setter
+    def width(self, value: float) -> None:
+        self._store.widths[self._index] = value
+
+    @property
+    def height(self) -> float:
+        """Height of the node."""
+        return self._store.heights[self._index]
+
+    @height.setter
+    def height(self, value: float) -> None:
+        self._store.heights[self._index] = value
+
+
+class EdgeView:
+    """View of one edge of a DiagramStore with the attributes of an Edge."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "DiagramStore", index: int):
+        """Initialize the view.
+
+        Args:
+            store: Store holding the edge
+            index: Position of the edge in the store
+        """
+        self._store = store
+        self._index = index
+
+    @property
+    def source(self) -> str:
+        """ID of the source node."""
+        store = self._store
+        return str(store.node_ids[store.sources[self._index]])
+
+    @property
+    def target(self) -> str:
+        """ID of the target node."""
+        store = self._store
+        return str(store.node_ids[store.targets[self._index]])
+
+    @property
+    def label(self) -> str:
+        """Label of the edge."""
+        return self._store.edge_labels[self._index]
+
+    @property
+    def id(self) -> str:
+        """Unique identifier, derived from source and target."""
+        return f"{self.source}_{self.target}"
+
+
+class _Views(Sequence):
+    """Read-only sequence creating views on demand.
+
+    DiagramStore.nodes and DiagramStore.edges are _Views, so code written for
+    lists of Node and Edge objects can index and iterate them, while a view
+    object only exists as long as it is used.
+    """
+
+    def __init__(
+        self, store: "DiagramStore", view_class: type, count: Callable[[], int]
+    ):
+        """Initialize the sequence.
+
+        Args:
+            store: Store the views read from
+            view_class: NodeView or EdgeView
+            count: Function returning the current number of elements
+        """
+        self._store = store
+        self._view_class = view_class
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("view index out of range")
+        return self._view_class(self._store, index)
+
+    def __iter__(self) -> Iterator:
+        view_class = self._view_class
+        store = self._store
+        for index in range(len(self)):
+            yield view_class(store, index)
+
+
+class DiagramStore:
+    """Column-oriented storage of the nodes and edges of a diagram.
+
+    Attributes:
+        node_ids: Integer id of each node.
+        type_codes: Index into type_names of each node's type.
+        type_names: Names of the node types used in the store.
+        labels: Label of each node.
+        xs, ys, widths, heights: Geometry of each node.
+        sources, targets: Positions of the source and target node of each edge.
+        edge_labels: Label of each edge.
+        nodes: Sequence of NodeView objects, one per node.
+        edges: Sequence of EdgeView objects, one per edge.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self.node_ids = array("q")
+        self.type_codes = array("B")
+        self.type_names: List[str] = []
+        self.labels: List[str] = []
+        self.xs = array("d")
+        self.ys = array("d")
+        self.widths = array("d")
+        self.heights = array("d")
+        self.sources = array("l")
+        self.targets = array("l")
+        self.edge_labels: List[str] = []
+        self._index_of = {}
+        self.nodes = _Views(self, NodeView, lambda: len(self.node_ids))
+        self.edges = _Views(self, EdgeView, lambda: len(self.sources))
+
+    def type_code(self, node_type: str) -> int:
+        """Return the code of a node type, registering it if it is new.
+
+        Args:
+            node_type: Name of the node type
+
+        Returns:
+            Code of the node type
+
+        Raises:
+            ValueError: If the store already holds 256 different types
+        """
+        try:
+            return self.type_names.index(node_type)
+        except ValueError:
+            if len(self.type_names) > 255:
+                raise ValueError("Too many node types for a DiagramStore")
+            self.type_names.append(node_type)
+            return len(self.type_names) - 1
+
+    def add_node(
+        self,
+        node_id: Union[int, str],
+        label: str,
+        node_type: str,
+        x: float = 0,
+        y: float = 0,
+        width: float = 120,
+        height: float = 60,
+    ) -> int:
+        """Append a node.
+
+        Args:
+            node_id: Integer id of the node, also accepted as a decimal string
+            label: Text label of the node
+            node_type: Type of the node specific to the diagram type
+            x: X-coordinate position
+            y: Y-coordinate position
+            width: Width of the node
+            height: Height of the node
+
+        Returns:
+            Position of the node in the store
+
+        Raises:
+            ValueError: If the id is not an integer or already used
+        """
+        node_id = int(node_id)
+        if node_id in self._index_of:
+            raise ValueError(f"Duplicate node id: {node_id}")
+
+        index = len(self.node_ids)
+        self._index_of[node_id] = index
+        self.node_ids.append(node_id)
+        self.type_codes.append(self.type_code(node_type))
+        self.labels.append(label)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.widths.append(width)
+        self.heights.append(height)
+        return index
+
+    def add_edge(
+        self, source: Union[int, str], target: Union[int, str], label: str = ""
+    ) -> int:
+        """Append an edge between two nodes already in the store.
+
+        Args:
+            source: Id of the source node
+            target: Id of the target node
+            label: Optional label for the edge
+
+        Returns:
+            Position of the edge in the store
+
+        Raises:
+            KeyError: If source or target is not a node of the store
+        """
+        index = len(self.sources)
+        self.sources.append(self._index_of[int(source)])
+        self.targets.append(self._index_of[int(target)])
+        self.edge_labels.append(label or "")
+        return index
+
+    @classmethod
+    def from_graph(
+        cls, nodes: Iterable[Node], edges: Optional[Iterable[Edge]] = None
+    ) -> "DiagramStore":
+        """Create a store from Node and Edge objects.
+
+        Args:
+            nodes: Nodes with integer ids
+            edges: Edges between the nodes
+
+        Returns:
+            DiagramStore holding the diagram
+        """
+        store = cls()
+        for node in nodes:
+            store.add_node(
+                node.id,
+                node.label,
+                node.type,
+                node.x,
+                node.y,
+                node.width,
+                node.height,
+            )
+        for edge in edges or ():
+            store.add_edge(edge.source, edge.target, edge.label)
+        return store
+
+    def to_graph(self) -> Tuple[List[Node], List[Edge]]:
+        """Copy the diagram into Node and Edge objects.
+
+        Returns:
+            A tuple of the nodes and the edges
+        """
+        nodes = [
+            Node(v.id, v.label, v.type, v.x, v.y, v.width, v.height)
+            for v in self.nodes
+        ]
+        edges = [Edge(view.source, view.target, view.label) for view in self.edges]
+        return nodes, edges
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the activity diagram lexer and parser.
+"""
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.processors.activity_parser import (
+    IfBlock, build_activity_graph, parse_activity_ast, tokenize)
+
+
+class TestActivityParser(unittest.TestCase):
+    """Test class for the activity diagram lexer and parser."""
+
+    def test_tokens_carry_source_offsets(self):
+        """Test that every token points back into the source."""
+        content = "@startuml\nstart\n:Step 1;\nif (ok?) then (yes)\n  :Step\n  2;\nendif\n"
+        tokens = list(tokenize(content))
+
+        self.assertEqual(
+            [token.kind for token in tokens],
+            ["start", "activity", "if", "activity", "endif"],
+        )
+        for token in tokens:
+            expected = {"start": "start", "if": "if", "endif": "endif"}.get(
+                token.kind, ":"
+            )
+            self.assertTrue(content.startswith(expected, token.offset))
+
+        self.assertEqual(tokens[3].text, "Step\n2")
+        self.assertEqual(tokens[3].line, 5)
+
+    def test_multiline_condition(self):
+        """Test that an if condition may span several lines."""
+        content = "if (first line\nsecond line) then (yes)\n:A;\nendif\n"
+        (block,) = parse_activity_ast(content)
+        self.assertIsInstance(block, IfBlock)
+        self.assertEqual(block.condition, "first line second line")
+        self.assertEqual(block.then_label, "yes")
+
+    def test_nested_if_blocks(self):
+        """Test that nested if blocks keep their own decision and merge nodes."""
+        content = """
+        start
+        if (outer?) then (yes)
+            :A;
+            if (inner?) then (yes)
+                :B;
+            else (no)
+                :C;
+            endif
+        else (no)
+            :D;
+        endif
+        stop
+        """
+        nodes, edges = build_activity_graph(parse_activity_ast(content))
+        by_label = {node.label: node.id for node in nodes if node.label}
+        merges = [node.id for node in nodes if node.type == "merge"]
+        edge_set = {(edge.source, edge.target, edge.label) for edge in edges}
+
+        self.assertEqual(len(merges), 2)
+        inner_merge, outer_merge = merges
+        self.assertIn((by_label["A"], by_label["inner?"], ""), edge_set)
+        self.assertIn((by_label["inner?"], by_label["B"], "yes"), edge_set)
+        self.assertIn((by_label["inner?"], by_label["C"], "no"), edge_set)
+        self.assertIn((by_label["B"], inner_merge, ""), edge_set)
+        self.assertIn((by_label["C"], inner_merge, ""), edge_set)
+        self.assertIn((inner_merge, outer_merge, ""), edge_set)
+        self.assertIn((by_label["D"], outer_merge, ""), edge_set)
+        self.assertIn((outer_merge, by_label["Stop"], ""), edge_set)
+
+    def test_elseif_chain(self):
+        """Test that elseif branches become nested decisions."""
+        content = """
+        if (a?) then (1)
+            :A;
+        elseif (b?) then (2)
+            :B;
+        else (3)
+            :C;
+        endif
+        """
+        (block,) = parse_activity_ast(content)
+        self.assertEqual(block.condition, "a?")
+        (nested,) = block.else_body
+        self.assertEqual(nested.condition, "b?")
+        self.assertEqual(nested.then_label, "2")
+        self.assertEqual(nested.else_label, "3")
+
+    def test_unterminated_if(self):
+        """Test that a missing endif does not lose the branch contents."""
+        nodes, _ = build_activity_graph(
+            parse_activity_ast("start\nif (a?) then (yes)\n:A;\nstop\n")
+        )
+        self.assertIn("A", [node.label for node in nodes])
+
+
+if __name__ == "__main__":
+    unittest.main()
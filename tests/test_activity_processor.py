@@ -153,6 +153,72 @@ class TestActivityDiagramProcessor(unittest.TestCase):
                 break
         self.assertTrue(has_updated_positions)
 
+    def test_layout_long_chain(self):
+        """Test that layout handles chains longer than the recursion limit."""
+        steps = sys.getrecursionlimit() * 3
+        diagram = (
+            "@startuml\nstart\n"
+            + "\n".join(f":Step {i};" for i in range(steps))
+            + "\nstop\n@enduml"
+        )
+        nodes, edges = self.processor.parse_diagram(diagram)
+        self.processor.layout_diagram(nodes, edges)
+
+        # Every node in the chain is placed below its predecessor
+        node_map = {node.id: node for node in nodes}
+        for edge in edges:
+            self.assertGreater(node_map[edge.target].y, node_map[edge.source].y)
+
+    def test_layout_disconnected_components(self):
+        """Test that disconnected components are placed side by side."""
+        nodes, edges = self.processor.parse_diagram(self.basic_diagram)
+        nodes.append(Node("orphan1", "Orphan 1", "activity"))
+        nodes.append(Node("orphan2", "Orphan 2", "activity"))
+        nodes.append(Node("orphan3", "Orphan 3", "activity"))
+        edges.append(Edge("orphan2", "orphan3"))
+        self.processor.layout_diagram(nodes, edges)
+
+        node_map = {node.id: node for node in nodes}
+        main = [node for node in nodes if not node.id.startswith("orphan")]
+        main_right = max(node.x + node.width for node in main)
+
+        # Each component starts at the top, to the right of the previous one
+        orphan1, orphan2, orphan3 = (node_map[f"orphan{i}"] for i in (1, 2, 3))
+        self.assertGreater(orphan1.x, main_right)
+        self.assertGreater(orphan2.x, orphan1.x + orphan1.width)
+        self.assertEqual(orphan1.y, orphan2.y)
+        self.assertEqual(orphan1.y, min(node.y for node in main))
+        self.assertGreater(orphan3.y, orphan2.y)
+
+        # The stop node stays below everything else
+        stop = next(node for node in nodes if node.label.lower() == "stop")
+        self.assertLess(max(node.y for node in nodes if node is not stop), stop.y)
+
+    def test_layout_nested_conditions(self):
+        """Test that nested if blocks are laid out top to bottom."""
+        nodes, edges = self.processor.parse_diagram(
+            self._read_test_file("activity3.puml")
+        )
+        self.processor.layout_diagram(nodes, edges)
+        node_map = {node.id: node for node in nodes}
+
+        # Every edge points downwards, so children are below their decision
+        for edge in edges:
+            source, target = node_map[edge.source], node_map[edge.target]
+            self.assertGreater(target.y, source.y, f"{edge.source} -> {edge.target}")
+
+        # Each merge is below the bottom of every branch leading into it
+        merges = [node for node in nodes if node.type == "merge"]
+        self.assertEqual(len(merges), 3)
+        for merge in merges:
+            for edge in edges:
+                if edge.target == merge.id:
+                    source = node_map[edge.source]
+                    self.assertGreater(merge.y, source.y + source.height)
+
+        # Nested else branches do not leave the canvas on the left
+        self.assertGreaterEqual(min(node.x for node in nodes), 0)
+
     def test_export_to_drawio(self):
         """Test export to Draw.io XML format."""
         nodes, edges = self.processor.parse_diagram(self.basic_diagram)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio layer of the library API.
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio import aio
+from src.plantuml2drawio.core import convert_content
+
+VALID = "@startuml\nstart\n:Step;\nstop\n@enduml\n"
+
+
+class SlowConversion:
+    """Replacement of api.convert that sleeps and tracks its concurrency."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, content, output_json=False, cache_dir=None, key=None):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        return aio.api.ConversionResult(key, content, "text", None, self.seconds)
+
+
+class TestAsyncConversion(unittest.IsolatedAsyncioTestCase):
+    """Test class for converting without blocking the event loop."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    async def test_convert_does_not_block_the_loop(self):
+        """Test that other tasks run while a diagram is converted."""
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        result = await aio.convert(VALID, key="a")
+        ticks_during_conversion = ticks
+        ticker.cancel()
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.key, "a")
+        self.assertEqual(result.output, convert_content(VALID)[0])
+        self.assertGreater(ticks_during_conversion, 0)
+
+    async def test_timeout(self):
+        """Test that a slow conversion gives a timeout error."""
+        with mock.patch.object(aio.api, "convert", SlowConversion(0.5)):
+            result = await aio.convert(VALID, key="slow", timeout=0.05)
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.error, aio.ConversionTimeoutError)
+
+    async def test_cancellation(self):
+        """Test that cancelling the caller cancels the conversion."""
+        with mock.patch.object(aio.api, "convert", SlowConversion(0.2)):
+            task = asyncio.ensure_future(aio.convert(VALID))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+    async def test_convert_many_limits_concurrency(self):
+        """Test that at most max_concurrency conversions run at a time."""
+        slow = SlowConversion(0.02)
+
+        async def items():
+            for index in range(8):
+                yield index, VALID
+
+        with mock.patch.object(aio.api, "convert", slow):
+            results = [
+                result
+                async for result in aio.convert_many(
+                    items(), max_concurrency=2, ordered=True
+                )
+            ]
+        self.assertEqual([result.key for result in results], list(range(8)))
+        self.assertLessEqual(slow.peak, 2)
+        self.assertGreater(slow.peak, 0)
+
+    async def test_shared_semaphore(self):
+        """Test that a shared semaphore limits separate calls together."""
+        slow = SlowConversion(0.02)
+        semaphore = asyncio.Semaphore(1)
+        with mock.patch.object(aio.api, "convert", slow):
+            await asyncio.gather(
+                *(aio.convert(VALID, semaphore=semaphore) for _ in range(4))
+            )
+        self.assertEqual(slow.peak, 1)
+
+    async def test_convert_file(self):
+        """Test that files are read and written asynchronously."""
+        input_path = os.path.join(self.temp_dir, "diagram.puml")
+        output_path = os.path.join(self.temp_dir, "diagram.drawio")
+        await aio.write_file(VALID, input_path)
+
+        result = await aio.convert_file(input_path, output_path)
+        self.assertTrue(result.ok)
+        self.assertEqual(await aio.read_file(output_path), result.output)
+
+        missing = await aio.convert_file(os.path.join(self.temp_dir, "missing"))
+        self.assertFalse(missing.ok)
+        self.assertIn("Error reading input file", str(missing.error))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming library API.
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.api import ConversionError, convert, convert_many
+from src.plantuml2drawio.core import convert_content
+
+VALID = "@startuml\nstart\n:Step;\nstop\n@enduml\n"
+INVALID = "This is not a PlantUML file."
+
+
+class CountingSource:
+    """Iterable of (key, content) pairs that counts the items taken."""
+
+    def __init__(self, count: int):
+        self.count = count
+        self.taken = 0
+
+    def __iter__(self):
+        for index in range(self.count):
+            self.taken += 1
+            yield index, VALID if index % 3 else INVALID
+
+
+class TestConvert(unittest.TestCase):
+    """Test class for converting a single diagram."""
+
+    def test_result_instead_of_printing(self):
+        """Test that results carry output, timings and errors silently."""
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            success = convert(VALID, key="a")
+            failure = convert(INVALID, key="b")
+        self.assertEqual(printed.getvalue(), "")
+
+        self.assertTrue(success.ok)
+        self.assertEqual(success.key, "a")
+        self.assertEqual(success.output, convert_content(VALID)[0])
+        self.assertEqual(success.output_format, "Draw.io XML")
+        self.assertIn("parse", success.stats.stages)
+        self.assertGreater(success.seconds, 0)
+
+        self.assertFalse(failure.ok)
+        self.assertIsNone(failure.output)
+        self.assertIsInstance(failure.error, ConversionError)
+        self.assertIn("Unsupported diagram type", str(failure.error))
+
+
+class TestConvertMany(unittest.TestCase):
+    """Test class for converting streams of diagrams."""
+
+    def test_sequential_is_lazy(self):
+        """Test that items are only taken when results are requested."""
+        source = CountingSource(10)
+        results = convert_many(source)
+        self.assertEqual(source.taken, 0)
+        first = next(results)
+        self.assertEqual(source.taken, 1)
+        self.assertFalse(first.ok)
+        self.assertEqual([result.key for result in results], list(range(1, 10)))
+
+    def test_backpressure(self):
+        """Test that a pool never runs ahead of the consumer."""
+        source = CountingSource(20)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = convert_many(source, executor=pool, max_pending=3)
+            next(results)
+            self.assertLessEqual(source.taken, 3)
+            results.close()
+        self.assertLessEqual(source.taken, 3)
+
+    def test_pools_give_the_same_results(self):
+        """Test that thread and process pools match sequential conversion."""
+        expected = {
+            result.key: result.output for result in convert_many(CountingSource(9))
+        }
+        for executor in ("thread", "process"):
+            results = list(
+                convert_many(CountingSource(9), executor=executor, max_workers=2)
+            )
+            self.assertEqual(
+                {result.key: result.output for result in results}, expected
+            )
+
+        ordered = convert_many(
+            CountingSource(9), executor="thread", max_workers=3, ordered=True
+        )
+        self.assertEqual([result.key for result in ordered], list(range(9)))
+
+    def test_unknown_executor(self):
+        """Test that only known executor names are accepted."""
+        with self.assertRaises(ValueError):
+            next(convert_many([("a", VALID)], executor="fibers"))
+
+
+if __name__ == "__main__":
+    unittest.main()
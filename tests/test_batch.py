@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch directory conversion.
+"""
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.batch import (convert_directory, find_input_files,
+                                       get_batch_output_path)
+
+
+class TestBatchConversion(unittest.TestCase):
+    """Test class for converting whole directory trees."""
+
+    def setUp(self):
+        """Create an input tree with valid and invalid diagrams."""
+        self.test_data_dir = os.path.join(os.path.dirname(__file__), "data")
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "in")
+        self.output_dir = os.path.join(self.temp_dir, "out")
+        os.makedirs(os.path.join(self.input_dir, "nested"))
+
+        shutil.copy(
+            os.path.join(self.test_data_dir, "activity1.puml"),
+            os.path.join(self.input_dir, "first.puml"),
+        )
+        shutil.copy(
+            os.path.join(self.test_data_dir, "activity2.puml"),
+            os.path.join(self.input_dir, "nested", "second.puml"),
+        )
+        with open(
+            os.path.join(self.input_dir, "nested", "broken.puml"),
+            "w",
+            encoding="utf-8",
+        ) as f:
+            f.write("This is not a PlantUML file.")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_find_input_files(self):
+        """Test that files are found recursively and in a stable order."""
+        files = find_input_files(self.input_dir)
+        self.assertEqual(
+            [os.path.relpath(path, self.input_dir) for path in files],
+            [
+                "first.puml",
+                os.path.join("nested", "broken.puml"),
+                os.path.join("nested", "second.puml"),
+            ],
+        )
+
+    def test_output_path_mirrors_layout(self):
+        """Test that output paths mirror the input directory layout."""
+        input_file = os.path.join(self.input_dir, "nested", "second.puml")
+        self.assertEqual(
+            get_batch_output_path(input_file, self.input_dir, self.output_dir, False),
+            os.path.join(self.output_dir, "nested", "second.drawio"),
+        )
+        self.assertEqual(
+            get_batch_output_path(input_file, self.input_dir, None, True),
+            os.path.join(self.input_dir, "nested", "second.json"),
+        )
+
+    def _check_results(self, results):
+        """Check that failures are reported without aborting the batch."""
+        self.assertEqual(len(results), 3)
+        status = {os.path.basename(r.input_path): r.ok for r in results}
+        self.assertEqual(
+            status, {"first.puml": True, "second.puml": True, "broken.puml": False}
+        )
+
+        failed = [r for r in results if not r.ok][0]
+        self.assertIn("not_plantuml", failed.message)
+
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, "first.drawio")))
+        self.assertTrue(
+            os.path.exists(os.path.join(self.output_dir, "nested", "second.drawio"))
+        )
+
+    def test_convert_directory_in_process(self):
+        """Test batch conversion without a process pool."""
+        results = convert_directory(self.input_dir, self.output_dir, jobs=1)
+        self._check_results(results)
+
+    def test_convert_directory_with_pool(self):
+        """Test batch conversion with multiple worker processes."""
+        results = convert_directory(self.input_dir, self.output_dir, jobs=2)
+        self._check_results(results)
+
+    def test_convert_directory_with_diagnostics(self):
+        """Test that profiles are merged and memory is reported per file."""
+        profile = os.path.join(self.temp_dir, "batch.prof")
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                results = convert_directory(
+                    self.input_dir,
+                    self.output_dir,
+                    jobs=jobs,
+                    profile=profile,
+                    memory_report=True,
+                )
+                self._check_results(results)
+
+                # Every file, including the broken one, is in the merged profile
+                calls = {
+                    function: primitive_calls
+                    for (_, _, function), (primitive_calls, *_) in pstats.Stats(
+                        profile
+                    ).stats.items()
+                }
+                self.assertEqual(calls["process_diagram"], 3)
+
+                by_path = {result.input_path: result for result in results}
+                first = by_path[os.path.join(self.input_dir, "first.puml")]
+                self.assertGreater(first.memory["peak"], 0)
+                self.assertIn("layout", first.memory["stages"])
+                os.remove(profile)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark diagram generator, timing helpers and regression gate.
+"""
+import json
+import os
+import sys
+import unittest
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.detection import (benchmark_detection, per_processor_keywords,
+                                  shared_keywords)
+from benchmarks.gate import (DEFAULT_BASELINE, Regression, compare,
+                             format_report, gate_cases, measure_round)
+from benchmarks.generator import SHAPES, generate_content, generate_graph
+from benchmarks.run import benchmark_shape
+from benchmarks.timing import fit_exponent, measure
+
+
+class TestBenchmarkGenerator(unittest.TestCase):
+    """Test class for the synthetic diagram generator."""
+
+    def test_shapes_have_requested_size(self):
+        """Test that every shape produces about the requested node count."""
+        for shape in SHAPES:
+            for size in (10, 1000):
+                with self.subTest(shape=shape, size=size):
+                    nodes, edges = generate_graph(shape, size)
+                    self.assertLessEqual(abs(len(nodes) - size), 3)
+                    self.assertTrue(edges)
+
+    def test_disconnected_shape_has_no_content(self):
+        """Test that only the disconnected shape is generated as a graph only."""
+        self.assertIsNone(generate_content("disconnected", 100))
+        self.assertIn("elseif", generate_content("fanout", 100))
+        with self.assertRaises(ValueError):
+            generate_content("unknown", 100)
+
+    def test_benchmark_shape(self):
+        """Test that every stage is measured at every size."""
+        results = benchmark_shape("chain", [10, 20], min_time=0)
+        self.assertEqual(set(results), {"parse", "layout", "export", "process"})
+        for stage in results.values():
+            self.assertEqual([point["size"] for point in stage["points"]], [10, 20])
+
+
+class TestBenchmarkTiming(unittest.TestCase):
+    """Test class for the timing helpers."""
+
+    def test_fit_exponent(self):
+        """Test that linear and quadratic growth are told apart."""
+        sizes = [100, 1000, 10000]
+        linear = fit_exponent([(n, n * 1e-6) for n in sizes])
+        quadratic = fit_exponent([(n, n * n * 1e-9) for n in sizes])
+        self.assertAlmostEqual(linear, 1.0)
+        self.assertAlmostEqual(quadratic, 2.0)
+
+    def test_fit_exponent_ignores_noise(self):
+        """Test that too fast measurements are not fitted."""
+        self.assertIsNone(fit_exponent([(10, 1e-7), (100, 1e-6), (1000, 1e-3)]))
+
+    def test_measure_adapts_repeats(self):
+        """Test that fast functions are repeated up to the limit."""
+        self.assertEqual(len(measure(lambda: None, min_time=1, max_repeat=50)), 50)
+        self.assertEqual(len(measure(lambda: None, min_time=0, min_repeat=4)), 4)
+
+
+class TestDetectionBenchmark(unittest.TestCase):
+    """Test class for the detection benchmark."""
+
+    def test_shared_scan_matches_per_processor_scan(self):
+        """Test that both keyword paths find the same keywords."""
+        for shape in ("chain", "nested", "fanout"):
+            with self.subTest(shape=shape):
+                content = generate_content(shape, 100)
+                self.assertEqual(
+                    shared_keywords(content), per_processor_keywords(content)
+                )
+
+    def test_benchmark_detection(self):
+        """Test that every path is timed."""
+        times = benchmark_detection(generate_content("chain", 100), min_time=0)
+        self.assertEqual(set(times), {"per_processor", "shared", "detect"})
+
+
+class TestBenchmarkGate(unittest.TestCase):
+    """Test class for the benchmark regression gate."""
+
+    def _document(self, calibration, layout, export):
+        """Create a gate document with one case."""
+        return {
+            "calibration": calibration,
+            "cases": {"synthetic/chain-1000": {"layout": layout, "export": export}},
+        }
+
+    def test_compare_detects_regression(self):
+        """Test that only stages slower than the tolerance are reported."""
+        baseline = self._document(0.001, 0.010, 0.010)
+        current = self._document(0.001, 0.020, 0.011)
+        regressions = compare(baseline, current, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0].stage, "layout")
+        self.assertAlmostEqual(regressions[0].change, 1.0)
+
+    def test_compare_normalizes_by_calibration(self):
+        """Test that a uniformly slower machine is not a regression."""
+        baseline = self._document(0.001, 0.010, 0.010)
+        current = self._document(0.002, 0.020, 0.020)
+        self.assertEqual(compare(baseline, current, tolerance=0.25), [])
+
+    def test_compare_ignores_noise_and_unknown_cases(self):
+        """Test that tiny slowdowns and cases without baseline are skipped."""
+        baseline = self._document(0.001, 0.00001, 0.010)
+        current = self._document(0.001, 0.00003, 0.010)
+        current["cases"]["synthetic/new-1000"] = {"layout": 1.0}
+        self.assertEqual(compare(baseline, current, tolerance=0.25), [])
+
+    def test_format_report(self):
+        """Test that the report lists each regressed stage."""
+        report = format_report(
+            [Regression("corpus/activity1.puml", "parse", 0.001, 0.002)], 0.5
+        )
+        self.assertIn("1 stage(s) regressed by more than 50%", report)
+        self.assertIn("corpus/activity1.puml", report)
+        self.assertIn("+100%", report)
+        self.assertEqual(format_report([], 0.5), "No stage regressed by more than 50%.")
+
+    def test_measure_round_selection(self):
+        """Test that a round measures only the selected cases and stages."""
+        measured = measure_round(0, {"synthetic/chain-1000": ["layout"]})
+        self.assertEqual(list(measured), ["synthetic/chain-1000"])
+        self.assertEqual(list(measured["synthetic/chain-1000"]["stages"]), ["layout"])
+        self.assertGreater(measured["synthetic/chain-1000"]["calibration"], 0)
+
+    def test_baseline_covers_all_cases(self):
+        """Test that the committed baseline has every case of the gate."""
+        with open(DEFAULT_BASELINE, encoding="utf-8") as f:
+            baseline = json.load(f)
+        self.assertEqual(
+            sorted(baseline["cases"]), sorted(name for name, _, _ in gate_cases())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Tests for files with several @startuml ... @enduml blocks.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio import blocks as blocks_module
+from src.plantuml2drawio.batch import convert_directory
+from src.plantuml2drawio.blocks import (BlockReader, convert_blocks,
+                                        find_diagram_blocks,
+                                        get_block_output_path,
+                                        iter_diagram_blocks_bytes,
+                                        open_large_file, write_block_stream,
+                                        write_blocks)
+from src.plantuml2drawio.core import convert_content
+from src.plantuml2drawio.stats import ConversionStats
+
+FIRST = "@startuml first\nstart\n:A;\nstop\n@enduml"
+SECOND = "  @startuml(id=second)\nstart\n:B & C;\n:D;\nstop\n@enduml"
+UNSUPPORTED = "@startuml\nclass Foo\n@enduml"
+
+
+class TestDiagramBlocks(unittest.TestCase):
+    """Test class for splitting and converting multi-diagram files."""
+
+    def setUp(self):
+        """Create a file with two activity diagrams and one class diagram."""
+        self.content = (
+            f"' Mentions of @startuml in comments are ignored\n{FIRST}\n\n"
+            f"Text between the diagrams\n{SECOND}\n{UNSUPPORTED}\n"
+        )
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.temp_dir, "diagrams.drawio")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_find_diagram_blocks(self):
+        """Test that blocks are found by offset with their names."""
+        blocks = find_diagram_blocks(self.content)
+        self.assertEqual(
+            [block.name for block in blocks], ["first", "second", "Diagram 3"]
+        )
+        self.assertEqual(
+            [block.text(self.content) for block in blocks],
+            [FIRST, SECOND, UNSUPPORTED],
+        )
+
+    def test_unterminated_blocks_are_dropped(self):
+        """Test that a @startuml without @enduml starts no block."""
+        content = f"@startuml broken\nstart\n{FIRST}\n@startuml\nstart\n"
+        blocks = find_diagram_blocks(content)
+        self.assertEqual([block.text(content) for block in blocks], [FIRST])
+        self.assertEqual(find_diagram_blocks("no diagram"), [])
+
+    def test_bytes_blocks_match_text_blocks(self):
+        """Test that raw bytes are split like text, offsets counted in bytes."""
+        content = "\ufeff@startuml Größe\nstart\n:Ä;\nstop\n@enduml\n" + self.content
+        data = content.encode("utf-8")
+        text_blocks = find_diagram_blocks(content)
+        bytes_blocks = list(iter_diagram_blocks_bytes(data))
+        self.assertEqual(
+            [block.name for block in bytes_blocks],
+            [block.name for block in text_blocks],
+        )
+        self.assertEqual(
+            [data[block.start : block.end].decode("utf-8") for block in bytes_blocks],
+            [block.text(content) for block in text_blocks],
+        )
+
+    def test_get_block_output_path(self):
+        """Test that block numbers are appended zero-padded."""
+        self.assertEqual(get_block_output_path("out/a.json", 3, 12), "out/a-03.json")
+        self.assertEqual(get_block_output_path("a.drawio", 1, 2), "a-1.drawio")
+
+    def test_write_pages(self):
+        """Test that converted blocks become pages of one document."""
+        blocks = find_diagram_blocks(self.content)
+        written, ok = write_blocks(self.content, blocks, self.output_path)
+        self.assertFalse(ok)
+        self.assertEqual(written, [self.output_path])
+
+        root = ET.parse(self.output_path).getroot()
+        self.assertEqual(root.tag, "mxfile")
+        pages = root.findall("diagram")
+        self.assertEqual([page.get("name") for page in pages], ["first", "second"])
+        self.assertEqual(
+            [page.get("id") for page in pages], ["diagram-1", "diagram-2"]
+        )
+        labels = [cell.get("value") for cell in pages[1].iter("mxCell")]
+        self.assertIn("B & C", labels)
+
+    def test_pages_match_single_documents(self):
+        """Test that a page holds the same cells as the diagram on its own."""
+        results = convert_blocks(FIRST, find_diagram_blocks(FIRST), as_pages=True)
+        single, _ = convert_content(FIRST)
+        page = results[0].output
+        self.assertIn(page[page.index("<mxGraphModel") :], single)
+
+    def test_write_files(self):
+        """Test that JSON output is written as one file per block."""
+        blocks = find_diagram_blocks(self.content)
+        output_path = os.path.join(self.temp_dir, "diagrams.json")
+        written, ok = write_blocks(self.content, blocks, output_path, True)
+        self.assertFalse(ok)
+        self.assertEqual(
+            [os.path.basename(path) for path in written],
+            ["diagrams-1.json", "diagrams-2.json"],
+        )
+        with open(written[1], "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["nodes"]), 4)
+
+        with self.assertRaises(ValueError):
+            write_blocks(self.content, blocks, output_path, True, "pages")
+
+    def test_parallel_conversion(self):
+        """Test that worker processes give the same results in block order."""
+        blocks = find_diagram_blocks(self.content)
+        sequential = convert_blocks(self.content, blocks, as_pages=True)
+        parallel = convert_blocks(self.content, blocks, as_pages=True, jobs=2)
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(parallel[2].error, "Unsupported diagram type: unknown")
+
+    def test_stats_add_up(self):
+        """Test that statistics sum the nodes of all blocks."""
+        content = f"{FIRST}\n{SECOND}\n"
+        stats = ConversionStats()
+        results = convert_blocks(
+            content, find_diagram_blocks(content), as_pages=True, jobs=2, stats=stats
+        )
+        self.assertTrue(all(result.output for result in results))
+        self.assertEqual(stats.node_count, 7)
+        self.assertIn("parse", stats.stages)
+
+    def test_batch_converts_blocks(self):
+        """Test that batch mode splits multi-diagram files as well."""
+        input_dir = os.path.join(self.temp_dir, "in")
+        os.makedirs(input_dir)
+        with open(os.path.join(input_dir, "two.puml"), "w", encoding="utf-8") as f:
+            f.write(f"{FIRST}\n{SECOND}\n")
+
+        results = convert_directory(input_dir, jobs=1)
+        self.assertTrue(results[0].ok, results[0].message)
+        root = ET.parse(os.path.join(input_dir, "two.drawio")).getroot()
+        self.assertEqual(len(root.findall("diagram")), 2)
+
+
+class TestBlockReader(unittest.TestCase):
+    """Test class for reading blocks through a memory map."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, data):
+        """Write raw bytes to a file in the temporary directory."""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_blocks_match_text_scan(self):
+        """Test that the byte scan finds the blocks of the text scan."""
+        content = (
+            "\ufeff@startuml Ablauf \u00e4\nstart\n:\u00dc;\nstop\n@enduml\r\n"
+            f"{SECOND}\n"
+        )
+        path = self.write("blocks.puml", content.encode("utf-8"))
+        with BlockReader(path) as reader:
+            items = list(reader.iter_blocks())
+            self.assertEqual(reader.count_blocks(), 2)
+        expected = find_diagram_blocks(content)
+        self.assertEqual(
+            [block.name for block, _ in items], ["Ablauf \u00e4", "second"]
+        )
+        self.assertEqual(
+            [text for _, text in items], [block.text(content) for block in expected]
+        )
+
+    def test_invalid_block_fails_alone(self):
+        """Test that a block that is not UTF-8 only fails by itself."""
+        data = f"{FIRST}\n".encode("utf-8") + b"@startuml\n:\xff;\n@enduml\n"
+        path = self.write("invalid.puml", data)
+        output_path = os.path.join(self.temp_dir, "invalid.drawio")
+        with open_large_file(path, min_bytes=0) as reader:
+            written, ok = write_block_stream(reader.iter_blocks(), 2, output_path)
+        self.assertFalse(ok)
+        self.assertEqual(written, [output_path])
+        root = ET.parse(output_path).getroot()
+        self.assertEqual(len(root.findall("diagram")), 1)
+
+    def test_open_large_file(self):
+        """Test that only large files with several diagrams are mapped."""
+        single = self.write("single.puml", FIRST.encode("utf-8"))
+        double = self.write("double.puml", f"{FIRST}\n{FIRST}".encode("utf-8"))
+        self.assertIsNone(open_large_file(single, min_bytes=0))
+        self.assertIsNone(open_large_file(double))
+        self.assertIsNone(open_large_file(os.path.join(self.temp_dir, "missing")))
+        self.assertIsNone(open_large_file(self.write("empty.puml", b""), 0))
+        with open_large_file(double, min_bytes=0) as reader:
+            self.assertEqual(reader.count_blocks(), 2)
+
+    def test_file_is_scanned_once(self):
+        """Test that counting and iterating the blocks share one scan."""
+        path = self.write("double.puml", f"{FIRST}\n{SECOND}".encode("utf-8"))
+        with mock.patch.object(
+            blocks_module,
+            "iter_diagram_blocks_bytes",
+            wraps=blocks_module.iter_diagram_blocks_bytes,
+        ) as scan:
+            with open_large_file(path, min_bytes=0) as reader:
+                self.assertEqual(reader.count_blocks(), 2)
+                names = [block.name for block, _ in reader.iter_blocks()]
+        self.assertEqual(names, ["first", "second"])
+        self.assertEqual(scan.call_count, 1)
+
+    def test_memory_is_bounded_by_block(self):
+        """Test that iterating the blocks does not hold the whole file."""
+        block = f"{FIRST}\n".encode("utf-8")
+        path = self.write("large.puml", block * 20000)
+        tracemalloc.start()
+        try:
+            with BlockReader(path) as reader:
+                count = sum(1 for _, text in reader.iter_blocks() if text)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 20000)
+        # Only the offset table grows with the file, by 16 bytes per block
+        # plus the over-allocation of its arrays
+        self.assertLess(peak, 20 * 20000 + len(block) * 20000 // 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk conversion cache.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio import cache as cache_module
+from src.plantuml2drawio.cache import ConversionCache, make_cache_key
+from src.plantuml2drawio.config import LAYOUT_VERSION
+from src.plantuml2drawio.core import process_diagram
+
+
+class TestConversionCache(unittest.TestCase):
+    """Test class for the conversion cache."""
+
+    def setUp(self):
+        """Create an empty cache directory."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.diagram = "@startuml\nstart\n:Step 1;\nstop\n@enduml\n"
+
+    def tearDown(self):
+        """Remove the cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_key_ignores_line_endings_and_trailing_whitespace(self):
+        """Test that formatting-only changes map to the same key."""
+        windows_diagram = self.diagram.replace("\n", "  \r\n")
+        self.assertEqual(
+            make_cache_key(self.diagram, False), make_cache_key(windows_diagram, False)
+        )
+        self.assertNotEqual(
+            make_cache_key(self.diagram, False), make_cache_key(self.diagram, True)
+        )
+        self.assertNotEqual(
+            make_cache_key(self.diagram, False),
+            make_cache_key(self.diagram.replace("Step 1", "Step 2"), False),
+        )
+
+    def test_key_depends_on_layout_version(self):
+        """Test that a new layout version invalidates cached results."""
+        key = make_cache_key(self.diagram, False)
+        with mock.patch.object(cache_module, "LAYOUT_VERSION", LAYOUT_VERSION + 1):
+            self.assertNotEqual(make_cache_key(self.diagram, False), key)
+
+    def test_hit_skips_conversion(self):
+        """Test that a cache hit does not run the processor again."""
+        cache = ConversionCache(self.cache_dir)
+        first, output_format = process_diagram(self.diagram, False, cache)
+        self.assertIsNotNone(first)
+
+        with mock.patch(
+            "plantuml2drawio.processors.base_processor.ProcessorRegistry"
+            ".detect_diagram_type"
+        ) as detect:
+            second, second_format = process_diagram(self.diagram, False, cache)
+            detect.assert_not_called()
+
+        self.assertEqual(first, second)
+        self.assertEqual(output_format, second_format)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted first."""
+        cache = ConversionCache(self.cache_dir, max_bytes=250)
+        cache.put("a", False, "x" * 100)
+        cache.put("b", False, "x" * 100)
+
+        # Make "a" the most recently used entry
+        past = time.time() - 60
+        for content in ("a", "b"):
+            os.utime(cache._entry_path(make_cache_key(content, False)), (past, past))
+        self.assertIsNotNone(cache.get("a", False))
+
+        cache.put("c", False, "x" * 100)
+
+        self.assertIsNotNone(cache.get("a", False))
+        self.assertIsNone(cache.get("b", False))
+        self.assertIsNotNone(cache.get("c", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
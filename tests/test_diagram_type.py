@@ -11,8 +11,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 # Import processors first to ensure registry is initialized
 from src.plantuml2drawio.processors import ProcessorRegistry
-from src.plantuml2drawio.processors.activity_processor import \
-    is_valid_activity_diagram
+from src.plantuml2drawio.processors.activity_processor import (
+    ActivityDiagramProcessor, is_valid_activity_diagram)
+from src.plantuml2drawio.processors.features import (DiagramFeatures,
+                                                     KeywordScanner)
 
 
 class TestDiagramTypeDetection(unittest.TestCase):
@@ -80,6 +82,35 @@ class TestDiagramTypeDetection(unittest.TestCase):
         is_valid = is_valid_activity_diagram(plantuml_content)
         self.assertTrue(is_valid)
 
+    def test_keyword_scanner_overlapping_keywords(self):
+        """Test, ob auch überlappende und enthaltene Schlüsselwörter gefunden werden."""
+        scanner = KeywordScanner(["if", "endif", "fork", "end fork", "end", "else"])
+
+        self.assertEqual(
+            scanner.scan("end fork\nendif"),
+            frozenset(["if", "endif", "fork", "end fork", "end"]),
+        )
+        self.assertEqual(scanner.scan("elsewhere"), frozenset(["else"]))
+        self.assertEqual(scanner.scan("nothing here"), frozenset())
+
+    def test_registry_matches_processor_detection(self):
+        """Test, ob die gemeinsame Merkmalsextraktion dieselbe Bewertung liefert."""
+        data_dir = os.path.join(os.path.dirname(__file__), "data")
+        for filename in sorted(os.listdir(data_dir)):
+            if not filename.endswith(".puml"):
+                continue
+            with open(os.path.join(data_dir, filename), encoding="utf-8") as f:
+                content = f.read()
+
+            features = DiagramFeatures(
+                content, ProcessorRegistry.get_keyword_scanner()
+            )
+            self.assertAlmostEqual(
+                ActivityDiagramProcessor.score_features(features),
+                ActivityDiagramProcessor.detect_diagram_type(content),
+                msg=filename,
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
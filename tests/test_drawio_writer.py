@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming Draw.io writer.
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio import core
+from src.plantuml2drawio.core import convert_content, write_output_file
+from src.plantuml2drawio.drawio_writer import (DrawioWriter, EdgeCell,
+                                               VertexCell, escape_label)
+from src.plantuml2drawio.models import Edge, Node
+from src.plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+
+
+class TestDrawioWriter(unittest.TestCase):
+    """Test class for the streaming Draw.io writer."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = ActivityDiagramProcessor()
+        self.diagram = (
+            "@startuml\nstart\n:Step <1>;\nif (ok?) then (yes)\n:A\nB;\n"
+            "else (no)\n:C & D;\nendif\nstop\n@enduml\n"
+        )
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove temporary files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_escape_label(self):
+        """Test that labels are escaped and line breaks kept."""
+        self.assertEqual(escape_label('a<b> & "c"'), "a&lt;b&gt; &amp; &quot;c&quot;")
+        self.assertEqual(escape_label("a\nb"), "a&lt;br&gt;b")
+        self.assertEqual(escape_label(None), "")
+
+    def test_one_chunk_per_cell(self):
+        """Test that every cell becomes its own chunk."""
+        writer = DrawioWriter("page", "Page")
+        chunks = list(
+            writer.iter_chunks(
+                [VertexCell("a", "A", "", 0, 0, 10, 10)],
+                [EdgeCell("e", "", "", "a", "a")],
+            )
+        )
+        self.assertEqual(len(chunks), 4)
+        self.assertIn('<diagram id="page" name="Page">', chunks[0])
+        self.assertIn('vertex="1"', chunks[1])
+        self.assertIn('edge="1"', chunks[2])
+        self.assertTrue(chunks[3].endswith("</mxfile>"))
+
+    def test_streamed_output_matches_string(self):
+        """Test that chunks, streams and strings produce the same document."""
+        nodes, edges = self.processor.parse_diagram(self.diagram)
+        self.processor.layout_diagram(nodes, edges)
+        xml = self.processor.export_to_drawio(nodes, edges)
+
+        self.assertEqual("".join(self.processor.iter_drawio(nodes, edges)), xml)
+
+        stream = io.StringIO()
+        self.assertIsNone(self.processor.convert_to_drawio(self.diagram, stream))
+        self.assertEqual(stream.getvalue(), xml)
+
+        streamed, _ = convert_content(self.diagram, streaming=True)
+        self.assertNotIsInstance(streamed, str)
+        path = os.path.join(self.temp_dir, "out.drawio")
+        self.assertTrue(write_output_file(streamed, path))
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), xml)
+
+    def test_failed_stream_leaves_no_file(self):
+        """Test that an export failing while it is written is reported."""
+
+        def failing_chunks():
+            yield "<mxfile>"
+            raise core.StageError("export", "broken cell")
+
+        path = os.path.join(self.temp_dir, "out.drawio")
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertFalse(write_output_file(failing_chunks(), path))
+        self.assertIn("broken cell", output.getvalue())
+        self.assertFalse(os.path.exists(path))
+
+    def test_write_does_not_materialize_document(self):
+        """Test that writing a large diagram needs far less memory than it."""
+        nodes = [Node(str(i), f"Step {i}", "activity") for i in range(20000)]
+        edges = [Edge(str(i), str(i + 1)) for i in range(len(nodes) - 1)]
+        size = len(self.processor.export_to_drawio(nodes, edges))
+
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            tracemalloc.start()
+            try:
+                self.processor.write_drawio(nodes, edges, devnull)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertLess(peak, size / 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the background tasks of the graphical user interface.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.core import convert_content
+from src.plantuml2drawio.gui_worker import (MSG_CANCELLED, MSG_DONE, MSG_ERROR,
+                                            MSG_STAGE, BackgroundTask,
+                                            convert_to_file, read_diagram)
+
+DIAGRAM = "@startuml\nstart\n:Step 1;\n:Step 2;\nstop\n@enduml\n"
+
+
+class TestBackgroundTask(unittest.TestCase):
+    """Test class for running GUI work on a worker thread."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_path = os.path.join(self.temp_dir, "diagram.drawio")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def run_task(self, task):
+        """Run a task to the end and return its messages."""
+        task.start()
+        task.join(10)
+        return task.poll()
+
+    def test_conversion_reports_stages(self):
+        """Test that every stage is reported before the result."""
+        messages = self.run_task(
+            BackgroundTask(convert_to_file, DIAGRAM, self.output_path)
+        )
+        self.assertEqual(
+            messages,
+            [
+                (MSG_STAGE, "detect"),
+                (MSG_STAGE, "validate"),
+                (MSG_STAGE, "parse"),
+                (MSG_STAGE, "layout"),
+                (MSG_STAGE, "export"),
+                (MSG_DONE, self.output_path),
+            ],
+        )
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), convert_content(DIAGRAM)[0])
+
+    def test_read_diagram(self):
+        """Test that reading a file detects its diagram type."""
+        input_path = os.path.join(self.temp_dir, "diagram.puml")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.write(DIAGRAM)
+        messages = self.run_task(BackgroundTask(read_diagram, input_path))
+        self.assertEqual(messages[-1], (MSG_DONE, (DIAGRAM, True)))
+
+        missing = os.path.join(self.temp_dir, "missing.puml")
+        kind, error = self.run_task(BackgroundTask(read_diagram, missing))[-1]
+        self.assertEqual(kind, MSG_ERROR)
+        self.assertIsInstance(error, OSError)
+
+    def test_errors_carry_their_stage(self):
+        """Test that a failed conversion reports its stage and writes nothing."""
+        kind, error = self.run_task(
+            BackgroundTask(convert_to_file, "@startuml\n@enduml", self.output_path)
+        )[-1]
+        self.assertEqual(kind, MSG_ERROR)
+        self.assertIn(error.stage, ("detect", "validate"))
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_cancel_during_layout(self):
+        """Test that a cancelled layout stops and leaves no file behind."""
+        lines = "".join(f":Step {index};\n" for index in range(5000))
+        diagram = f"@startuml\nstart\n{lines}stop\n@enduml\n"
+
+        def cancel_in_layout(report, cancel):
+            def report_and_cancel(stage):
+                report(stage)
+                if stage == "layout":
+                    # Cancel only once the layout has started
+                    task.cancel()
+
+            return convert_to_file(diagram, self.output_path, report_and_cancel, cancel)
+
+        task = BackgroundTask(cancel_in_layout)
+        messages = self.run_task(task)
+
+        self.assertEqual(messages[-2:], [(MSG_STAGE, "layout"), (MSG_CANCELLED, None)])
+        self.assertFalse(os.path.exists(self.output_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
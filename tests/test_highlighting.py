@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the syntax highlighting of the GUI editor.
+"""
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.highlighting import (STATE_ACTIVITY, STATE_BRACKET,
+                                              STATE_NORMAL, TextHighlighter,
+                                              highlight_line)
+
+
+def spans_text(line, spans):
+    """Return the highlighted text of each span as (tag, text) pairs."""
+    return [(tag, line[start:end]) for tag, start, end in spans]
+
+
+class TestHighlightLine(unittest.TestCase):
+    """Test class for tokenizing single lines."""
+
+    def test_keywords_and_arrows(self):
+        """Test that keywords are whole words and arrows are matched."""
+        line = "IF (ready?) then (yes) -> restart"
+        spans, state = highlight_line(line)
+        self.assertEqual(state, STATE_NORMAL)
+        self.assertEqual(
+            spans_text(line, spans),
+            [
+                ("keyword", "IF"),
+                ("bracket", "("),
+                ("condition", "ready?"),
+                ("bracket", ")"),
+                ("keyword", "then"),
+                ("bracket", "("),
+                ("condition", "yes"),
+                ("bracket", ")"),
+                ("arrow", "->"),
+            ],
+        )
+
+    def test_activity_contents_are_not_keywords(self):
+        """Test that text of activities is not tokenized further."""
+        line = ":if this -> that; stop"
+        spans, state = highlight_line(line)
+        self.assertEqual(state, STATE_NORMAL)
+        self.assertEqual(
+            spans_text(line, spans),
+            [
+                ("bracket", ":"),
+                ("activity_content", "if this -> that"),
+                ("bracket", ";"),
+                ("keyword", "stop"),
+            ],
+        )
+
+    def test_state_carries_over_lines(self):
+        """Test that activities and brackets may span several lines."""
+        self.assertEqual(highlight_line(":first line")[1], STATE_ACTIVITY)
+        spans, state = highlight_line("still inside", STATE_ACTIVITY)
+        self.assertEqual(spans, [("activity_content", 0, 12)])
+        self.assertEqual(state, STATE_ACTIVITY)
+        spans, state = highlight_line("end; endif", STATE_ACTIVITY)
+        self.assertEqual(state, STATE_NORMAL)
+        self.assertEqual(spans[-1], ("keyword", 5, 10))
+        self.assertEqual(highlight_line("[open")[1], STATE_BRACKET)
+
+    def test_comments(self):
+        """Test that comment lines are highlighted as a whole."""
+        line = "  ' if this -> that"
+        self.assertEqual(highlight_line(line), ([("comment", 2, len(line))], "normal"))
+        self.assertEqual(highlight_line(line, STATE_ACTIVITY)[1], STATE_ACTIVITY)
+
+
+def create_root():
+    """Create a hidden Tk root window, or None without a display."""
+    try:
+        import tkinter
+
+        root = tkinter.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    return root
+
+
+class TestTextHighlighter(unittest.TestCase):
+    """Test class for highlighting a Tk text widget incrementally."""
+
+    def setUp(self):
+        """Create a text widget with a small batch size."""
+        self.root = create_root()
+        if self.root is None:
+            self.skipTest("Tk is not available")
+        import tkinter
+
+        self.text = tkinter.Text(self.root)
+        self.highlighter = TextHighlighter(self.text, delay_ms=1, batch_lines=3)
+
+    def tearDown(self):
+        """Destroy the window."""
+        self.root.destroy()
+
+    def expected(self):
+        """Return the tags a full tokenization of the text gives."""
+        lines = self.text.get("1.0", "end-1c").split("\n")
+        tags = set()
+        state = STATE_NORMAL
+        for line_no, line in enumerate(lines, 1):
+            spans, state = highlight_line(line, state)
+            for tag, start, end in spans:
+                for column in range(start, end):
+                    tags.add((tag, line_no, column))
+        return tags
+
+    def actual(self):
+        """Return the highlight tags set in the widget, per character."""
+        tags = set()
+        for tag in ("keyword", "arrow", "bracket", "condition", "activity_content"):
+            ranges = self.text.tag_ranges(tag)
+            for start, end in zip(ranges[::2], ranges[1::2]):
+                index = str(start)
+                while self.text.compare(index, "<", end):
+                    line_no, column = map(int, index.split("."))
+                    if self.text.get(index) != "\n":
+                        tags.add((tag, line_no, column))
+                    index = self.text.index(f"{index} +1c")
+        return tags
+
+    def settle(self):
+        """Run the idle callbacks until all batches are done."""
+        for _ in range(100):
+            self.root.update()
+
+    def test_full_and_incremental_highlighting(self):
+        """Test that edits give the same tags as highlighting everything."""
+        lines = [f"if (x{index}) then\n:step {index};\nendif\n" for index in range(10)]
+        self.text.insert("1.0", "@startuml\n" + "".join(lines) + "@enduml")
+        self.highlighter.highlight_all()
+        self.settle()
+        self.assertEqual(self.actual(), self.expected())
+
+        # Opening brackets that are never closed changes all lines below
+        self.text.insert("5.0", "[")
+        self.highlighter.mark_dirty("5.0")
+        self.highlighter.flush()
+        self.settle()
+        self.assertEqual(self.actual(), self.expected())
+        self.assertIn("activity_content", self.text.tag_names("20.1"))
+
+        # Closing them again restores the rest of the text
+        self.text.insert("5.end", "]")
+        self.highlighter.mark_dirty("5.0")
+        self.highlighter.flush()
+        self.settle()
+        self.assertEqual(self.actual(), self.expected())
+        self.assertIn("keyword", self.text.tag_names("20.1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tests for the local HTTP conversion service.
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio import http_server
+from src.plantuml2drawio.api import convert
+from src.plantuml2drawio.core import convert_content
+from src.plantuml2drawio.http_server import (ConversionHTTPServer,
+                                             ConversionService, LRUCache)
+
+VALID = "@startuml\nstart\n:Step;\nstop\n@enduml\n"
+INVALID = "This is not a PlantUML file."
+
+
+class TestConversionHTTPServer(unittest.TestCase):
+    """Test class for the HTTP service."""
+
+    def setUp(self):
+        """Start the service on a free port with a thread pool."""
+        self.pool = ThreadPoolExecutor(max_workers=4)
+        self.service = ConversionService(executor=self.pool)
+        self.server = ConversionHTTPServer(0, self.service)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the service."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.pool.shutdown()
+
+    def request(self, method, path, body=None):
+        """Send a request and return (status, headers, body)."""
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        try:
+            connection.request(method, path, body)
+            response = connection.getresponse()
+            return response.status, response.headers, response.read().decode("utf-8")
+        finally:
+            connection.close()
+
+    def test_only_loopback(self):
+        """Test that the service is bound to the loopback interface."""
+        self.assertEqual(self.server.server_address[0], "127.0.0.1")
+
+    def test_convert_and_cache(self):
+        """Test that output matches the CLI and repeats come from the cache."""
+        status, headers, body = self.request("POST", "/convert", VALID)
+        self.assertEqual(status, 200)
+        self.assertEqual(body, convert_content(VALID)[0])
+        self.assertTrue(headers["Content-Type"].startswith("application/xml"))
+        self.assertEqual(headers["X-P2D-Source"], "converted")
+
+        status, headers, again = self.request("POST", "/convert", VALID)
+        self.assertEqual((status, again), (200, body))
+        self.assertEqual(headers["X-P2D-Source"], "cache")
+
+        status, headers, body = self.request("POST", "/convert?format=json", VALID)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["X-P2D-Source"], "converted")
+        self.assertEqual(len(json.loads(body)["nodes"]), 3)
+
+    def test_errors(self):
+        """Test that invalid requests get client error responses."""
+        status, _, body = self.request("POST", "/convert", INVALID)
+        self.assertEqual(status, 422)
+        self.assertIn("Unsupported diagram type", body)
+        self.assertEqual(self.request("POST", "/convert?format=png", VALID)[0], 400)
+        self.assertEqual(self.request("POST", "/convert", b"\xff")[0], 400)
+        self.assertEqual(self.request("POST", "/other", VALID)[0], 404)
+        self.assertEqual(self.request("GET", "/health")[:3:2], (200, "ok\n"))
+
+    def test_invalid_content_length(self):
+        """Test that a missing or invalid Content-Length is answered at once."""
+        for length, expected in ((None, 411), ("-1", 400), ("abc", 400)):
+            with self.subTest(length=length):
+                connection = http.client.HTTPConnection(
+                    *self.server.server_address, timeout=5
+                )
+                try:
+                    connection.putrequest("POST", "/convert")
+                    if length is not None:
+                        connection.putheader("Content-Length", length)
+                    connection.endheaders()
+                    self.assertEqual(connection.getresponse().status, expected)
+                finally:
+                    connection.close()
+
+    def test_metrics(self):
+        """Test that requests show up in the latency histograms."""
+        self.request("POST", "/convert", VALID)
+        self.request("POST", "/convert", VALID)
+        self.request("POST", "/convert", INVALID)
+        status, headers, body = self.request("GET", "/metrics")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["Content-Type"].startswith("text/plain"))
+        self.assertIn("# TYPE p2d_request_duration_seconds histogram", body)
+        self.assertIn(
+            'p2d_request_duration_seconds_count{source="converted"} 2', body
+        )
+        self.assertIn(
+            'p2d_request_duration_seconds_bucket{source="cache",le="+Inf"} 1', body
+        )
+        self.assertIn('p2d_responses_total{status="200"} 2', body)
+        self.assertIn('p2d_responses_total{status="422"} 1', body)
+        self.assertIn("p2d_cache_entries 2", body)
+
+
+class TestConversionService(unittest.TestCase):
+    """Test class for caching and coalescing in the service."""
+
+    def test_identical_requests_are_coalesced(self):
+        """Test that concurrent identical requests share one conversion."""
+        started = threading.Event()
+
+        def slow_convert(content, output_json):
+            started.set()
+            time.sleep(0.2)
+            return convert(content, output_json)
+
+        with ThreadPoolExecutor(max_workers=8) as pool, mock.patch.object(
+            http_server.api, "convert", side_effect=slow_convert
+        ) as converter:
+            service = ConversionService(executor=pool)
+            with ThreadPoolExecutor(max_workers=4) as clients:
+                first = clients.submit(service.convert, VALID, False)
+                started.wait()
+                others = [
+                    clients.submit(service.convert, VALID, False) for _ in range(3)
+                ]
+                results = [first.result()] + [other.result() for other in others]
+
+        self.assertEqual(converter.call_count, 1)
+        self.assertEqual(
+            [source for _, source in results],
+            ["converted", "coalesced", "coalesced", "coalesced"],
+        )
+        self.assertEqual(len({result.output for result, _ in results}), 1)
+        self.assertEqual(service.metrics.in_flight, 0)
+
+    def test_lru_eviction(self):
+        """Test that the cache keeps only the most recently used entries."""
+        results = {name: convert(VALID, key=name) for name in "abc"}
+        cache = LRUCache(max_entries=2)
+        cache.put("a", results["a"])
+        cache.put("b", results["b"])
+        cache.get("a")
+        cache.put("c", results["c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), results["a"])
+        self.assertEqual(len(cache), 2)
+
+        small = LRUCache(max_bytes=len(results["a"].output))
+        small.put("a", results["a"])
+        small.put("b", results["b"])
+        self.assertEqual(len(small), 1)
+        self.assertEqual(small.total_bytes, len(results["b"].output))
+
+
+if __name__ == "__main__":
+    unittest.main()
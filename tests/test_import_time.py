@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the cold-start import cost of the library.
+"""
+import os
+import subprocess
+import sys
+import unittest
+from typing import List
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Modules that only the command line, the GUI, logging setup or an actual
+# conversion may import; importing the library must not load them
+HEAVY_MODULES = (
+    "argparse",
+    "logging.handlers",
+    "tkinter",
+    "_tkinter",
+    "customtkinter",
+    "PIL",
+    "plantuml2drawio.processors.activity_processor",
+    "plantuml2drawio.processors.activity_parser",
+    "plantuml2drawio.drawio_writer",
+)
+
+# Budget in milliseconds for the cumulative import time of
+# plantuml2drawio.core. The default leaves room for slow CI machines; the
+# variable sets a tighter one, e.g. on a dedicated benchmark machine.
+IMPORT_TIME_BUDGET_ENV = "P2D_IMPORT_TIME_BUDGET_MS"
+DEFAULT_IMPORT_TIME_BUDGET_MS = 500
+
+# The best of this many fresh interpreters is compared with the budget
+IMPORT_TIME_RUNS = 3
+
+
+def measure_import(module: str) -> float:
+    """Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Name of the module to import
+
+    Returns:
+        Cumulative import time of the module in milliseconds
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        env=dict(os.environ, PYTHONPATH=SRC_DIR),
+        text=True,
+    )
+    for line in completed.stderr.splitlines():
+        # Lines look like "import time:  self [us] | cumulative | name"
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        if name.strip() == module and not name.startswith("  "):
+            return int(cumulative_us) / 1000
+    raise AssertionError(f"{module} was not imported")
+
+
+def imported_modules(module: str) -> List[str]:
+    """Return the modules loaded by importing a module in a fresh interpreter.
+
+    Args:
+        module: Name of the module to import
+
+    Returns:
+        Names of all modules in sys.modules after the import
+    """
+    code = f"import sys\nimport {module}\nprint('\\n'.join(sys.modules))\n"
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        env=dict(os.environ, PYTHONPATH=SRC_DIR),
+        text=True,
+    )
+    return completed.stdout.split()
+
+
+class TestImportTime(unittest.TestCase):
+    """Test class for the import cost of the library."""
+
+    def test_import_loads_no_heavy_modules(self):
+        """Test that importing the library defers CLI, GUI and processors."""
+        for module in ("plantuml2drawio", "plantuml2drawio.core"):
+            with self.subTest(module=module):
+                imported = set(imported_modules(module))
+                self.assertIn(module, imported)
+                self.assertEqual(
+                    [name for name in HEAVY_MODULES if name in imported], []
+                )
+
+    def test_core_import_budget(self):
+        """Test the import time of the core module against its budget."""
+        budget = os.environ.get(IMPORT_TIME_BUDGET_ENV) or DEFAULT_IMPORT_TIME_BUDGET_MS
+        best = min(
+            measure_import("plantuml2drawio.core") for _ in range(IMPORT_TIME_RUNS)
+        )
+        self.assertLess(best, float(budget))
+
+    def test_import_does_not_configure_logging(self):
+        """Test that importing the package leaves the root logger alone."""
+        code = (
+            "import logging\n"
+            "handler = logging.NullHandler()\n"
+            "logging.getLogger().addHandler(handler)\n"
+            "import plantuml2drawio.core\n"
+            "root = logging.getLogger()\n"
+            "print(root.handlers == [handler], root.level == logging.WARNING)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=dict(os.environ, PYTHONPATH=SRC_DIR),
+            text=True,
+        ).stdout
+        self.assertEqual(output.split(), ["True", "True"])
+
+    def test_setup_logging_configures_root_logger(self):
+        """Test that the lazily imported logging setup still works."""
+        code = (
+            "import logging\n"
+            "from plantuml2drawio.logging_config import setup_logging\n"
+            "setup_logging('DEBUG')\n"
+            "root = logging.getLogger()\n"
+            "print(len(root.handlers), root.level == logging.DEBUG)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=dict(os.environ, PYTHONPATH=SRC_DIR),
+            text=True,
+        ).stdout
+        self.assertEqual(output.split(), ["1", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
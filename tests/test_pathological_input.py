@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Regression tests for super-linear run time on pathological input.
+
+Detection, validation and parsing mostly run inside the regular expression
+engine, where super-linear behavior shows up as catastrophic backtracking.
+They are checked against a hard deadline on a large input: linear code
+handles it in a fraction of a second, a quadratic regression would take
+minutes, so the generous margin keeps the check stable on slow or loaded
+machines.
+
+Layout is plain Python, so its growth is measured deterministically by
+counting the executed lines at two input sizes instead of timing them. For
+a linear algorithm the count grows with the size factor; a quadratic one
+grows with its square.
+"""
+import os
+import sys
+import time
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.models import Edge, Node
+from src.plantuml2drawio.processors import ProcessorRegistry
+from src.plantuml2drawio.processors.activity_processor import (
+    ActivityDiagramProcessor, is_valid_activity_diagram)
+
+# Repetitions of the pathological fragment in the input; linear code needs
+# well under a second for it
+REPETITIONS = 160000
+
+# Hard limit for a single call on the pathological input in seconds
+DEADLINE_SECONDS = 10
+
+# Ratio between the large and the small input size of the layout checks
+SIZE_FACTOR = 8
+
+# Largest accepted growth of the executed lines; linear is ~8, quadratic ~64
+MAX_GROWTH_FACTOR = 24
+
+# Number of repeated structures in the small input of the layout checks
+BASE_LAYOUT_SIZE = 100
+
+
+def _elapsed(function, content):
+    """Return the run time of function(content) in seconds."""
+    started = time.perf_counter()
+    function(content)
+    return time.perf_counter() - started
+
+
+def _count_lines(function, argument):
+    """Return the number of Python lines executed by function(argument).
+
+    The count only depends on the code paths taken, not on the speed or the
+    load of the machine.
+    """
+    count = 0
+
+    def trace(frame, event, arg):
+        nonlocal count
+        if event == "line":
+            count += 1
+        return trace
+
+    previous = sys.gettrace()
+    sys.settrace(trace)
+    try:
+        function(argument)
+    finally:
+        sys.settrace(previous)
+    return count
+
+
+def _make_diagram(fragment, repetitions):
+    """Wrap a repeated fragment into an otherwise valid activity diagram."""
+    return "@startuml\nstart\n:Step;\n" + fragment * repetitions + "\nstop\n@enduml\n"
+
+
+def _make_decisions(count):
+    """Return the nodes and edges of a diagram with count if/endif blocks."""
+    blocks = "".join(
+        f"if (c{i}?) then (yes)\n:a{i};\nelse (no)\n:b{i};\nendif\n"
+        for i in range(count)
+    )
+    return ActivityDiagramProcessor().parse_diagram(
+        "@startuml\nstart\n" + blocks + "stop\n@enduml\n"
+    )
+
+
+def _make_disconnected(count):
+    """Return the nodes and edges of a chain of count nodes plus count orphans."""
+    nodes = [Node(f"a{i}", f"a{i}", "activity") for i in range(count)]
+    nodes += [Node(f"b{i}", f"b{i}", "activity") for i in range(count)]
+    edges = [Edge(f"a{i}", f"a{i + 1}") for i in range(count - 1)]
+    return nodes, edges
+
+
+def _layout(graph):
+    """Lay out a fresh copy of a parsed graph."""
+    nodes, edges = graph
+    ActivityDiagramProcessor().layout_diagram(
+        [Node(n.id, n.label, n.type) for n in nodes], edges
+    )
+
+
+class TestPathologicalInput(unittest.TestCase):
+    """Test class for linear run time on adversarial diagrams."""
+
+    FRAGMENTS = {
+        "unclosed if conditions": "if (x ",
+        "if blocks without endif": "if (x) y ",
+        "colons without semicolon": "a: ",
+        "unclosed multiline activities": ":a\n",
+        "long single line": "if (a: (",
+    }
+
+    FUNCTIONS = {
+        "detect_diagram_type": ActivityDiagramProcessor.detect_diagram_type,
+        "is_valid_activity_diagram": is_valid_activity_diagram,
+        "registry detection": ProcessorRegistry.detect_diagram_type,
+        "parse_diagram": lambda content: ActivityDiagramProcessor().parse_diagram(
+            content
+        ),
+    }
+
+    def test_linear_scaling(self):
+        """Test that large pathological input is handled within the deadline."""
+        for fragment_name, fragment in self.FRAGMENTS.items():
+            content = _make_diagram(fragment, REPETITIONS)
+
+            for function_name, function in self.FUNCTIONS.items():
+                with self.subTest(input=fragment_name, function=function_name):
+                    elapsed = _elapsed(function, content)
+                    self.assertLess(
+                        elapsed,
+                        DEADLINE_SECONDS,
+                        f"{function_name} scales super-linearly on "
+                        f"{fragment_name}: {elapsed:.1f}s",
+                    )
+
+    LAYOUTS = {
+        "if/endif blocks": _make_decisions,
+        "disconnected components": _make_disconnected,
+    }
+
+    def test_layout_linear_scaling(self):
+        """Test that the layout work grows linearly with the diagram size."""
+        for layout_name, make_graph in self.LAYOUTS.items():
+            with self.subTest(input=layout_name):
+                small = _count_lines(_layout, make_graph(BASE_LAYOUT_SIZE))
+                large = _count_lines(
+                    _layout, make_graph(BASE_LAYOUT_SIZE * SIZE_FACTOR)
+                )
+                self.assertLess(
+                    large / small,
+                    MAX_GROWTH_FACTOR,
+                    f"layout_diagram scales super-linearly on {layout_name}: "
+                    f"{small} -> {large} lines",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy processor registry and the discovery of processors.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.processors import base_processor, discovery
+from src.plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+from src.plantuml2drawio.processors.base_processor import ProcessorRegistry
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+class UnusedDiagramProcessor(ActivityDiagramProcessor):
+    """Processor that is only registered by its import path."""
+
+    @classmethod
+    def detect_diagram_type(cls, content: str) -> float:
+        """Never claim a diagram."""
+        return 0.0
+
+    @classmethod
+    def score_features(cls, features) -> float:
+        """Never claim a diagram."""
+        return 0.0
+
+
+class TestProcessorRegistry(unittest.TestCase):
+    """Test class for the lazy processor registry."""
+
+    def setUp(self):
+        """Start every test with an empty registry without discovery."""
+        self.saved = dict(vars(ProcessorRegistry))
+        ProcessorRegistry.reset()
+        ProcessorRegistry.discovery_cache_dir = None
+        patcher = mock.patch.object(
+            base_processor, "discover_processors", return_value={}
+        )
+        self.discover = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Restore the registry."""
+        for name in ("_processors", "_discovered", "_defaults_loaded", "_scanner"):
+            setattr(ProcessorRegistry, name, self.saved[name])
+        ProcessorRegistry.discovery_cache_dir = self.saved["discovery_cache_dir"]
+
+    def test_import_does_not_load_processors(self):
+        """Test that importing the CLI module imports no processor."""
+        code = (
+            "import sys\n"
+            "import plantuml2drawio.core\n"
+            "from plantuml2drawio.processors import ProcessorRegistry\n"
+            "name = 'plantuml2drawio.processors.activity_processor'\n"
+            "print(name in sys.modules)\n"
+            "ProcessorRegistry.get_diagram_types()\n"
+            "print(name in sys.modules)\n"
+            "ProcessorRegistry.get_processor('activity')\n"
+            "print(name in sys.modules)\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=dict(os.environ, PYTHONPATH=SRC_DIR),
+            text=True,
+        ).stdout
+        self.assertEqual(output.split(), ["False", "False", "True"])
+
+    def test_builtin_processor_is_resolved(self):
+        """Test that the built-in processor is registered by its import path."""
+        self.assertEqual(ProcessorRegistry.get_diagram_types(), ["activity"])
+        self.assertIsInstance(ProcessorRegistry._processors["activity"], str)
+        self.assertIs(
+            ProcessorRegistry.get_processor("activity"), ActivityDiagramProcessor
+        )
+        self.assertIs(
+            ProcessorRegistry._processors["activity"], ActivityDiagramProcessor
+        )
+
+    def test_register_import_path(self):
+        """Test that processors registered by path are imported on lookup."""
+        path = f"{__name__}:UnusedDiagramProcessor"
+        ProcessorRegistry.register("unused", path)
+        self.assertEqual(ProcessorRegistry.get_diagram_types(), ["unused", "activity"])
+        self.assertEqual(ProcessorRegistry._processors["unused"], path)
+
+        diagram = "@startuml\nstart\n:A;\nstop\n@enduml"
+        diagram_type, _ = ProcessorRegistry.detect_diagram_type(diagram)
+        self.assertEqual(diagram_type, "activity")
+        self.assertIs(ProcessorRegistry.get_processor("unused"), UnusedDiagramProcessor)
+
+    def test_discovered_processors(self):
+        """Test that discovered processors do not replace built-in ones."""
+        self.discover.return_value = {
+            "activity": f"{__name__}:UnusedDiagramProcessor",
+            "unused": f"{__name__}:UnusedDiagramProcessor",
+        }
+        processors = ProcessorRegistry.get_all_processors()
+        self.assertIs(processors["activity"], ActivityDiagramProcessor)
+        self.assertIs(processors["unused"], UnusedDiagramProcessor)
+
+    def test_broken_discovered_processor_is_skipped(self):
+        """Test that a discovered processor that fails to import is dropped."""
+        self.discover.return_value = {"broken": "missing_module_for_tests:Processor"}
+        with self.assertLogs(base_processor.__name__, "WARNING"):
+            self.assertIsNone(ProcessorRegistry.get_processor("broken"))
+        self.assertEqual(ProcessorRegistry.get_diagram_types(), ["activity"])
+
+    def test_broken_registered_processor_raises(self):
+        """Test that an explicitly registered processor must import."""
+        ProcessorRegistry.register("broken", "missing_module_for_tests:Processor")
+        with self.assertRaises(ImportError):
+            ProcessorRegistry.get_processor("broken")
+
+
+class TestProcessorDiscovery(unittest.TestCase):
+    """Test class for the cached entry point index."""
+
+    def setUp(self):
+        """Create a temporary cache directory."""
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test_index_is_cached(self):
+        """Test that entry points are only scanned again when sys.path changes."""
+        found = {"sequence": "package.module:SequenceProcessor"}
+        with mock.patch.object(
+            discovery, "scan_entry_points", return_value=found
+        ) as scan:
+            self.assertEqual(discovery.discover_processors(self.cache_dir), found)
+            self.assertEqual(discovery.discover_processors(self.cache_dir), found)
+            self.assertEqual(scan.call_count, 1)
+
+            with mock.patch.object(sys, "path", sys.path + [self.cache_dir]):
+                discovery.discover_processors(self.cache_dir)
+            self.assertEqual(scan.call_count, 2)
+
+            discovery.discover_processors(None)
+            self.assertEqual(scan.call_count, 3)
+
+    def test_no_index_by_default(self):
+        """Test that library use neither fingerprints sys.path nor writes."""
+        self.assertIsNone(ProcessorRegistry.discovery_cache_dir)
+        with mock.patch.object(
+            discovery, "scan_entry_points", return_value={}
+        ) as scan, mock.patch.object(
+            discovery, "path_fingerprint"
+        ) as fingerprint, mock.patch.object(discovery, "_write_index") as write:
+            self.assertEqual(discovery.discover_processors(), {})
+        scan.assert_called_once_with()
+        fingerprint.assert_not_called()
+        write.assert_not_called()
+
+    def test_corrupt_index_is_rebuilt(self):
+        """Test that an unreadable index is replaced by a fresh scan."""
+        index_path = os.path.join(self.cache_dir, "processor-index.json")
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write("not json")
+        with mock.patch.object(discovery, "scan_entry_points", return_value={}):
+            self.assertEqual(discovery.discover_processors(self.cache_dir), {})
+        with mock.patch.object(discovery, "scan_entry_points") as scan:
+            self.assertEqual(discovery.discover_processors(self.cache_dir), {})
+            scan.assert_not_called()
+
+    def test_scan_entry_points(self):
+        """Test that scanning the installed distributions returns a mapping."""
+        self.assertIsInstance(discovery.scan_entry_points(), dict)
+
+    def test_import_object(self):
+        """Test both import path notations."""
+        self.assertIs(discovery.import_object("os.path:join"), os.path.join)
+        self.assertIs(discovery.import_object("os.path.join"), os.path.join)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the cProfile and tracemalloc reports of conversions.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.core import convert_content
+from src.plantuml2drawio.profiling import (MemoryStats, format_batch_memory,
+                                           format_profile, format_size,
+                                           format_slowest_files, merge_profiles,
+                                           profiled)
+
+
+class TestMemoryStats(unittest.TestCase):
+    """Test class for the per-stage memory reports."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        steps = "\n".join(f":Step {i};" for i in range(200))
+        self.diagram = f"@startuml\nstart\n{steps}\nstop\n@enduml\n"
+
+    def test_convert_content_stages(self):
+        """Test that every stage gets a peak and its allocation sites."""
+        stats = MemoryStats()
+        with stats.tracing():
+            chunks, _ = convert_content(self.diagram, streaming=True, stats=stats)
+            output = "".join(chunks)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        self.assertEqual(
+            list(stats.memory_dict()["stages"]),
+            ["detect", "validate", "parse", "layout", "export"],
+        )
+        parse = stats.memory["parse"]
+        self.assertGreater(parse.peak, 0)
+        self.assertLessEqual(parse.peak, stats.peak)
+        self.assertTrue(parse.sites)
+        self.assertTrue(any("activity_parser.py" in site.site for site in parse.sites))
+        self.assertTrue(all(site.size > 0 for site in parse.sites))
+        self.assertEqual(stats.bytes_out, len(output.encode("utf-8")))
+
+        data = json.loads(stats.to_json())
+        self.assertIn("memory", data)
+        self.assertIn("parse", stats.format_memory())
+
+    def test_nested_stage_keeps_outer_peak(self):
+        """Test that a nested stage does not hide the peak of the outer one."""
+        stats = MemoryStats()
+        with stats.tracing():
+            with stats.stage("write"):
+                with stats.stage("export"):
+                    buffer = bytearray(1_000_000)
+                    del buffer
+        self.assertGreaterEqual(stats.memory["export"].peak, 1_000_000)
+        self.assertGreaterEqual(stats.memory["write"].peak, 1_000_000)
+
+    def test_without_tracing_only_times(self):
+        """Test that no memory is recorded unless tracemalloc is running."""
+        stats = MemoryStats()
+        convert_content(self.diagram, stats=stats)
+        self.assertEqual(stats.memory, {})
+        self.assertIn("parse", stats.stages)
+
+    def test_format_size(self):
+        """Test that sizes use binary units."""
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KiB")
+        self.assertEqual(format_size(3 * 1024 * 1024), "3.0 MiB")
+
+    def test_format_batch_memory(self):
+        """Test that reports of several files are aggregated."""
+
+        def report(peak, size):
+            sites = [{"site": "models.py:1", "size": size, "blocks": 1}]
+            return {"peak": peak, "stages": {"parse": {"peak": peak, "sites": sites}}}
+
+        text = format_batch_memory(
+            [("a.puml", report(100, 10)), ("b.puml", report(300, 20))]
+        )
+        lines = text.splitlines()
+        self.assertIn("b.puml", lines[1])
+        self.assertIn("parse", text)
+        self.assertIn("30 B  models.py:1 (2 blocks)", text)
+
+
+class TestProfiles(unittest.TestCase):
+    """Test class for cProfile profiles of conversions."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.diagram = "@startuml\nstart\n:Step;\nstop\n@enduml\n"
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_profiled_writes_and_merges(self):
+        """Test that profiles are written, merged and formatted."""
+        paths = [os.path.join(self.temp_dir, f"{i}.prof") for i in range(2)]
+        for path in paths:
+            with profiled(path):
+                convert_content(self.diagram)
+            self.assertIn("convert_content", format_profile(path))
+
+        merged_path = os.path.join(self.temp_dir, "merged.prof")
+        missing_path = os.path.join(self.temp_dir, "missing.prof")
+        merged = merge_profiles(paths + [missing_path], merged_path)
+        calls = {key[2]: value[0] for key, value in merged.stats.items()}
+        self.assertEqual(calls["convert_content"], 2)
+        self.assertTrue(os.path.exists(merged_path))
+        self.assertIsNone(merge_profiles([missing_path], merged_path))
+
+    def test_format_slowest_files(self):
+        """Test that the slowest files come first with their share."""
+        text = format_slowest_files([("fast.puml", 0.001), ("slow.puml", 0.003)])
+        lines = text.splitlines()
+        self.assertIn("slow.puml", lines[1])
+        self.assertIn("75.0%", lines[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for running the conversion pipeline once and exporting its result.
+"""
+import io
+import json
+import os
+import pickle
+import sys
+import unittest
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.core import (ConversionError, ProcessorRegistry,
+                                      convert_content, process_diagram)
+from src.plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+from src.plantuml2drawio.processors.base_processor import StageError
+from src.plantuml2drawio.stats import ConversionStats
+
+DIAGRAM = "@startuml\nstart\n:Step 1;\n:Step 2;\nstop\n@enduml\n"
+
+
+class TestDiagramResult(unittest.TestCase):
+    """Test class for the result of a pipeline run."""
+
+    def setUp(self):
+        """Create a processor."""
+        self.processor = ActivityDiagramProcessor()
+
+    def test_all_exports_share_one_run(self):
+        """Test that XML, JSON and streamed XML reuse a single parse."""
+        with mock.patch.object(
+            self.processor, "parse_diagram", wraps=self.processor.parse_diagram
+        ) as parse, mock.patch.object(
+            self.processor, "layout_diagram", wraps=self.processor.layout_diagram
+        ) as layout:
+            result = self.processor.run(DIAGRAM)
+            xml = result.drawio
+            data = json.loads(result.json)
+            stream = io.StringIO()
+            result.write_drawio(stream)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(layout.call_count, 1)
+
+        self.assertEqual(xml, ActivityDiagramProcessor().convert_to_drawio(DIAGRAM))
+        self.assertEqual(stream.getvalue(), xml)
+        self.assertEqual(len(data["nodes"]), len(result.nodes))
+        self.assertTrue(all(node.width for node in result.nodes))
+
+    def test_stats(self):
+        """Test that run and the exports fill in the statistics."""
+        stats = ConversionStats()
+        result = self.processor.run(DIAGRAM, stats)
+        self.assertEqual(stats.node_count, 4)
+        self.assertEqual(set(stats.stages), {"parse", "layout"})
+        xml = "".join(result.iter_drawio())
+        self.assertIn("export", stats.stages)
+        self.assertEqual(stats.bytes_out, len(xml.encode("utf-8")))
+
+    def test_stage_errors(self):
+        """Test that failures report the stage they happened in."""
+        # The class the registry converts with, whatever path it was imported by
+        processor_class = ProcessorRegistry.get_processor("activity")
+        for stage, method in (
+            ("parse", "parse_diagram"),
+            ("layout", "layout_diagram"),
+            ("export", "iter_drawio"),
+        ):
+            with self.subTest(stage=stage), mock.patch.object(
+                processor_class, method, side_effect=ValueError("boom")
+            ):
+                with self.assertRaises(StageError) as raised:
+                    processor_class().run(DIAGRAM).drawio
+                self.assertEqual(raised.exception.stage, stage)
+                self.assertEqual(str(raised.exception), "boom")
+                self.assertIsInstance(raised.exception.__cause__, ValueError)
+
+                with self.assertRaises(ConversionError) as raised:
+                    convert_content(DIAGRAM)
+                self.assertEqual(raised.exception.stage, stage)
+                self.assertEqual(
+                    str(raised.exception), "Unexpected error during processing: boom"
+                )
+
+    def test_detection_errors_have_stages(self):
+        """Test that unsupported and invalid content are told apart."""
+        with self.assertRaises(ConversionError) as raised:
+            convert_content("@startuml\nclass Foo\n@enduml")
+        self.assertEqual(raised.exception.stage, "detect")
+        self.assertEqual(process_diagram(""), (None, None))
+
+    def test_errors_survive_pickling(self):
+        """Test that the stage is kept across process boundaries."""
+        for error in (StageError("layout", "boom"), ConversionError("boom", "parse")):
+            copy = pickle.loads(pickle.dumps(error))
+            self.assertEqual((copy.stage, str(copy)), (error.stage, str(error)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the conversion daemon and its client.
+"""
+import contextlib
+import io
+import os
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.core import process_diagram
+from src.plantuml2drawio.server import convert_via_daemon
+
+
+@unittest.skipUnless(
+    hasattr(socketserver, "ThreadingUnixStreamServer"),
+    "Unix domain sockets are not supported on this platform",
+)
+class TestConversionServer(unittest.TestCase):
+    """Test class for the conversion daemon."""
+
+    def setUp(self):
+        """Start a daemon on a temporary socket."""
+        from src.plantuml2drawio.server import (ConversionRequestHandler,
+                                                ConversionServer)
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, "p2d.sock")
+        self.server = ConversionServer(self.socket_path, ConversionRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+        self.diagram = "@startuml\nstart\n:Step 1;\nstop\n@enduml\n"
+
+    def tearDown(self):
+        """Stop the daemon and remove the socket."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def test_daemon_matches_in_process_conversion(self):
+        """Test that the daemon returns the same output as process_diagram."""
+        for output_json in (False, True):
+            self.assertEqual(
+                convert_via_daemon(self.diagram, output_json, self.socket_path),
+                process_diagram(self.diagram, output_json),
+            )
+
+    def test_daemon_reports_errors(self):
+        """Test that conversion errors are returned, not treated as unreachable."""
+        result = convert_via_daemon("no diagram", False, self.socket_path)
+        self.assertEqual(result, (None, None))
+
+    def test_daemon_reports_unexpected_errors(self):
+        """Test that a bug in the daemon is replied to, not a dropped connection."""
+        with mock.patch(
+            "plantuml2drawio.core.convert_content", side_effect=RuntimeError("boom")
+        ), self.assertLogs("plantuml2drawio.server", "ERROR"):
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                result = convert_via_daemon(self.diagram, False, self.socket_path)
+        self.assertEqual(result, (None, None))
+        self.assertIn("boom", output.getvalue())
+
+    def test_missing_daemon_falls_back(self):
+        """Test that an unreachable daemon is signalled with None."""
+        missing = os.path.join(self.temp_dir, "missing.sock")
+        self.assertIsNone(convert_via_daemon(self.diagram, False, missing))
+
+
+if __name__ == "__main__":
+    unittest.main()
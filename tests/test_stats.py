@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage conversion statistics.
+"""
+import json
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.core import convert_content
+from src.plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+from src.plantuml2drawio.stats import ConversionStats, timed
+
+
+class TestConversionStats(unittest.TestCase):
+    """Test class for the conversion statistics."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.diagram = (
+            "@startuml\nstart\n:Step 1;\nif (ok?) then (yes)\n:Ä;\n"
+            "else (no)\n:B;\nendif\nstop\n@enduml\n"
+        )
+
+    def test_disabled_stats_share_a_no_op(self):
+        """Test that no timer is created when statistics are disabled."""
+        self.assertIs(timed(None, "parse"), timed(None, "layout"))
+
+    def test_convert_content_stages(self):
+        """Test that every stage, the counts and the size are recorded."""
+        for output_json in (False, True):
+            with self.subTest(output_json=output_json):
+                stats = ConversionStats()
+                output, _ = convert_content(self.diagram, output_json, stats=stats)
+
+                self.assertEqual(
+                    list(stats.stages),
+                    ["detect", "validate", "parse", "layout", "export"],
+                )
+                self.assertTrue(all(t >= 0 for t in stats.stages.values()))
+                nodes, edges = ActivityDiagramProcessor().parse_diagram(self.diagram)
+                self.assertEqual(stats.node_count, len(nodes))
+                self.assertEqual(stats.edge_count, len(edges))
+                self.assertEqual(stats.bytes_out, len(output.encode("utf-8")))
+
+    def test_streaming_output_is_counted_when_consumed(self):
+        """Test that streamed chunks are counted as they are produced."""
+        stats = ConversionStats()
+        chunks, _ = convert_content(self.diagram, streaming=True, stats=stats)
+        self.assertEqual(stats.bytes_out, 0)
+        self.assertNotIn("export", stats.stages)
+
+        output = "".join(chunks)
+        self.assertEqual(stats.bytes_out, len(output.encode("utf-8")))
+        self.assertIn("export", stats.stages)
+
+    def test_processor_stats(self):
+        """Test that processors time their stages when given statistics."""
+        stats = ConversionStats()
+        xml = ActivityDiagramProcessor().convert_to_drawio(self.diagram, stats=stats)
+        self.assertEqual(list(stats.stages), ["parse", "layout", "export"])
+        self.assertEqual(stats.bytes_out, len(xml.encode("utf-8")))
+
+    def test_report_formats(self):
+        """Test the JSON and text reports."""
+        stats = ConversionStats()
+        convert_content(self.diagram, stats=stats)
+
+        data = json.loads(stats.to_json())
+        self.assertEqual(list(data["stages"])[0], "detect")
+        self.assertAlmostEqual(data["total"], sum(data["stages"].values()))
+        self.assertIn("nodes: ", stats.format())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact diagram model and the array-backed DiagramStore.
+"""
+import os
+import sys
+import unittest
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.plantuml2drawio.models import Edge, Node
+from src.plantuml2drawio.processors.activity_processor import \
+    ActivityDiagramProcessor
+from src.plantuml2drawio.store import DiagramStore
+
+
+class TestDiagramModel(unittest.TestCase):
+    """Test class for the slotted Node and Edge classes."""
+
+    def test_no_instance_dict(self):
+        """Test that nodes and edges do without a per-instance __dict__."""
+        self.assertFalse(hasattr(Node("1", "A", "activity"), "__dict__"))
+        self.assertFalse(hasattr(Edge("1", "2"), "__dict__"))
+
+    def test_edge_id(self):
+        """Test that the edge id is derived lazily and can be overridden."""
+        edge = Edge("1", "2")
+        self.assertEqual(edge.id, "1_2")
+        edge.target = "3"
+        self.assertEqual(edge.id, "1_3")
+        edge.id = "custom"
+        self.assertEqual(edge.id, "custom")
+
+
+class TestDiagramStore(unittest.TestCase):
+    """Test class for the array-backed DiagramStore."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = ActivityDiagramProcessor()
+        self.diagram = (
+            "@startuml\nstart\n:Step 1;\nif (ok?) then (yes)\n:A;\n"
+            "else (no)\n:B;\nendif\nstop\n@enduml\n"
+        )
+
+    def test_views_write_through(self):
+        """Test that views read and write the columns of the store."""
+        store = DiagramStore()
+        store.add_node(1, "A", "activity")
+        store.add_node("2", "B", "decision")
+        store.add_edge(1, 2, "yes")
+
+        node = store.nodes[1]
+        self.assertEqual((node.id, node.label, node.type), ("2", "B", "decision"))
+        node.x = 15
+        node.type = "merge"
+        self.assertEqual(store.xs[1], 15)
+        self.assertEqual(store.nodes[-1].type, "merge")
+
+        (edge,) = store.edges
+        self.assertEqual((edge.source, edge.target, edge.label), ("1", "2", "yes"))
+        self.assertEqual(edge.id, "1_2")
+
+    def test_invalid_nodes(self):
+        """Test that duplicate ids and unknown edge endpoints are rejected."""
+        store = DiagramStore()
+        store.add_node(1, "A", "activity")
+        with self.assertRaises(ValueError):
+            store.add_node(1, "B", "activity")
+        with self.assertRaises(KeyError):
+            store.add_edge(1, 99)
+
+    def test_layout_and_export_on_store(self):
+        """Test that layout and export work on the store like on objects."""
+        nodes, edges = self.processor.parse_diagram(self.diagram)
+        store = DiagramStore.from_graph(nodes, edges)
+
+        self.processor.layout_diagram(nodes, edges)
+        self.processor.layout_diagram(store.nodes, store.edges)
+
+        stored_nodes, stored_edges = store.to_graph()
+        self.assertEqual(
+            [(n.id, n.type, n.x, n.y, n.width, n.height) for n in nodes],
+            [(n.id, n.type, n.x, n.y, n.width, n.height) for n in stored_nodes],
+        )
+        self.assertEqual(
+            [(e.source, e.target, e.label) for e in edges],
+            [(e.source, e.target, e.label) for e in stored_edges],
+        )
+
+        xml = self.processor.export_to_drawio(store.nodes, store.edges)
+        self.assertEqual(xml.count('vertex="1"'), len(nodes))
+        self.assertEqual(xml.count('edge="1"'), len(edges))
+
+
+if __name__ == "__main__":
+    unittest.main()